@@ -0,0 +1,79 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from backend.data_loader import current_snapshot, reloader
+from backend.executor import search_executor
+from backend.llm_interpreter import interpreter
+from backend.result_cache import result_cache
+from backend.saved_searches import saved_searches
+from backend.session_store import session_store
+
+router = APIRouter(prefix="/admin")
+
+# Sin ADMIN_TOKEN configurado, los endpoints admin quedan deshabilitados
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def check_token(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN or not token or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+
+def data_status() -> dict:
+    snapshot = current_snapshot()
+    return {
+        "version": snapshot.version,
+        "properties": snapshot.store.size,
+        "loaded_at": snapshot.loaded_at,
+        "load_seconds": round(snapshot.load_seconds, 4),
+        "last_reload_error": reloader.last_error,
+    }
+
+
+@router.get("/data")
+def data_info(x_admin_token: Optional[str] = Header(None)):
+    check_token(x_admin_token)
+    return data_status()
+
+
+@router.post("/reload")
+def trigger_reload(x_admin_token: Optional[str] = Header(None)):
+    """
+    Pide una recarga al hilo de background; no bloquea el request.
+    """
+    check_token(x_admin_token)
+    reloader.trigger()
+    return {"status": "scheduled", **data_status()}
+
+
+@router.get("/cache")
+def cache_info(x_admin_token: Optional[str] = Header(None)):
+    check_token(x_admin_token)
+    return result_cache.stats()
+
+
+@router.get("/sessions")
+def sessions_info(x_admin_token: Optional[str] = Header(None)):
+    check_token(x_admin_token)
+    return session_store.stats()
+
+
+@router.get("/interpreter")
+def interpreter_info(x_admin_token: Optional[str] = Header(None)):
+    check_token(x_admin_token)
+    return interpreter.stats()
+
+
+@router.get("/executor")
+def executor_info(x_admin_token: Optional[str] = Header(None)):
+    check_token(x_admin_token)
+    return search_executor.stats()
+
+
+@router.get("/saved-searches")
+def saved_searches_info(x_admin_token: Optional[str] = Header(None)):
+    check_token(x_admin_token)
+    return saved_searches.stats()
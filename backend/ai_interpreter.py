@@ -1,4 +1,4 @@
-import re
+from backend.lexicon import find_comuna, find_operacion, parse_price, parse_rooms
 
 # =========================
 # DEFINICIÓN DECLARATIVA
@@ -39,36 +39,19 @@ FIELD_GROUPS = {
 # =========================
 
 def extract_comuna(text):
-    comunas = [
-        "providencia", "las condes", "vitacura", "ñuñoa",
-        "la reina", "macul", "peñalolén", "santiago"
-    ]
-    for c in comunas:
-        if c in text:
-            return c.title()
-    return None
+    return find_comuna(text)
 
 
 def extract_operacion(text):
-    if "arriendo" in text:
-        return "arriendo"
-    if "venta" in text:
-        return "venta"
-    return None
+    return find_operacion(text)
 
 
 def extract_precio(text):
-    text = text.lower()
+    return parse_price(text)
 
-    match_uf = re.search(r"([\d\.]+)\s*uf", text)
-    if match_uf:
-        return {"precio_max_uf": int(match_uf.group(1).replace(".", ""))}
 
-    match_clp = re.search(r"([\d\.]{5,})", text)
-    if match_clp:
-        return {"precio_max_clp": int(match_clp.group(1).replace(".", ""))}
-
-    return {}
+def extract_recintos(text):
+    return parse_rooms(text)
 
 # =========================
 # UTILIDADES
@@ -96,8 +79,15 @@ def interpret_message(message: str, contexto_anterior: dict | None = None) -> di
         context["operacion"] = operacion
 
     context.update(extract_precio(text))
+    context.update(extract_recintos(text))
+
+    return next_step(context)
+
 
-    # --- decidir siguiente paso ---
+def next_step(context: dict) -> dict:
+    """
+    Decide entre preguntar (falta un campo) o buscar, según FIELD_DEFINITIONS.
+    """
     pending = []
 
     for field, meta in FIELD_DEFINITIONS.items():
@@ -0,0 +1,92 @@
+# backend/amenities.py
+"""
+Detección de amenities en texto libre (descripciones y consultas).
+
+Todas las palabras clave se compilan UNA vez en una sola alternancia:
+una pasada sobre el texto encuentra todos los amenities. El texto y las
+claves se comparan sin tildes ni mayúsculas ("lavanderia" = "lavandería").
+
+Lo usan tanto la ingesta (scripts/xls_to_json.py) como el backend.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Set
+
+AMENITIES_KEYWORDS = {
+    "piscina": ["piscina", "pileta"],
+    "gimnasio": ["gimnasio", "gym"],
+    "quincho": ["quincho", "parrilla", "asadera"],
+    "terraza": ["terraza"],
+    "patio": ["patio"],
+    "bodega": ["bodega"],
+    "loggia": ["loggia", "lavandería"],
+    "amoblado": ["amoblado", "equipado"],
+    "areas_verdes": ["áreas verdes", "jardín", "parque"],
+    "ascensor": ["ascensor", "elevador"],
+    "conserjeria": ["conserjería", "conserje", "portero"],
+}
+
+
+# caso común en español: tabla directa, sin normalización Unicode
+_FOLD_TABLE = str.maketrans("áéíóúüñàèìòùâêîôûäëïö", "aeiouunaeiouaeiouaeio")
+
+
+def fold(text: str) -> str:
+    """
+    Minúsculas y sin tildes (la ñ queda como n).
+    """
+    text = text.lower().translate(_FOLD_TABLE)
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+# clave normalizada → amenity
+_KEYWORD_TO_AMENITY: Dict[str, str] = {
+    fold(keyword): amenity
+    for amenity, keywords in AMENITIES_KEYWORDS.items()
+    for keyword in keywords
+}
+
+# más largas primero: la alternancia prefiere la coincidencia más larga
+_AMENITIES_RE = re.compile(
+    r"\b(" + "|".join(
+        re.escape(k) for k in sorted(_KEYWORD_TO_AMENITY, key=len, reverse=True)
+    ) + r")\b"
+)
+
+
+def _is_empty(text) -> bool:
+    return text is None or (isinstance(text, float) and text != text)
+
+
+def find_amenities(text) -> Set[str]:
+    """
+    Amenities mencionados en el texto (una sola pasada).
+    """
+    if _is_empty(text):
+        return set()
+    folded = fold(str(text))
+    return {_KEYWORD_TO_AMENITY[m.group(1)] for m in _AMENITIES_RE.finditer(folded)}
+
+
+def remove_amenities(text: str) -> str:
+    """
+    Texto (ya normalizado con fold) sin las palabras clave de amenities.
+    """
+    return _AMENITIES_RE.sub(" ", text)
+
+
+def extract_amenities(text) -> Dict[str, bool]:
+    """
+    Dict {amenity: bool} con todos los amenities; {} si no hay texto.
+    """
+    if _is_empty(text):
+        return {}
+    text = str(text).strip()
+    if not text:
+        return {}
+    found = find_amenities(text)
+    return {amenity: amenity in found for amenity in AMENITIES_KEYWORDS}
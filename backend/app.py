@@ -1,10 +1,31 @@
 print("🚀 app.py starting")
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.admin_router import router as admin_router
 from backend.assistant_router import router as assistant_router
+from backend.data_loader import current_snapshot, reloader
+from backend.executor import search_executor
+from backend.metrics_router import router as metrics_router
+from backend.profiler import ProfileMiddleware
+from backend.saved_search_router import router as saved_search_router
+from backend.similar_router import router as similar_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # carga inicial (fuera del event loop) + vigilancia de la data
+    await asyncio.to_thread(current_snapshot)
+    reloader.start()
+    yield
+    reloader.stop()
+    search_executor.shutdown()
 
-app = FastAPI(title="SuperBuscador IA Chile")
+
+app = FastAPI(title="SuperBuscador IA Chile", lifespan=lifespan)
 
 # CORS (Render + Worker, pero no molesta)
 app.add_middleware(
@@ -15,10 +36,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Perfil por muestreo a pedido (header X-Profile)
+app.add_middleware(ProfileMiddleware)
+
 # Router del asistente
 app.include_router(assistant_router)
 
+# Propiedades parecidas
+app.include_router(similar_router)
+
+# Búsquedas guardadas y alertas
+app.include_router(saved_search_router)
+
+# Router admin (recarga de data)
+app.include_router(admin_router)
+
+# Métricas Prometheus
+app.include_router(metrics_router)
+
 @app.get("/")
 def health():
     return {"status": "ok"}
-
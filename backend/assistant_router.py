@@ -1,10 +1,26 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
-import math
-import re
-
-from backend.search_engine import search_properties
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
+import asyncio
+import base64
+import hashlib
+import json
+
+from backend.amenities import find_amenities
+from backend.lexicon import (
+    comuna_nombre, find_comuna, find_operacion, free_text, parse_price, parse_rooms, unrecognized_terms,
+)
+from backend.llm_interpreter import interpreter
+from backend.data_loader import current_snapshot
+from backend.executor import Overloaded, search_executor
+from backend.metrics import ASSISTANT_REQUESTS, ASSISTANT_STAGE
+from backend.relaxation import relax
+from backend.result_cache import canonical_key, result_cache
+from backend.search_engine import SORT_OPTIONS, search_page
+from backend.search_index import ResultHandle
+from backend.serialization import DEFAULT_EXCLUDED_FIELDS, dumps, splice_response
+from backend.session_store import SessionState, merge_filters, session_store
+from backend.utils import comuna_key
 
 router = APIRouter()
 
@@ -16,21 +32,78 @@ class AssistantRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
 
+    # paginación (cursor tiene prioridad sobre offset)
+    limit: int = Field(20, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+    cursor: Optional[str] = None
+    sort: Optional[Literal["precio_asc", "precio_desc", "dormitorios", "recientes"]] = None
+
+    # proyección: campos de primer nivel a devolver ("raw" sólo si se pide)
+    fields: Optional[List[str]] = None
+
+    # facetas del resultado (comuna, operación, dormitorios, amenities, precios)
+    facets: bool = False
+
 
 # =========================
-# JSON SAFE (CRÍTICO)
+# PAGINACIÓN / PROYECCIÓN
 # =========================
 
-def clean_for_json(obj):
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-        return obj
-    if isinstance(obj, dict):
-        return {k: clean_for_json(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [clean_for_json(v) for v in obj]
-    return obj
+def filters_digest(filters: Dict[str, Any]) -> str:
+    """
+    Huella corta de los filtros interpretados (ata el cursor a su búsqueda).
+    """
+    canonical = json.dumps({k: v for k, v in filters.items() if v is not None},
+                           sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(offset: int, sort: Optional[str], version: int, filters: Dict[str, Any]) -> str:
+    """
+    `version` (de la data) y la huella de `filters`: un cursor sólo vale
+    para la misma búsqueda sobre la misma versión (ver check_cursor).
+    """
+    payload = json.dumps({"offset": offset, "sort": sort, "v": version, "q": filters_digest(filters)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Cursor → {"offset", "sort", "v", "q"}, validado como el request (el
+    cliente puede alterarlo). Cursor inválido → ValueError.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("cursor ilegible") from None
+    if not isinstance(data, dict):
+        raise ValueError("cursor ilegible")
+    offset, sort = data.get("offset"), data.get("sort")
+    if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+        raise ValueError("offset inválido en el cursor")
+    if sort is not None and sort not in SORT_OPTIONS:
+        raise ValueError("orden inválido en el cursor")
+    version, digest = data.get("v"), data.get("q")
+    if isinstance(version, bool) or not isinstance(version, int) or not isinstance(digest, str):
+        raise ValueError("cursor sin versión o búsqueda")
+    return {"offset": offset, "sort": sort, "v": version, "q": digest}
+
+
+def check_cursor(cursor: Dict[str, Any], filters: Dict[str, Any], version: int) -> None:
+    """
+    Cursor de otra búsqueda o de una versión anterior de la data (recarga
+    en segundo plano) → ValueError: con él se saltarían o repetirían filas.
+    """
+    if cursor["q"] != filters_digest(filters):
+        raise ValueError("el cursor es de otra búsqueda")
+    if cursor["v"] != version:
+        raise ValueError("la data cambió desde que se generó el cursor; repite la búsqueda")
+
+
+def project(prop: dict, fields: Optional[List[str]]) -> dict:
+    if fields:
+        return {k: prop[k] for k in fields if k in prop}
+    return {k: v for k, v in prop.items() if k not in DEFAULT_EXCLUDED_FIELDS}
 
 
 # =========================
@@ -42,28 +115,30 @@ def extract_filters_from_text(text: str) -> Dict[str, Any]:
     filters: Dict[str, Any] = {}
 
     # operación
-    if "arriendo" in t:
-        filters["operacion"] = "arriendo"
-    elif "venta" in t:
-        filters["operacion"] = "venta"
-
-    # comunas básicas
-    comunas = [
-        "providencia", "ñuñoa", "las condes",
-        "vitacura", "la reina", "santiago"
-    ]
-    for c in comunas:
-        if c in t:
-            filters["comuna"] = c
-            break
-
-    # precio CLP
-    nums = re.findall(r"\d{3,}", t.replace(".", ""))
-    if nums:
-        try:
-            filters["precio_max_clp"] = int(nums[0])
-        except Exception:
-            pass
+    operacion = find_operacion(t)
+    if operacion:
+        filters["operacion"] = operacion
+
+    # comuna (las 346, alias y sectores; sin importar tildes)
+    comuna = find_comuna(t)
+    if comuna:
+        filters["comuna"] = comuna_key(comuna)
+
+    # precio ("2 MM", "2,5 millones", "3.500 UF", "800.000")
+    filters.update(parse_price(t))
+
+    # recintos ("3 dormitorios", "2 baños")
+    filters.update(parse_rooms(t))
+
+    # amenities ("con piscina", "quincho")
+    amenities = find_amenities(t)
+    if amenities:
+        filters["amenities"] = sorted(amenities)
+
+    # el resto del mensaje ("cerca del metro", "mascotas") → búsqueda de texto
+    texto = free_text(t)
+    if texto:
+        filters["texto"] = texto
 
     return filters
 
@@ -72,12 +147,68 @@ def extract_filters_from_text(text: str) -> Dict[str, Any]:
 # META (INTELIGENCIA VISIBLE)
 # =========================
 
-def build_meta(filters: Dict[str, Any], results_count: int) -> Dict[str, Any]:
+OPERACION_NOMBRES = {
+    "arriendo": ("arriendo", "arriendos"),
+    "venta": ("venta", "ventas"),
+    None: ("propiedad", "propiedades"),
+}
+
+
+def format_price(filters: Dict[str, Any]) -> Optional[str]:
+    if filters.get("precio_max_clp"):
+        return "$" + f"{int(filters['precio_max_clp']):,}".replace(",", ".")
+    if filters.get("precio_max_uf"):
+        return f"{int(filters['precio_max_uf']):,}".replace(",", ".") + " UF"
+    return None
+
+
+def format_amount(value: float, moneda: str) -> str:
+    amount = f"{int(value):,}".replace(",", ".")
+    return f"${amount}" if moneda == "clp" else f"{amount} UF"
+
+
+def build_summary(filters: Dict[str, Any], results_count: int) -> str:
+    """
+    "Hay 42 arriendos en Ñuñoa bajo $600.000"
+    """
+    singular, plural = OPERACION_NOMBRES.get(filters.get("operacion"), OPERACION_NOMBRES[None])
+    parts = [f"Hay {results_count} {singular if results_count == 1 else plural}"]
+    if filters.get("comuna"):
+        parts.append(f"en {comuna_nombre(filters['comuna'])}")
+    precio = format_price(filters)
+    if precio:
+        parts.append(f"bajo {precio}")
+    return " ".join(parts)
+
+
+def meta_facets(filters: Dict[str, Any]) -> List[str]:
+    """
+    Facetas que usa build_meta para sus sugerencias (sin facets=True en
+    el request, sólo se calculan éstas).
+    """
+    names = []
+    if not filters.get("comuna"):
+        names.append("comuna")
+    moneda = {"venta": "uf", "arriendo": "clp"}.get(filters.get("operacion"))
+    if moneda and not (filters.get("precio_max_clp") or filters.get("precio_max_uf")):
+        names.append(f"precio_{moneda}")
+    return names
+
+
+def build_meta(filters: Dict[str, Any], results_count: int,
+               facets: Optional[Dict[str, Any]] = None,
+               relaxations: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Interpretación, supuestos y sugerencias. Con `facets` (del resultado
+    completo) las sugerencias usan conteos reales en vez de ejemplos;
+    `relaxations` (backend/relaxation.py) son consultas alternativas con
+    su cantidad exacta de resultados.
+    """
     interpretation_parts: List[str] = []
 
     operacion = filters.get("operacion")
     comuna = filters.get("comuna")
-    precio = filters.get("precio_max_clp")
+    precio = filters.get("precio_max_clp") or filters.get("precio_max_uf")
 
     # interpretación principal
     if operacion == "arriendo":
@@ -88,7 +219,18 @@ def build_meta(filters: Dict[str, Any], results_count: int) -> Dict[str, Any]:
         interpretation_parts.append("propiedades")
 
     if comuna:
-        interpretation_parts.append(f"en {comuna.title()}")
+        interpretation_parts.append(f"en {comuna_nombre(comuna)}")
+
+    recintos = [
+        f"{filters[name]}+ {label}"
+        for name, label in (("dormitorios_min", "dormitorios"), ("banos_min", "baños"))
+        if filters.get(name)
+    ]
+    if recintos:
+        interpretation_parts.append("con " + " y ".join(recintos))
+
+    if filters.get("texto"):
+        interpretation_parts.append(f'que mencionen "{filters["texto"]}"')
 
     interpretation = "Busqué " + " ".join(interpretation_parts)
 
@@ -98,57 +240,230 @@ def build_meta(filters: Dict[str, Any], results_count: int) -> Dict[str, Any]:
 
     if not comuna:
         assumptions.append("No indicaste comuna")
-        suggestions.append("Indicar comuna (ej: Providencia, Ñuñoa)")
+        top = (facets or {}).get("comuna", [])[:3]
+        if top and results_count > 20:
+            counts = ", ".join(f"{comuna_nombre(item['value'])} ({item['count']})" for item in top)
+            suggestions.append(f"Indicar comuna (más resultados en {counts})")
+        else:
+            suggestions.append("Indicar comuna (ej: Providencia, Ñuñoa)")
 
     if not precio:
         assumptions.append("No indicaste presupuesto")
-        suggestions.append("Agregar precio máximo")
+        moneda = {"venta": "uf", "arriendo": "clp"}.get(operacion)
+        stats = (facets or {}).get(f"precio_{moneda}") if moneda else None
+        if stats:
+            suggestions.append(
+                f"Agregar precio máximo (la mitad cuesta menos de {format_amount(stats['p50'], moneda)})"
+            )
+        else:
+            suggestions.append("Agregar precio máximo")
 
     if results_count > 20:
         suggestions.append("Agregar más filtros para acotar resultados")
 
-    if results_count == 0:
+    for relaxed in relaxations or []:
+        change = relaxed["change"]
+        suggestions.append(f"{change[:1].upper()}{change[1:]} hay {relaxed['count']}")
+
+    if results_count == 0 and not relaxations:
         suggestions.append("Probar otra comuna o aumentar presupuesto")
 
-    return {
+    meta = {
         "interpretation": interpretation,
+        "summary": build_summary(filters, results_count),
         "assumptions": assumptions,
         "suggestions": suggestions
     }
+    if relaxations:
+        meta["relaxations"] = relaxations
+    return meta
 
 
 # =========================
-# ENDPOINT PRINCIPAL
+# SESIÓN
 # =========================
 
-@router.post("/assistant")
-def assistant(req: AssistantRequest):
-    filters = extract_filters_from_text(req.message)
+async def load_session(session_id: Optional[str]) -> Optional[SessionState]:
+    if not session_id:
+        return None
+    return await session_store.aload(session_id)
 
-    try:
-        results = search_properties(
+
+async def save_session(session_id: Optional[str], filters: Dict[str, Any],
+                       handle: Optional[ResultHandle]) -> None:
+    if session_id:
+        await session_store.asave(session_id, SessionState(filters, handle))
+
+
+# =========================
+# BÚSQUEDA (CPU, en el executor)
+# =========================
+
+def fallback_response(filters: Dict[str, Any], interpretation: str,
+                      status_code: int = 200) -> Response:
+    if status_code == 200:
+        suggestion = "Intenta reformular la búsqueda"
+    else:
+        suggestion = "Intenta de nuevo en unos segundos"
+    body = dumps({
+        "type": "results",
+        "filters": filters,
+        "meta": {
+            "interpretation": interpretation,
+            "assumptions": [],
+            "suggestions": [suggestion]
+        },
+        "results": []
+    })
+    headers = {"Retry-After": "1"} if status_code == 503 else None
+    return Response(content=body, status_code=status_code, media_type="application/json",
+                    headers=headers)
+
+
+def run_search(
+    req: AssistantRequest,
+    filters: Dict[str, Any],
+    offset: int,
+    sort: Optional[str],
+    snapshot,
+    session: Optional[SessionState],
+):
+    """
+    Búsqueda + armado de la respuesta. Devuelve (body, handle).
+    """
+    with ASSISTANT_STAGE.time("search"):
+        page = search_page(
+            sort=sort,
+            offset=offset,
+            limit=req.limit,
+            with_dicts=bool(req.fields),
+            snapshot=snapshot,
+            prior=session.handle if session is not None else None,
+            prior_filters=session.filters if session is not None else None,
             comuna=filters.get("comuna"),
             operacion=filters.get("operacion"),
             precio_max_clp=filters.get("precio_max_clp"),
+            precio_max_uf=filters.get("precio_max_uf"),
+            amenities=filters.get("amenities"),
+            dormitorios_min=filters.get("dormitorios_min"),
+            banos_min=filters.get("banos_min"),
+            gastos_comunes_max_clp=filters.get("gastos_comunes_max_clp"),
+            texto=filters.get("texto"),
+            facets=True if req.facets else meta_facets(filters),
         )
-    except Exception:
-        # blindaje total: nunca 500
-        return {
+
+    total = page["total"]
+
+    # resultado vacío o muy chico → alternativas con conteo exacto
+    with ASSISTANT_STAGE.time("relax"):
+        relaxations = relax(snapshot, filters, total)
+
+    with ASSISTANT_STAGE.time("meta"):
+        meta = build_meta(filters, total, page.get("facets"), relaxations)
+
+    with ASSISTANT_STAGE.time("serialize"):
+        # la data ya viene limpia (bootstrap): sólo se pegan fragmentos JSON
+        if req.fields:
+            fragments = [dumps(project(p, req.fields)) for p in page["results"]]
+        else:
+            fragments = page["encoded"]
+
+        next_offset = offset + len(fragments)
+        meta.update({
+            "total": total,
+            "offset": offset,
+            "limit": req.limit,
+            "sort": sort,
+            "next_cursor": (
+                encode_cursor(next_offset, sort, snapshot.version, filters) if next_offset < total else None
+            ),
+        })
+
+        envelope = {
             "type": "results",
             "filters": filters,
-            "meta": {
-                "interpretation": "No pude ejecutar la búsqueda",
-                "assumptions": [],
-                "suggestions": ["Intenta reformular la búsqueda"]
-            },
-            "results": []
+            "meta": meta,
         }
+        if req.facets:
+            envelope["facets"] = page["facets"]
+        body = splice_response(envelope, fragments)
 
-    safe_results = clean_for_json(results)
+        handle = ResultHandle.from_rows(snapshot.version, snapshot.store.size, page["rows"])
+    return body, handle
 
-    return {
-        "type": "results",
-        "filters": filters,
-        "meta": build_meta(filters, len(safe_results)),
-        "results": safe_results
-    }
+
+# =========================
+# ENDPOINT PRINCIPAL
+# =========================
+
+@router.post("/assistant")
+async def assistant(req: AssistantRequest):
+    with ASSISTANT_STAGE.time("total"):
+        response, outcome = await answer(req)
+    ASSISTANT_REQUESTS.inc(outcome)
+    return response
+
+
+async def answer(req: AssistantRequest):
+    """
+    Flujo de /assistant. Devuelve (response, resultado para métricas).
+    """
+    # paginación primero: un cursor inválido no debe costar interpretación
+    offset, sort, cursor = req.offset, req.sort, None
+    if req.cursor:
+        try:
+            cursor = decode_cursor(req.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Cursor inválido: {e}")
+        offset, sort = cursor["offset"], cursor["sort"] or sort
+
+    with ASSISTANT_STAGE.time("parse"):
+        filters = extract_filters_from_text(req.message)
+
+    snapshot = current_snapshot()
+
+    with ASSISTANT_STAGE.time("interpret"):
+        # palabras de ESTE mensaje que no entienden las reglas ni el corpus
+        leftover = unrecognized_terms(filters.get("texto"), snapshot.index.text)
+
+        # turno de seguimiento ("y con piscina?") → sobre los filtros acumulados
+        session = await load_session(req.session_id)
+        if session is not None:
+            filters = merge_filters(session.filters, filters)
+
+        # nada útil o palabras sin reconocer → segundo nivel (LLM)
+        if interpreter.needs_llm(filters, leftover):
+            filters = await interpreter.complete_filters(req.message, filters, leftover)
+            if filters.get("comuna"):
+                filters["comuna"] = comuna_key(filters["comuna"])
+
+    if cursor is not None:
+        try:
+            check_cursor(cursor, filters, snapshot.version)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Cursor inválido: {e}")
+
+    # misma consulta canónica sobre la misma versión → respuesta ya armada
+    cache_key = canonical_key(filters, offset=offset, limit=req.limit, sort=sort, fields=req.fields,
+                              facets=req.facets)
+    cached = result_cache.get(cache_key, snapshot.version)
+    if cached is not None:
+        body, handle = cached
+        await save_session(req.session_id, filters, handle)
+        return Response(content=body, media_type="application/json"), "cache_hit"
+
+    try:
+        body, handle = await search_executor.run(
+            run_search, req, filters, offset, sort, snapshot, session,
+        )
+    except Overloaded:
+        return fallback_response(filters, "Hay muchas búsquedas en curso", 503), "overloaded"
+    except asyncio.TimeoutError:
+        return fallback_response(filters, "La búsqueda tardó demasiado", 504), "timeout"
+    except Exception:
+        # blindaje total: nunca 500
+        return fallback_response(filters, "No pude ejecutar la búsqueda"), "error"
+
+    result_cache.put(cache_key, (body, handle), snapshot.version)
+    await save_session(req.session_id, filters, handle)
+    return Response(content=body, media_type="application/json"), "ok"
@@ -1,9 +1,13 @@
 import subprocess
 from pathlib import Path
-import json
+
+from backend.ndjson import iter_records
+from backend.utils import clean_for_json
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_ENRICHED = BASE_DIR / "data" / "enriched" / "nexxos_enriched.json"
+DATA_ENRICHED_NDJSON = BASE_DIR / "data" / "enriched" / "nexxos_enriched.ndjson"
+DATA_DELTA = BASE_DIR / "data" / "enriched" / "nexxos_delta.json"
 
 UF_REFERENCIA = 37000
 
@@ -75,16 +79,39 @@ def normalize_precio(prop: dict) -> dict:
     }
 
 
-def bootstrap_data():
+def bootstrap_record(prop: dict) -> dict:
     """
-    Aplica normalización FINAL sobre la data enriquecida
+    Normalización FINAL de un registro enriquecido (ya parseado)
     """
-    if not DATA_ENRICHED.exists():
-        return []
+    # NaN / Infinity (pandas) se limpian UNA vez aquí, no por request
+    prop = clean_for_json(prop)
+    prop["precio"] = normalize_precio(prop)
+    return prop
+
 
-    data = json.loads(DATA_ENRICHED.read_text(encoding="utf-8"))
+def bootstrap_records(data: list) -> list:
+    return [bootstrap_record(p) for p in data]
 
-    for p in data:
-        p["precio"] = normalize_precio(p)
 
-    return data
+def enriched_path():
+    """
+    Archivo enriquecido vigente: el más nuevo entre .json y .ndjson
+    (None si no hay ninguno).
+    """
+    existing = [p for p in (DATA_ENRICHED, DATA_ENRICHED_NDJSON) if p.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda p: p.stat().st_mtime)
+
+
+def bootstrap_data(path=None):
+    """
+    Aplica normalización FINAL sobre la data enriquecida
+    (`path`: otro archivo .json / .ndjson en vez del vigente)
+    """
+    path = path or enriched_path()
+    if path is None:
+        return []
+
+    # registro a registro: nunca se tiene el archivo parseado completo + la salida
+    return [bootstrap_record(p) for p in iter_records(path)]
@@ -1,7 +1,247 @@
-from backend.data_bootstrap import bootstrap_data
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
 
-# Cache simple en memoria (evita re-bootstrapping en cada request)
-_DATA_CACHE = None
+from backend.data_bootstrap import (
+    DATA_DELTA,
+    DATA_ENRICHED,
+    DATA_ENRICHED_NDJSON,
+    bootstrap_data,
+    bootstrap_records,
+    enriched_path,
+)
+from backend.facets import compute_facets
+from backend.property_store import PropertyStore
+from backend.search_index import PropertyIndex
+from backend.similarity import SimilarityIndex
+from backend.snapshot import (
+    SNAPSHOT_DIR,
+    load_derived,
+    load_snapshot_with_index,
+    snapshot_exists,
+    snapshot_mtime,
+    write_snapshot,
+)
+
+# Cada cuántos segundos el reloader revisa si cambió la data (0 = no revisa)
+RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", "30"))
+
+
+class DataSnapshot:
+    """
+    Versión inmutable de la data cargada: filas + store + índice.
+    Una búsqueda toma UNA referencia y la usa completa, aunque en
+    paralelo se publique una versión nueva.
+    """
+
+    def __init__(self, version: int, rows: Sequence[dict], store: PropertyStore,
+                 index: PropertyIndex, signature: Tuple, load_seconds: float,
+                 derived: Optional[dict] = None):
+        self.version = version
+        self.rows = rows
+        self.store = store
+        self.index = index
+        self.signature = signature
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+        # `derived` (snapshot.load_derived): facetas y vectores ya calculados
+        # al escribir el snapshot; si no vienen, una vez por versión
+        derived = derived or {}
+
+        # facetas de todo el dataset
+        self.facets = derived.get("facets") or compute_facets(store)
+
+        # vectores de "propiedades parecidas" (desde las columnas del store)
+        self.similar = SimilarityIndex(store, index, derived.get("similar"))
+
+        # índice de texto listo antes de publicar (no en el primer request);
+        # desde el snapshot binario sólo se mapea
+        index.text
+
+
+# Referencia versionada: se reemplaza entera (asignación atómica)
+_CURRENT: Optional[DataSnapshot] = None
+_BUILD_LOCK = threading.Lock()
+
+
+def snapshot_is_fresh() -> bool:
+    """
+    El snapshot binario sirve si existe y no es más viejo que el JSON enriquecido.
+    """
+    if not snapshot_exists():
+        return False
+    path = enriched_path()
+    if path is None:
+        return True
+    return snapshot_mtime() >= path.stat().st_mtime
+
+
+def data_signature() -> Tuple:
+    """
+    (mtime, tamaño) de los archivos de data: si cambia, hay que recargar.
+    """
+    signature = []
+    for path in (DATA_ENRICHED, DATA_ENRICHED_NDJSON, SNAPSHOT_DIR / "meta.json"):
+        try:
+            st = path.stat()
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _build(version: int) -> DataSnapshot:
+    started = time.perf_counter()
+    signature = data_signature()
+
+    # Store columnar e índice se construyen una sola vez junto con la data.
+    # Con snapshot binario las filas se decodifican sólo al pedirlas.
+    # El índice del snapshot también viene mapeado (compartido entre workers).
+    store, arrays, derived = None, None, None
+    if snapshot_is_fresh():
+        try:
+            store, arrays = load_snapshot_with_index()
+            derived = load_derived()
+        except (ValueError, OSError) as e:
+            # snapshot de otra versión o incompleto → JSON
+            print(f"⚠️ snapshot no utilizable: {e!r}")
+    if store is None:
+        store = PropertyStore.from_properties(bootstrap_data())
+    index = PropertyIndex(store, arrays)
+    rows = store.rows
+
+    return DataSnapshot(version, rows, store, index, signature, time.perf_counter() - started, derived)
+
+
+def preload_snapshot() -> bool:
+    """
+    Paso previo a levantar varios workers: deja el snapshot binario al
+    día (lo reconstruye si falta, está viejo o es de otra versión) para
+    que cada worker sólo lo mapee. True si hubo que reconstruirlo.
+    """
+    if snapshot_is_fresh():
+        try:
+            load_snapshot_with_index()
+            return False
+        except (ValueError, OSError) as e:
+            print(f"⚠️ snapshot no utilizable: {e!r}")
+    write_snapshot(bootstrap_data())
+    return True
+
+
+def _reload_locked() -> DataSnapshot:
+    global _CURRENT
+
+    version = (_CURRENT.version + 1) if _CURRENT else 1
+    _CURRENT = _build(version)
+    return _CURRENT
+
+
+def publish_store(store: PropertyStore, signature: Tuple = ()) -> DataSnapshot:
+    """
+    Publica un store ya construido (benchmarks, data sintética) como
+    versión vigente, con su índice.
+    """
+    global _CURRENT
+
+    with _BUILD_LOCK:
+        started = time.perf_counter()
+        index = PropertyIndex(store)
+        version = (_CURRENT.version + 1) if _CURRENT else 1
+        _CURRENT = DataSnapshot(
+            version, store.rows, store, index, signature, time.perf_counter() - started,
+        )
+        return _CURRENT
+
+
+def reload_data() -> DataSnapshot:
+    """
+    Construye una versión nueva y la publica. Las búsquedas en curso
+    siguen usando la versión que ya tomaron.
+    """
+    with _BUILD_LOCK:
+        return _reload_locked()
+
+
+def current_snapshot() -> DataSnapshot:
+    """
+    Versión vigente de la data (se carga la primera vez que se pide).
+    """
+    snapshot = _CURRENT
+    if snapshot is not None:
+        return snapshot
+
+    with _BUILD_LOCK:
+        if _CURRENT is None:
+            return _reload_locked()
+        return _CURRENT
+
+
+def as_signature(value) -> Tuple:
+    # JSON convierte las tuplas en listas
+    return tuple(tuple(item) if item else None for item in value or ())
+
+
+def read_delta() -> Optional[dict]:
+    if not DATA_DELTA.exists():
+        return None
+    try:
+        return json.loads(DATA_DELTA.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def apply_delta(delta: dict) -> DataSnapshot:
+    """
+    Aplica un delta de enriquecimiento (added / updated / removed) sobre
+    la versión vigente y publica la nueva, sin recargar todo el dataset.
+    """
+    global _CURRENT
+
+    current_snapshot()  # asegura la carga inicial
+    with _BUILD_LOCK:
+        base = _CURRENT
+        started = time.perf_counter()
+
+        upserts = bootstrap_records(delta.get("added", []) + delta.get("updated", []))
+        store = base.store.apply_delta(upserts, delta.get("removed", []))
+        # texto: sólo se re-tokenizan las filas del delta
+        text = base.index.text.patched(*store.delta)
+        index = PropertyIndex(store, text=text)
+
+        signature = as_signature(delta["signature"]) if delta.get("signature") else base.signature
+        _CURRENT = DataSnapshot(
+            base.version + 1, store.rows, store, index, signature,
+            time.perf_counter() - started,
+        )
+        return _CURRENT
+
+
+# =========================
+# AVISOS DE PROPIEDADES NUEVAS / CAMBIADAS
+# =========================
+
+# fn(snapshot, ids): se llaman al publicar una versión que trae un delta
+_UPSERT_LISTENERS: List[Callable] = []
+
+
+def on_upserts(fn: Callable) -> Callable:
+    _UPSERT_LISTENERS.append(fn)
+    return fn
+
+
+def notify_upserts(snapshot: DataSnapshot, delta: dict) -> None:
+    ids = [p.get("id") for p in delta.get("added", []) + delta.get("updated", [])]
+    if not ids:
+        return
+    for fn in _UPSERT_LISTENERS:
+        try:
+            fn(snapshot, ids)
+        except Exception as e:  # un listener roto no frena la recarga
+            print(f"⚠️ aviso de delta falló: {e!r}")
 
 
 def load_sources(force_reload: bool = False):
@@ -9,10 +249,108 @@ def load_sources(force_reload: bool = False):
     Carga las propiedades ya enriquecidas y normalizadas.
     Esta es la ÚNICA puerta de entrada de datos al sistema.
     """
+    if force_reload:
+        return reload_data().rows
+    return current_snapshot().rows
+
+
+def load_store(force_reload: bool = False) -> PropertyStore:
+    """
+    Store columnar (NumPy) de la data cargada por load_sources.
+    """
+    if force_reload:
+        return reload_data().store
+    return current_snapshot().store
+
+
+def load_index(force_reload: bool = False) -> PropertyIndex:
+    """
+    Índice invertido de la data cargada por load_sources.
+    """
+    if force_reload:
+        return reload_data().index
+    return current_snapshot().index
+
+
+# =========================
+# RECARGA EN BACKGROUND
+# =========================
+
+class DataReloader:
+    """
+    Hilo que vigila los archivos de data y recarga fuera del camino de
+    los requests. trigger() fuerza una recarga inmediata (admin).
+    """
+
+    def __init__(self, interval: float = RELOAD_INTERVAL):
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._forced = False
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="data-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def trigger(self) -> None:
+        self._forced = True
+        self._wake.set()
+
+    def check(self) -> Optional[DataSnapshot]:
+        """
+        Recarga si cambió la firma de los archivos (o si se forzó).
+        """
+        forced, self._forced = self._forced, False
+        current = _CURRENT
+        signature = data_signature()
+        if not forced and current is not None and current.signature == signature:
+            return None
+        try:
+            # delta del enriquecimiento que produjo ESTOS archivos, si la
+            # versión publicada todavía no los incluye (la carga inicial no
+            # avisa: no hay versión anterior)
+            delta = None
+            if current is not None and current.signature != signature:
+                delta = read_delta()
+            if delta is not None and as_signature(delta.get("signature")) != signature:
+                delta = None
+            # si el delta es sobre la versión publicada, basta aplicarlo
+            if (
+                delta is not None
+                and not forced
+                and as_signature(delta.get("base_signature")) == current.signature
+            ):
+                snapshot = apply_delta(delta)
+            else:
+                snapshot = reload_data()
+        except Exception as e:
+            # la versión anterior sigue publicada
+            self.last_error = repr(e)
+            print(f"⚠️ recarga de data falló: {e!r}")
+            return None
+        self.last_error = None
+        if delta is not None:
+            notify_upserts(snapshot, delta)
+        print(f"🔄 data recargada: v{snapshot.version} ({snapshot.store.size} propiedades)")
+        return snapshot
 
-    global _DATA_CACHE
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.check()
+            self._wake.wait(self.interval if self.interval > 0 else None)
+            self._wake.clear()
 
-    if _DATA_CACHE is None or force_reload:
-        _DATA_CACHE = bootstrap_data()
 
-    return _DATA_CACHE
+reloader = DataReloader()
@@ -0,0 +1,371 @@
+# backend/dedup.py
+"""
+Duplicados entre fuentes: la misma propiedad publicada por varios
+corredores se agrupa en UNA entidad canónica.
+
+Comparar todos contra todos es cuadrático. Aquí cada propiedad sólo se
+compara con candidatas del mismo bloque (operación + comuna + banda de
+precio logarítmica de DEDUP_PRICE_BAND) que además comparten un balde:
+
+- LSH: la firma MinHash de la descripción (shingles de DEDUP_SHINGLE
+  términos de text_index.analyze) cortada en DEDUP_BANDS bandas
+- características: dormitorios, baños y banda de superficie
+
+Cada propiedad entra también a la banda siguiente (precio y
+superficie), así dos valores a ambos lados de un borde igual se cruzan.
+Los pares salen de arrays ordenados (claves hash → corridas), sin
+recorrer bloques; un balde con más de DEDUP_MAX_BUCKET propiedades
+(texto de plantilla, departamento tipo) se ignora. El trabajo queda
+acotado por entradas × DEDUP_MAX_BUCKET: lineal en el total de
+publicaciones, no en el cuadrado.
+
+Cada par candidato de fuentes DISTINTAS se confirma: dormitorios y
+baños iguales, precio y superficie dentro de la tolerancia, mismo
+sector si ambas lo tienen, y además Jaccard estimado >= DEDUP_JACCARD
+o características casi exactas (cada corredor suele escribir su propio
+texto). Los pares se unen de más a menos confiable (union-find), sin
+juntar dos publicaciones de la misma fuente en una entidad; la canónica
+de cada grupo es la más completa (a igualdad, la de la fuente con
+prioridad).
+"""
+
+import os
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.property_store import ColumnBuilder
+from backend.text_index import analyze
+
+DEDUP_PRICE_BAND = float(os.getenv("DEDUP_PRICE_BAND", "0.10"))
+DEDUP_PRICE_TOLERANCE = float(os.getenv("DEDUP_PRICE_TOLERANCE", "0.08"))
+DEDUP_SURFACE_TOLERANCE = float(os.getenv("DEDUP_SURFACE_TOLERANCE", "0.10"))
+# sin descripción parecida, superficie y precio tienen que coincidir casi exactos
+DEDUP_SURFACE_EXACT = float(os.getenv("DEDUP_SURFACE_EXACT", "0.01"))
+DEDUP_PRICE_EXACT = float(os.getenv("DEDUP_PRICE_EXACT", "0.03"))
+DEDUP_JACCARD = float(os.getenv("DEDUP_JACCARD", "0.5"))
+DEDUP_SHINGLE = 3
+DEDUP_BANDS = 8
+DEDUP_ROWS = 4
+DEDUP_MAX_BUCKET = int(os.getenv("DEDUP_MAX_BUCKET", "50"))
+
+# registros por tanda al calcular firmas (acota la matriz permutaciones × shingles)
+SIGNATURE_CHUNK = 20_000
+
+_PRIME = np.uint64(4294967311)  # primo > 2^32
+_rng = np.random.RandomState(7)
+_PERM_A = _rng.randint(1, 2 ** 31, size=DEDUP_BANDS * DEDUP_ROWS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 31, size=DEDUP_BANDS * DEDUP_ROWS).astype(np.uint64)
+_BAND_MULT = np.uint64(1000003)
+_BAND_OFFSET = 1000  # bandas >= 0 aun con valores < 1
+
+
+# =========================
+# MINHASH
+# =========================
+
+def shingle_hashes(text) -> List[int]:
+    """
+    crc32 de cada shingle de términos (sin stopwords, con stemming).
+    """
+    terms = analyze(text)
+    if len(terms) < DEDUP_SHINGLE:
+        shingles = terms
+    else:
+        shingles = [" ".join(terms[i:i + DEDUP_SHINGLE]) for i in range(len(terms) - DEDUP_SHINGLE + 1)]
+    return sorted({zlib.crc32(s.encode()) for s in shingles})
+
+
+def minhash_signatures(texts: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (firmas n × DEDUP_BANDS·DEDUP_ROWS uint64, tiene_texto). Sin texto la
+    firma queda en 0 y no se usa.
+    """
+    size = len(texts)
+    signatures = np.zeros((size, len(_PERM_A)), dtype=np.uint64)
+    has_text = np.zeros(size, dtype=bool)
+
+    for start in range(0, size, SIGNATURE_CHUNK):
+        hashes, owners = [], []
+        for i in range(start, min(start + SIGNATURE_CHUNK, size)):
+            h = shingle_hashes(texts[i])
+            if h:
+                has_text[i] = True
+                hashes.extend(h)
+                owners.append((i, len(h)))
+        if not hashes:
+            continue
+        values = np.array(hashes, dtype=np.uint64)
+        offsets = np.concatenate(([0], np.cumsum([n for _, n in owners])[:-1]))
+        rows = np.array([i for i, _ in owners])
+        # una permutación a la vez: (a·h + b) mod p, mínimo por registro
+        for k in range(len(_PERM_A)):
+            permuted = (_PERM_A[k] * values + _PERM_B[k]) % _PRIME
+            signatures[rows, k] = np.minimum.reduceat(permuted, offsets)
+    return signatures, has_text
+
+
+# =========================
+# CANDIDATOS
+# =========================
+
+def log_bands(values: np.ndarray, width: float) -> np.ndarray:
+    """
+    Banda logarítmica (ancho relativo `width`); sin valor → -1.
+    """
+    bands = np.full(len(values), -1, dtype=np.int64)
+    valid = ~np.isnan(values) & (values > 0)
+    bands[valid] = np.floor(np.log(values[valid]) / np.log1p(width)).astype(np.int64) + _BAND_OFFSET
+    return bands
+
+
+def _mix(*columns: np.ndarray) -> np.ndarray:
+    """
+    Hash uint64 de varias columnas enteras (una colisión sólo agrega un
+    par candidato, que igual se verifica).
+    """
+    digest = np.zeros(len(columns[0]), dtype=np.uint64)
+    for column in columns:
+        digest = digest * _BAND_MULT + np.asarray(column).astype(np.uint64)
+    return digest
+
+
+def bucket_pairs(keys: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """
+    Pares (i, j), i < j, de `members` que comparten clave. Sin recorrer
+    baldes en Python: tras ordenar, el par (k, k + d) es válido si ambas
+    entradas son de la misma corrida; d crece hasta el balde más grande.
+    """
+    if not len(members):
+        return np.empty((0, 2), dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    keys, members = keys[order], members[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+    # balde gigante = texto de plantilla o característica común: no distingue nada
+    usable = (sizes > 1) & (sizes <= DEDUP_MAX_BUCKET)
+    if not usable.any():
+        return np.empty((0, 2), dtype=np.int64)
+
+    entry = np.repeat(usable, sizes)
+    run = np.repeat(np.arange(len(starts)), sizes)[entry]
+    members = members[entry]
+
+    pairs = []
+    for d in range(1, int(sizes[usable].max())):
+        same = run[:-d] == run[d:]
+        pairs.append(np.stack([members[:-d][same], members[d:][same]], axis=1))
+    pairs = np.concatenate(pairs)
+    pairs.sort(axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return pairs
+
+
+class DuplicateDetector:
+    """
+    Detecta duplicados entre fuentes en una lista de propiedades YA
+    normalizadas (bootstrap_record). Sólo calcula columnas: no modifica
+    los registros.
+    """
+
+    def __init__(self, records: Sequence[dict], priority: Optional[Sequence[str]] = None):
+        self.records = records
+        builder = ColumnBuilder()
+        for prop in records:
+            builder.append(prop)
+        columns, categoricals, _, _ = builder.build()
+
+        self.size = builder.size
+        self.price = np.where(columns["visible"], columns["price_uf"], np.nan)
+        self.dormitorios = columns["dormitorios"]
+        self.banos = columns["banos"]
+        self.superficie = columns["superficie"]
+        self.comuna = categoricals["comuna"].codes
+        self.operacion = categoricals["operacion"].codes
+        self.sector = categoricals["sector"].codes
+
+        sources = [str(p.get("source") or "") for p in records]
+        labels = {name: i for i, name in enumerate(dict.fromkeys(list(priority or []) + sources))}
+        self.source = np.array([labels[s] for s in sources], dtype=np.int64)
+
+        texts = [(p.get("raw") or {}).get("descripcion") for p in records]
+        self.signatures, self.has_text = minhash_signatures(texts)
+
+    def candidate_pairs(self) -> np.ndarray:
+        """
+        Pares (i, j) de fuentes distintas que comparten algún balde.
+        """
+        rows = np.arange(self.size)
+        prices = log_bands(self.price, DEDUP_PRICE_BAND)
+        surfaces = log_bands(self.superficie, DEDUP_SURFACE_TOLERANCE)
+        text_rows = rows[self.has_text]
+        # superficie conocida: sin ella un par sin texto no se puede confirmar
+        sized = rows[~np.isnan(self.superficie)]
+        features = np.nan_to_num(np.column_stack([self.dormitorios, self.banos]), nan=-1).astype(np.int64)
+
+        keys, members = [], []
+        # cada propiedad entra también a la banda siguiente (precio y
+        # superficie): dos valores a ambos lados de un borde igual se cruzan
+        for price_shift in (0, 1):
+            block = _mix(self.operacion + 1, self.comuna + 1, prices + price_shift * (prices >= 0))
+
+            for band in range(DEDUP_BANDS):
+                chunk = self.signatures[text_rows, band * DEDUP_ROWS:(band + 1) * DEDUP_ROWS]
+                keys.append(_mix(block[text_rows], np.full(len(text_rows), band + 1), *chunk.T))
+                members.append(text_rows)
+
+            for surface_shift in (0, 1):
+                keys.append(_mix(
+                    block[sized],
+                    np.zeros(len(sized), dtype=np.int64),
+                    features[sized, 0] + 1,
+                    features[sized, 1] + 1,
+                    surfaces[sized] + surface_shift,
+                ))
+                members.append(sized)
+
+        pairs = bucket_pairs(np.concatenate(keys), np.concatenate(members))
+        pairs = pairs[self.source[pairs[:, 0]] != self.source[pairs[:, 1]]]
+        if not len(pairs):
+            return pairs
+        codes = np.unique(pairs[:, 0] * self.size + pairs[:, 1])
+        return np.stack([codes // self.size, codes % self.size], axis=1)
+
+    def confirm(self, pairs: np.ndarray) -> np.ndarray:
+        """
+        Confianza de cada par (0..1; -1 = no es la misma propiedad): el
+        Jaccard estimado de las descripciones o, si las características
+        calzan casi exacto, la cercanía de la superficie.
+        """
+        i, j = pairs[:, 0], pairs[:, 1]
+        keep = self.source[i] != self.source[j]
+
+        def same(values):
+            a, b = values[i], values[j]
+            return np.isnan(a) | np.isnan(b) | (a == b)
+
+        def gap(values):
+            a, b = values[i], values[j]
+            with np.errstate(invalid="ignore"):
+                return np.nan_to_num(np.abs(a - b) / np.maximum(a, b), nan=0.0)
+
+        keep &= same(self.dormitorios) & same(self.banos)
+        keep &= (gap(self.price) <= DEDUP_PRICE_TOLERANCE) & (gap(self.superficie) <= DEDUP_SURFACE_TOLERANCE)
+        si, sj = self.sector[i], self.sector[j]
+        keep &= (si < 0) | (sj < 0) | (si == sj)
+
+        # misma publicación según las características: todas presentes,
+        # superficie y precio casi exactos (cada corredor suele escribir su
+        # propio texto)
+        surface_gap = gap(self.superficie)
+        exact = (surface_gap <= DEDUP_SURFACE_EXACT) & (gap(self.price) <= DEDUP_PRICE_EXACT)
+        for values in (self.superficie, self.price, self.dormitorios, self.banos):
+            exact &= ~np.isnan(values[i]) & ~np.isnan(values[j])
+
+        both_text = self.has_text[i] & self.has_text[j]
+        jaccard = np.where(both_text, (self.signatures[i] == self.signatures[j]).mean(axis=1), 0.0)
+        keep &= (jaccard >= DEDUP_JACCARD) | exact
+
+        return np.where(keep, np.maximum(jaccard, np.where(exact, 1.0 - surface_gap, 0.0)), -1.0)
+
+    def completeness(self) -> np.ndarray:
+        return (
+            self.has_text.astype(np.int64)
+            + ~np.isnan(self.superficie)
+            + ~np.isnan(self.price)
+            + (self.sector >= 0)
+            + ~np.isnan(self.dormitorios)
+            + ~np.isnan(self.banos)
+        )
+
+    def clusters(self) -> List[List[int]]:
+        """
+        Grupos de 2+ filas que son la misma propiedad; la canónica primero.
+        """
+        pairs = self.candidate_pairs()
+        if len(pairs):
+            scores = self.confirm(pairs)
+            accepted = scores >= 0
+            # más confiables primero: deciden antes que un par dudoso encadene grupos
+            pairs = pairs[accepted][np.argsort(-scores[accepted], kind="stable")]
+
+        parent = list(range(self.size))
+        # fuentes presentes en cada grupo (bits); una entidad tiene a lo
+        # más una publicación por fuente
+        sources = {}
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        merged = []
+        for a, b in pairs.tolist():
+            ra, rb = find(a), find(b)
+            if ra == rb:
+                continue
+            bits_a = sources.get(ra, 1 << int(self.source[ra]))
+            bits_b = sources.get(rb, 1 << int(self.source[rb]))
+            if bits_a & bits_b:
+                continue
+            root, child = min(ra, rb), max(ra, rb)
+            parent[child] = root
+            sources[root] = bits_a | bits_b
+            merged.append((a, b))
+
+        groups: Dict[int, List[int]] = {}
+        for a, b in merged:
+            root = find(a)
+            members = groups.setdefault(root, [])
+            members.extend((a, b))
+
+        score = self.completeness()
+        clusters = []
+        for members in groups.values():
+            members = sorted(set(members), key=lambda r: (-score[r], self.source[r], r))
+            clusters.append(members)
+        clusters.sort(key=lambda c: c[0])
+        return clusters
+
+
+def find_duplicates(records: Sequence[dict], priority: Optional[Sequence[str]] = None) -> List[List[int]]:
+    return DuplicateDetector(records, priority).clusters()
+
+
+def collapse(records: Sequence[dict], clusters: List[List[int]],
+             summaries: Optional[Sequence[dict]] = None) -> List[dict]:
+    """
+    Una propiedad por entidad: la canónica (en su posición original)
+    lleva `fuentes` y `duplicados` (id, fuente, link y precio de las
+    demás publicaciones); las demás se omiten. `summaries` (mismo orden
+    que records) permite tomar esos datos de otra versión del registro,
+    por ejemplo el precio ya normalizado.
+    """
+    summaries = summaries or records
+    canonical_of: Dict[int, List[int]] = {}
+    dropped = set()
+    for members in clusters:
+        canonical_of[members[0]] = members
+        dropped.update(members[1:])
+
+    result = []
+    for row, prop in enumerate(records):
+        if row in dropped:
+            continue
+        members = canonical_of.get(row)
+        if members is not None:
+            prop = dict(prop)
+            prop["fuentes"] = sorted({str(summaries[m].get("source")) for m in members})
+            prop["duplicados"] = [
+                {
+                    "id": summaries[m].get("id"),
+                    "source": summaries[m].get("source"),
+                    "link": summaries[m].get("link"),
+                    "precio": summaries[m].get("precio"),
+                }
+                for m in members[1:]
+            ]
+        result.append(prop)
+    return result
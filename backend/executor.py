@@ -0,0 +1,100 @@
+# backend/executor.py
+"""
+Executor acotado para el trabajo de CPU de los requests (búsqueda +
+serialización), fuera del event loop.
+
+- SEARCH_WORKERS hilos ejecutan el trabajo.
+- SEARCH_MAX_PENDING limita cuántos trabajos pueden estar en cola o en
+  ejecución: sobre ese límite se rechaza de inmediato (Overloaded → 503)
+  en vez de acumular latencia.
+- REQUEST_TIMEOUT acota la espera de cada trabajo (→ 504). El hilo
+  termina su trabajo igual, y sigue contando como pendiente hasta entonces.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", str(min(8, os.cpu_count() or 1))))
+SEARCH_MAX_PENDING = int(os.getenv("SEARCH_MAX_PENDING", "64"))
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "10"))
+
+
+class Overloaded(Exception):
+    """
+    Demasiados trabajos pendientes: el request debe reintentarse.
+    """
+
+
+class BoundedExecutor:
+
+    def __init__(self, workers: int = SEARCH_WORKERS, max_pending: int = SEARCH_MAX_PENDING,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="search")
+        return self._pool
+
+    def _done(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Ejecuta fn(*args, **kwargs) en el pool y espera el resultado.
+        Lanza Overloaded o asyncio.TimeoutError.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded()
+            self._pending += 1
+
+        try:
+            future = self._ensure_pool().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "timeout": self.timeout,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+search_executor = BoundedExecutor()
@@ -0,0 +1,125 @@
+# backend/facets.py
+"""
+Facetas y agregados de un conjunto de filas del store columnar.
+
+Todo sale de las columnas / códigos del store (bincount, máscaras y
+percentiles de numpy), nunca de recorrer dicts:
+
+- comuna / operacion: conteo por código de la categórica
+- dormitorios: conteo por valor
+- amenities: conteo por columna booleana
+- precio: percentiles + histograma, en UF para venta y en CLP para
+  arriendo (las mismas reglas que el filtro de precio: sólo precios
+  visibles)
+
+Las facetas globales (todo el dataset) se calculan una vez al cargar
+la data (DataSnapshot.facets); un resultado que abarca todo el store
+las reutiliza.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.property_store import Categorical, PropertyStore
+
+FACET_TOP = 20
+PRICE_PERCENTILES = (10, 25, 50, 75, 90)
+PRICE_BINS = 10
+FACET_NAMES = ("comuna", "operacion", "dormitorios", "amenities", "precio_uf", "precio_clp")
+
+
+def _number(value: float):
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+def categorical_counts(column: Categorical, rows: Optional[np.ndarray],
+                       top: Optional[int] = FACET_TOP) -> List[Dict[str, Any]]:
+    codes = column.codes if rows is None else column.codes[rows]
+    counts = np.bincount(codes[codes >= 0], minlength=len(column.labels))
+    order = np.argsort(-counts, kind="stable")
+    if top is not None:
+        order = order[:top]
+    return [
+        {"value": column.labels[code], "count": int(counts[code])}
+        for code in order.tolist()
+        if counts[code]
+    ]
+
+
+def value_counts(values: np.ndarray) -> List[Dict[str, Any]]:
+    values = values[~np.isnan(values)]
+    uniques, counts = np.unique(values, return_counts=True)
+    return [
+        {"value": _number(v), "count": int(c)}
+        for v, c in zip(uniques.tolist(), counts.tolist())
+    ]
+
+
+def amenity_counts(amenities: Dict[str, np.ndarray], rows: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+    counts = []
+    for name, column in amenities.items():
+        count = int(np.count_nonzero(column if rows is None else column[rows]))
+        if count:
+            counts.append({"value": name, "count": count})
+    counts.sort(key=lambda item: -item["count"])
+    return counts
+
+
+def price_stats(values: np.ndarray, bins: int = PRICE_BINS) -> Optional[Dict[str, Any]]:
+    """
+    Percentiles e histograma (bins de igual ancho entre mínimo y máximo).
+    None si no hay precios.
+    """
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    percentiles = np.percentile(values, PRICE_PERCENTILES)
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        "count": int(len(values)),
+        "min": _number(values.min()),
+        "max": _number(values.max()),
+        **{f"p{p}": _number(v) for p, v in zip(PRICE_PERCENTILES, percentiles)},
+        "histogram": [
+            {"min": _number(lo), "max": _number(hi), "count": int(c)}
+            for lo, hi, c in zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist())
+        ],
+    }
+
+
+def price_rows(store: PropertyStore, rows: Optional[np.ndarray], operacion: str) -> np.ndarray:
+    """
+    Filas con precio visible de una operación (índices del store).
+    """
+    code = store.operacion.code(operacion)
+    if code < 0:
+        return np.empty(0, dtype=np.int64)
+    if rows is None:
+        return np.flatnonzero((store.operacion.codes == code) & store.visible)
+    return rows[(store.operacion.codes[rows] == code) & store.visible[rows]]
+
+
+def compute_facets(store: PropertyStore, rows: Optional[np.ndarray] = None,
+                   top: Optional[int] = FACET_TOP,
+                   only: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Facetas de `rows` (o de todo el store si rows es None). `top` acota
+    las comunas devueltas (None = todas). `only`: calcular sólo esas
+    facetas (FACET_NAMES; "total" va siempre).
+    """
+    builders = {
+        "comuna": lambda: categorical_counts(store.comuna, rows, top=top),
+        "operacion": lambda: categorical_counts(store.operacion, rows, top=None),
+        "dormitorios": lambda: value_counts(store.dormitorios if rows is None else store.dormitorios[rows]),
+        "amenities": lambda: amenity_counts(store.amenities, rows),
+        "precio_uf": lambda: price_stats(store.price_uf[price_rows(store, rows, "venta")]),
+        "precio_clp": lambda: price_stats(store.price_clp[price_rows(store, rows, "arriendo")]),
+    }
+    wanted = FACET_NAMES if only is None else set(only)
+    return {
+        "total": store.size if rows is None else int(len(rows)),
+        **{name: build() for name, build in builders.items() if name in wanted},
+    }
+
@@ -0,0 +1,508 @@
+# backend/lexicon.py
+"""
+Léxico del intérprete: comunas de Chile, alias, sectores y precios.
+
+Todo se compila UNA vez al importar:
+
+- las 346 comunas + alias + sectores conocidos van a un trie por
+  palabras (texto sin tildes ni mayúsculas, ver amenities.fold); una
+  pasada sobre las palabras del mensaje encuentra la coincidencia más
+  larga ("san pedro de la paz" antes que "san pedro"). El costo depende
+  del largo del mensaje, no del tamaño del léxico.
+- las expresiones de precio ("2 MM", "2,5 millones", "800 mil",
+  "3.500 UF", "$1.200.000") en una sola regex.
+
+Lo usan ai_interpreter y assistant_router.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from backend.amenities import fold, remove_amenities
+from backend.text_index import analyze
+
+# =========================
+# COMUNAS (346, por región)
+# =========================
+
+COMUNAS_POR_REGION: Dict[str, Tuple[str, ...]] = {
+    "Arica y Parinacota": (
+        "Arica", "Camarones", "Putre", "General Lagos",
+    ),
+    "Tarapacá": (
+        "Iquique", "Alto Hospicio", "Pozo Almonte", "Camiña", "Colchane", "Huara", "Pica",
+    ),
+    "Antofagasta": (
+        "Antofagasta", "Mejillones", "Sierra Gorda", "Taltal", "Calama", "Ollagüe",
+        "San Pedro de Atacama", "Tocopilla", "María Elena",
+    ),
+    "Atacama": (
+        "Copiapó", "Caldera", "Tierra Amarilla", "Chañaral", "Diego de Almagro",
+        "Vallenar", "Alto del Carmen", "Freirina", "Huasco",
+    ),
+    "Coquimbo": (
+        "La Serena", "Coquimbo", "Andacollo", "La Higuera", "Paiguano", "Vicuña",
+        "Illapel", "Canela", "Los Vilos", "Salamanca", "Ovalle", "Combarbalá",
+        "Monte Patria", "Punitaqui", "Río Hurtado",
+    ),
+    "Valparaíso": (
+        "Valparaíso", "Casablanca", "Concón", "Juan Fernández", "Puchuncaví", "Quintero",
+        "Viña del Mar", "Isla de Pascua", "Los Andes", "Calle Larga", "Rinconada",
+        "San Esteban", "La Ligua", "Cabildo", "Papudo", "Petorca", "Zapallar",
+        "Quillota", "Calera", "Hijuelas", "La Cruz", "Nogales", "San Antonio",
+        "Algarrobo", "Cartagena", "El Quisco", "El Tabo", "Santo Domingo",
+        "San Felipe", "Catemu", "Llaillay", "Panquehue", "Putaendo", "Santa María",
+        "Quilpué", "Limache", "Olmué", "Villa Alemana",
+    ),
+    "Metropolitana": (
+        "Santiago", "Cerrillos", "Cerro Navia", "Conchalí", "El Bosque",
+        "Estación Central", "Huechuraba", "Independencia", "La Cisterna", "La Florida",
+        "La Granja", "La Pintana", "La Reina", "Las Condes", "Lo Barnechea",
+        "Lo Espejo", "Lo Prado", "Macul", "Maipú", "Ñuñoa", "Pedro Aguirre Cerda",
+        "Peñalolén", "Providencia", "Pudahuel", "Quilicura", "Quinta Normal",
+        "Recoleta", "Renca", "San Joaquín", "San Miguel", "San Ramón", "Vitacura",
+        "Puente Alto", "Pirque", "San José de Maipo", "Colina", "Lampa", "Tiltil",
+        "San Bernardo", "Buin", "Calera de Tango", "Paine", "Melipilla", "Alhué",
+        "Curacaví", "María Pinto", "San Pedro", "Talagante", "El Monte",
+        "Isla de Maipo", "Padre Hurtado", "Peñaflor",
+    ),
+    "O'Higgins": (
+        "Rancagua", "Codegua", "Coinco", "Coltauco", "Doñihue", "Graneros",
+        "Las Cabras", "Machalí", "Malloa", "Mostazal", "Olivar", "Peumo",
+        "Pichidegua", "Quinta de Tilcoco", "Rengo", "Requínoa", "San Vicente",
+        "Pichilemu", "La Estrella", "Litueche", "Marchigüe", "Navidad", "Paredones",
+        "San Fernando", "Chépica", "Chimbarongo", "Lolol", "Nancagua", "Palmilla",
+        "Peralillo", "Placilla", "Pumanque", "Santa Cruz",
+    ),
+    "Maule": (
+        "Talca", "Constitución", "Curepto", "Empedrado", "Maule", "Pelarco",
+        "Pencahue", "Río Claro", "San Clemente", "San Rafael", "Cauquenes", "Chanco",
+        "Pelluhue", "Curicó", "Hualañé", "Licantén", "Molina", "Rauco", "Romeral",
+        "Sagrada Familia", "Teno", "Vichuquén", "Linares", "Colbún", "Longaví",
+        "Parral", "Retiro", "San Javier", "Villa Alegre", "Yerbas Buenas",
+    ),
+    "Ñuble": (
+        "Chillán", "Bulnes", "Chillán Viejo", "El Carmen", "Pemuco", "Pinto",
+        "Quillón", "San Ignacio", "Yungay", "Quirihue", "Cobquecura", "Coelemu",
+        "Ninhue", "Portezuelo", "Ránquil", "Treguaco", "San Carlos", "Coihueco",
+        "Ñiquén", "San Fabián", "San Nicolás",
+    ),
+    "Biobío": (
+        "Concepción", "Coronel", "Chiguayante", "Florida", "Hualqui", "Lota", "Penco",
+        "San Pedro de la Paz", "Santa Juana", "Talcahuano", "Tomé", "Hualpén",
+        "Lebu", "Arauco", "Cañete", "Contulmo", "Curanilahue", "Los Álamos", "Tirúa",
+        "Los Ángeles", "Antuco", "Cabrero", "Laja", "Mulchén", "Nacimiento",
+        "Negrete", "Quilaco", "Quilleco", "San Rosendo", "Santa Bárbara", "Tucapel",
+        "Yumbel", "Alto Biobío",
+    ),
+    "Araucanía": (
+        "Temuco", "Carahue", "Cunco", "Curarrehue", "Freire", "Galvarino", "Gorbea",
+        "Lautaro", "Loncoche", "Melipeuco", "Nueva Imperial", "Padre Las Casas",
+        "Perquenco", "Pitrufquén", "Pucón", "Saavedra", "Teodoro Schmidt", "Toltén",
+        "Vilcún", "Villarrica", "Cholchol", "Angol", "Collipulli", "Curacautín",
+        "Ercilla", "Lonquimay", "Los Sauces", "Lumaco", "Purén", "Renaico",
+        "Traiguén", "Victoria",
+    ),
+    "Los Ríos": (
+        "Valdivia", "Corral", "Lanco", "Los Lagos", "Máfil", "Mariquina", "Paillaco",
+        "Panguipulli", "La Unión", "Futrono", "Lago Ranco", "Río Bueno",
+    ),
+    "Los Lagos": (
+        "Puerto Montt", "Calbuco", "Cochamó", "Fresia", "Frutillar", "Los Muermos",
+        "Llanquihue", "Maullín", "Puerto Varas", "Castro", "Ancud", "Chonchi",
+        "Curaco de Vélez", "Dalcahue", "Puqueldón", "Queilén", "Quellón", "Quemchi",
+        "Quinchao", "Osorno", "Puerto Octay", "Purranque", "Puyehue", "Río Negro",
+        "San Juan de la Costa", "San Pablo", "Chaitén", "Futaleufú", "Hualaihué",
+        "Palena",
+    ),
+    "Aysén": (
+        "Coyhaique", "Lago Verde", "Aysén", "Cisnes", "Guaitecas", "Cochrane",
+        "O'Higgins", "Tortel", "Chile Chico", "Río Ibáñez",
+    ),
+    "Magallanes": (
+        "Punta Arenas", "Laguna Blanca", "Río Verde", "San Gregorio", "Cabo de Hornos",
+        "Antártica", "Porvenir", "Primavera", "Timaukel", "Natales", "Torres del Paine",
+    ),
+}
+
+COMUNAS: Tuple[str, ...] = tuple(
+    comuna for comunas in COMUNAS_POR_REGION.values() for comuna in comunas
+)
+
+# Formas abreviadas / coloquiales → comuna
+ALIAS_COMUNAS: Dict[str, str] = {
+    "stgo": "Santiago",
+    "santiago centro": "Santiago",
+    "stgo centro": "Santiago",
+    "viña": "Viña del Mar",
+    "valpo": "Valparaíso",
+    "conce": "Concepción",
+    "pac": "Pedro Aguirre Cerda",
+    "est central": "Estación Central",
+    "barnechea": "Lo Barnechea",
+    "la calera": "Calera",
+    "til til": "Tiltil",
+    "llay llay": "Llaillay",
+    "pto montt": "Puerto Montt",
+    "pto varas": "Puerto Varas",
+    "pta arenas": "Punta Arenas",
+    "puerto natales": "Natales",
+    "puerto williams": "Cabo de Hornos",
+    "puerto aysen": "Aysén",
+    "coihaique": "Coyhaique",
+    "rapa nui": "Isla de Pascua",
+    "paihuano": "Paiguano",
+    "marchihue": "Marchigüe",
+    "trehuaco": "Treguaco",
+    "alto bio bio": "Alto Biobío",
+}
+
+# Sectores / barrios conocidos → comuna
+SECTORES: Dict[str, str] = {
+    "barrio italia": "Providencia",
+    "bellavista": "Providencia",
+    "los leones": "Providencia",
+    "manuel montt": "Providencia",
+    "pedro de valdivia norte": "Providencia",
+    "el golf": "Las Condes",
+    "sanhattan": "Las Condes",
+    "el bosque norte": "Las Condes",
+    "apoquindo": "Las Condes",
+    "escuela militar": "Las Condes",
+    "los dominicos": "Las Condes",
+    "san carlos de apoquindo": "Las Condes",
+    "rotonda atenas": "Las Condes",
+    "alto las condes": "Las Condes",
+    "lo curro": "Vitacura",
+    "santa maria de manquehue": "Vitacura",
+    "la dehesa": "Lo Barnechea",
+    "los trapenses": "Lo Barnechea",
+    "el arrayan": "Lo Barnechea",
+    "chicureo": "Colina",
+    "piedra roja": "Colina",
+    "plaza nuñoa": "Ñuñoa",
+    "villa frei": "Ñuñoa",
+    "lastarria": "Santiago",
+    "barrio lastarria": "Santiago",
+    "barrio brasil": "Santiago",
+    "barrio yungay": "Santiago",
+    "barrio republica": "Santiago",
+    "parque forestal": "Santiago",
+    "matta sur": "Santiago",
+    "reñaca": "Viña del Mar",
+    "curauma": "Valparaíso",
+}
+
+
+# Comunas colindantes (áreas urbanas con más oferta). La relación se
+# completa simétrica abajo; el resto usa las comunas de su región.
+_VECINAS: Dict[str, Tuple[str, ...]] = {
+    "Santiago": ("Independencia", "Recoleta", "Providencia", "Ñuñoa", "San Joaquín",
+                 "San Miguel", "Pedro Aguirre Cerda", "Estación Central", "Quinta Normal"),
+    "Providencia": ("Recoleta", "Vitacura", "Las Condes", "La Reina", "Ñuñoa"),
+    "Las Condes": ("Vitacura", "Lo Barnechea", "La Reina", "Peñalolén"),
+    "Vitacura": ("Lo Barnechea", "Huechuraba", "Recoleta"),
+    "Lo Barnechea": ("Colina", "Huechuraba"),
+    "Ñuñoa": ("La Reina", "Peñalolén", "Macul", "San Joaquín"),
+    "La Reina": ("Peñalolén",),
+    "Peñalolén": ("Macul", "La Florida"),
+    "Macul": ("La Florida", "San Joaquín"),
+    "La Florida": ("Puente Alto", "La Pintana", "La Granja", "San Joaquín"),
+    "San Joaquín": ("La Granja", "San Miguel"),
+    "San Miguel": ("San Ramón", "La Cisterna", "Pedro Aguirre Cerda", "La Granja"),
+    "Pedro Aguirre Cerda": ("Lo Espejo", "Cerrillos", "Estación Central", "La Cisterna"),
+    "Estación Central": ("Quinta Normal", "Lo Prado", "Pudahuel", "Maipú", "Cerrillos"),
+    "Quinta Normal": ("Lo Prado", "Cerro Navia", "Renca", "Independencia"),
+    "Independencia": ("Recoleta", "Conchalí", "Renca"),
+    "Recoleta": ("Conchalí", "Huechuraba"),
+    "Huechuraba": ("Conchalí", "Quilicura", "Colina"),
+    "Conchalí": ("Quilicura", "Renca"),
+    "Renca": ("Quilicura", "Cerro Navia", "Pudahuel"),
+    "Quilicura": ("Pudahuel", "Colina", "Lampa"),
+    "Cerro Navia": ("Lo Prado", "Pudahuel"),
+    "Lo Prado": ("Pudahuel",),
+    "Pudahuel": ("Maipú", "Lampa"),
+    "Maipú": ("Cerrillos", "San Bernardo", "Padre Hurtado"),
+    "Cerrillos": ("Lo Espejo",),
+    "Lo Espejo": ("La Cisterna", "El Bosque", "San Bernardo"),
+    "La Cisterna": ("San Ramón", "El Bosque"),
+    "San Ramón": ("La Granja", "La Pintana", "El Bosque"),
+    "La Granja": ("La Pintana",),
+    "El Bosque": ("La Pintana", "San Bernardo"),
+    "La Pintana": ("San Bernardo", "Puente Alto"),
+    "Puente Alto": ("San Bernardo", "Pirque", "San José de Maipo"),
+    "San Bernardo": ("Calera de Tango", "Buin"),
+    "Colina": ("Lampa", "Tiltil"),
+    "Viña del Mar": ("Valparaíso", "Concón", "Quilpué"),
+    "Concón": ("Quintero",),
+    "Quilpué": ("Villa Alemana",),
+    "Valparaíso": ("Casablanca",),
+    "Concepción": ("Talcahuano", "Hualpén", "San Pedro de la Paz", "Chiguayante", "Penco"),
+    "San Pedro de la Paz": ("Coronel", "Chiguayante"),
+    "Talcahuano": ("Hualpén",),
+    "La Serena": ("Coquimbo",),
+    "Puerto Montt": ("Puerto Varas",),
+    "Puerto Varas": ("Llanquihue", "Frutillar"),
+    "Temuco": ("Padre Las Casas",),
+}
+
+COMUNAS_VECINAS: Dict[str, List[str]] = {}
+for _comuna, _vecinas in _VECINAS.items():
+    for _vecina in _vecinas:
+        COMUNAS_VECINAS.setdefault(_comuna, []).append(_vecina)
+        COMUNAS_VECINAS.setdefault(_vecina, []).append(_comuna)
+
+REGION_POR_COMUNA: Dict[str, str] = {
+    comuna: region for region, comunas in COMUNAS_POR_REGION.items() for comuna in comunas
+}
+_CANONICAL = {fold(comuna): comuna for comuna in COMUNAS}
+
+
+def comuna_nombre(comuna: str) -> str:
+    """
+    Nombre para mostrar (con tildes) de una comuna normalizada.
+    """
+    return _CANONICAL.get(fold(comuna)) or comuna.title()
+
+
+def comunas_vecinas(comuna: str) -> List[str]:
+    """
+    Comunas cercanas (nombre canónico): las colindantes si se conocen,
+    si no las de la misma región.
+    """
+    canonical = _CANONICAL.get(fold(comuna))
+    if canonical is None:
+        return []
+    if canonical in COMUNAS_VECINAS:
+        return list(COMUNAS_VECINAS[canonical])
+    region = REGION_POR_COMUNA.get(canonical)
+    return [c for c in COMUNAS_POR_REGION.get(region, ()) if c != canonical]
+
+
+# =========================
+# TRIE POR PALABRAS
+# =========================
+
+_WORD_RE = re.compile(r"\w+")
+_END = None  # marca de fin de entrada en un nodo
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(fold(text))
+
+
+class Lexicon:
+    """
+    Trie de frases (por palabras normalizadas) → valor canónico.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        self._root: dict = {}
+        self.size = 0
+        for surface, canonical in entries:
+            node = self._root
+            for word in words(surface):
+                node = node.setdefault(word, {})
+            if _END not in node:
+                self.size += 1
+            node[_END] = canonical
+
+    def _match_at(self, tokens: List[str], start: int) -> Tuple[int, Optional[str]]:
+        node, end, found = self._root, start, None
+        for i in range(start, len(tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if _END in node:
+                end, found = i + 1, node[_END]
+        return end, found
+
+    def find_all(self, text: str) -> List[str]:
+        """
+        Coincidencias (más largas, sin traslape) en orden de aparición.
+        """
+        tokens = words(text or "")
+        found: List[str] = []
+        i = 0
+        while i < len(tokens):
+            end, value = self._match_at(tokens, i)
+            if value is None:
+                i += 1
+            else:
+                found.append(value)
+                i = end
+        return found
+
+    def find(self, text: str) -> Optional[str]:
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+    def unmatched(self, text: str) -> List[str]:
+        """
+        Palabras del texto que no forman parte de ninguna coincidencia.
+        """
+        tokens = words(text or "")
+        rest: List[str] = []
+        i = 0
+        while i < len(tokens):
+            end, value = self._match_at(tokens, i)
+            if value is None:
+                rest.append(tokens[i])
+                i += 1
+            else:
+                i = end
+        return rest
+
+
+COMUNAS_LEXICON = Lexicon(
+    [(c, c) for c in COMUNAS]
+    + list(ALIAS_COMUNAS.items())
+    + list(SECTORES.items())
+)
+
+
+def find_comuna(text: str) -> Optional[str]:
+    """
+    Primera comuna mencionada (nombre oficial), sin importar tildes ni
+    mayúsculas: "nunoa" → "Ñuñoa", "la dehesa" → "Lo Barnechea".
+    """
+    return COMUNAS_LEXICON.find(text)
+
+
+# =========================
+# OPERACIÓN
+# =========================
+
+_ARRIENDO_RE = re.compile(r"\b(arriendo|arriendos|arrendar|arrienda|alquiler|alquilar)\b")
+_VENTA_RE = re.compile(r"\b(venta|ventas|vendo|vender|comprar|compra)\b")
+
+
+def find_operacion(text: str) -> Optional[str]:
+    folded = fold(text or "")
+    if _ARRIENDO_RE.search(folded):
+        return "arriendo"
+    if _VENTA_RE.search(folded):
+        return "venta"
+    return None
+
+
+# =========================
+# PRECIO
+# =========================
+
+# 1.200.000 / 3.500,5 (miles con punto) o 2,5 / 2.5 / 800 (decimal)
+_NUM = r"\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:[.,]\d+)?"
+
+# "5 mil uf" va antes que "mil" solo (si no, sería $5.000)
+_PRECIO_RE = re.compile(
+    rf"(?P<miluf>{_NUM})\s*mil\s*(?:de\s+)?uf\b"
+    rf"|(?P<uf>{_NUM})\s*uf\b"
+    rf"|(?P<mm>{_NUM})\s*(?:mm|millon|millones)(?!\w)"
+    rf"|(?P<mil>{_NUM})\s*(?:mil|k)\b"
+    rf"|(?:\$\s*)?(?P<clp>\d{{1,3}}(?:\.\d{{3}})+|\d{{5,}})"
+)
+
+_THOUSANDS_RE = re.compile(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?")
+
+
+def parse_number(raw: str) -> float:
+    if _THOUSANDS_RE.fullmatch(raw):
+        return float(raw.replace(".", "").replace(",", "."))
+    return float(raw.replace(",", "."))
+
+
+def _as_int(value: float) -> Union[int, float]:
+    return int(value) if value.is_integer() else value
+
+
+def parse_price(text: str) -> Dict[str, Union[int, float]]:
+    """
+    Primer precio del texto:
+    {"precio_max_uf": n} para UF, {"precio_max_clp": n} para pesos
+    ("2 MM" → 2000000, "2,5 millones" → 2500000, "800 mil" → 800000,
+    "5 mil UF" → 5000 UF).
+    """
+    match = _PRECIO_RE.search(fold(text or ""))
+    if not match:
+        return {}
+    if match.group("miluf"):
+        return {"precio_max_uf": _as_int(parse_number(match.group("miluf")) * 1_000)}
+    if match.group("uf"):
+        return {"precio_max_uf": _as_int(parse_number(match.group("uf")))}
+    if match.group("mm"):
+        return {"precio_max_clp": int(round(parse_number(match.group("mm")) * 1_000_000))}
+    if match.group("mil"):
+        return {"precio_max_clp": int(round(parse_number(match.group("mil")) * 1_000))}
+    return {"precio_max_clp": int(parse_number(match.group("clp")))}
+
+
+# "3 dormitorios", "2 o más baños", "dos piezas" → mínimo de recintos
+_NUMEROS = {"un": 1, "uno": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5, "seis": 6}
+_RECINTOS_RE = re.compile(
+    rf"\b(?P<n>\d{{1,2}}|{'|'.join(_NUMEROS)})\s*(?:o\s+mas\s+)?"
+    r"(?:(?P<dorm>dormitorios?|dorms?|habitaciones?|piezas?|recamaras?)|(?P<banos>banos?))\b"
+)
+
+
+def parse_rooms(text: str) -> Dict[str, int]:
+    """
+    Mínimos de dormitorios / baños del texto (el primero de cada uno):
+    "casa 3 dormitorios 2 baños" → {"dormitorios_min": 3, "banos_min": 2}.
+    """
+    found: Dict[str, int] = {}
+    for match in _RECINTOS_RE.finditer(fold(text or "")):
+        n = match.group("n")
+        name = "dormitorios_min" if match.group("dorm") else "banos_min"
+        found.setdefault(name, int(n) if n.isdigit() else _NUMEROS[n])
+    return found
+
+
+# =========================
+# TEXTO LIBRE
+# =========================
+
+# palabras de relleno de las consultas (no describen la propiedad)
+QUERY_FILLER = frozenset(words("""
+    busco buscando quiero queria necesito necesitamos me gustaria ojala algo alguna
+    propiedad propiedades opcion opciones precio presupuesto maximo menos menor
+    barato barata economico economica pesos clp uf mm millon millones mil
+    comuna sector zona ubicado ubicada
+"""))
+
+
+# palabras de avisos que las reglas entienden aunque no sean filtro
+# (tipo de propiedad, recintos): no justifican consultar al LLM
+LISTING_TERMS = frozenset(analyze("""
+    casa casas depto deptos departamento departamentos dormitorio dormitorios
+    habitacion habitaciones pieza piezas bano banos oficina oficinas local locales
+    parcela parcelas terreno terrenos sitio bodega estacionamiento estacionamientos
+    loft studio estudio duplex penthouse amoblado amoblada nuevo nueva usado usada metros
+"""))
+
+
+def unrecognized_terms(texto: Optional[str], text_index=None) -> List[str]:
+    """
+    Términos del texto libre que ni las reglas ni el corpus (`text_index`,
+    si se pasa) reconocen: "algo bonito para mi familia" → ["bonit", "famili"].
+    """
+    vocab = text_index.vocab if text_index is not None else {}
+    return [t for t in analyze(texto) if t not in LISTING_TERMS and t not in vocab] if texto else []
+
+
+def free_text(text: str) -> str:
+    """
+    Lo que queda del mensaje tras quitar comuna / sector, operación,
+    precio, dormitorios / baños, amenities, stopwords y relleno: "arriendo providencia cerca
+    del metro hasta 800.000" → "cerca metro". Cadena vacía si no queda
+    nada.
+    """
+    folded = fold(text or "")
+    folded = _PRECIO_RE.sub(" ", folded)
+    folded = _RECINTOS_RE.sub(" ", folded)
+    folded = _VENTA_RE.sub(" ", _ARRIENDO_RE.sub(" ", folded))
+    folded = remove_amenities(folded)
+    rest = [
+        word for word in COMUNAS_LEXICON.unmatched(folded)
+        if word not in QUERY_FILLER and analyze(word)
+    ]
+    return " ".join(rest)
@@ -0,0 +1,267 @@
+# backend/llm_interpreter.py
+"""
+Intérprete en dos niveles.
+
+1. Reglas (ai_interpreter / lexicon): siempre primero, microsegundos.
+2. LLM (prompts/interpretar_busqueda.md): SÓLO si las reglas no
+   sacaron nada útil del mensaje, o si quedaron palabras que no
+   reconocen ni las reglas ni el corpus (lexicon.unrecognized_terms).
+   Una consulta amplia pero clara ("arriendo", "casa 3 dormitorios")
+   se responde sin esperar al LLM.
+
+Las llamadas al LLM pasan por:
+- cache por mensaje normalizado (sin tildes, mayúsculas ni espacios extra)
+- coalescencia: mensajes idénticos en vuelo comparten UNA llamada
+- límite de concurrencia (semáforo)
+- timeout: si vence, se responde con el resultado de las reglas
+
+El cliente es intercambiable (LLMClient). Por defecto se usa la API de
+OpenAI si hay LLM_API_KEY / OPENAI_API_KEY; LLM_BASE_URL permite apuntar
+a un servidor compatible (por ejemplo uno falso local para pruebas).
+Sin cliente configurado, sólo responden las reglas.
+"""
+
+import asyncio
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from backend.ai_interpreter import interpret_message, next_step
+from backend.amenities import fold
+from backend.lexicon import find_comuna, free_text, parse_price, unrecognized_terms
+from backend.result_cache import ResultCache
+
+try:
+    import openai
+except ImportError:  # pragma: no cover - depende del entorno
+    openai = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROMPT_FILE = BASE_DIR / "prompts" / "interpretar_busqueda.md"
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")
+LLM_API_KEY = os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "3"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "4096"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+
+
+# =========================
+# CLIENTES
+# =========================
+
+class LLMClient:
+    """
+    Interfaz: recibe el prompt de sistema y el mensaje, devuelve el
+    texto de la respuesta (se espera JSON).
+    """
+
+    async def complete(self, system: str, message: str) -> str:
+        raise NotImplementedError
+
+
+class OpenAIClient(LLMClient):
+
+    def __init__(self, model: str = LLM_MODEL, base_url: Optional[str] = LLM_BASE_URL,
+                 api_key: Optional[str] = LLM_API_KEY, timeout: float = LLM_TIMEOUT):
+        if openai is None:
+            raise RuntimeError("El cliente LLM requiere el paquete `openai`")
+        self.model = model
+        self.client = openai.AsyncOpenAI(
+            base_url=base_url, api_key=api_key, timeout=timeout, max_retries=0,
+        )
+
+    async def complete(self, system: str, message: str) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            temperature=0,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": message},
+            ],
+        )
+        return response.choices[0].message.content or ""
+
+
+def default_client() -> Optional[LLMClient]:
+    if openai is None or not (LLM_API_KEY or LLM_BASE_URL):
+        return None
+    return OpenAIClient()
+
+
+# =========================
+# RESPUESTA DEL LLM → FILTROS
+# =========================
+
+_JSON_RE = re.compile(r"\{.*\}", re.S)
+
+
+def normalize_message(message: str) -> str:
+    return " ".join(fold(message or "").split())
+
+
+def parse_llm_filters(text: str) -> Dict[str, Any]:
+    """
+    Filtros válidos de la respuesta del LLM (contrato del prompt),
+    con los nombres internos. Lo que no se puede validar se descarta.
+    """
+    match = _JSON_RE.search(text or "")
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    raw = data.get("filters") or data.get("filters_partial") or {}
+    if not isinstance(raw, dict):
+        return {}
+
+    filters: Dict[str, Any] = {}
+
+    # la comuna se valida contra el léxico (nombre oficial)
+    comuna = raw.get("comuna")
+    if isinstance(comuna, str):
+        comuna = find_comuna(comuna)
+        if comuna:
+            filters["comuna"] = comuna
+
+    operacion = raw.get("operation") or raw.get("operacion")
+    if operacion in ("arriendo", "venta"):
+        filters["operacion"] = operacion
+
+    precio = raw.get("price_max")
+    if isinstance(precio, (int, float)) and not isinstance(precio, bool) and precio > 0:
+        filters["precio_max_clp"] = int(precio)
+    elif isinstance(precio, str):
+        filters.update(parse_price(precio))
+
+    return filters
+
+
+# =========================
+# INTÉRPRETE
+# =========================
+
+class TieredInterpreter:
+
+    def __init__(
+        self,
+        client: Optional[LLMClient] = None,
+        timeout: float = LLM_TIMEOUT,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        cache: Optional[ResultCache] = None,
+        prompt: Optional[str] = None,
+    ):
+        self.client = client
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache = cache or ResultCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+        self._prompt = prompt
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def prompt(self) -> str:
+        if self._prompt is None:
+            self._prompt = PROMPT_FILE.read_text(encoding="utf-8")
+        return self._prompt
+
+    def needs_llm(self, filters: Dict[str, Any], leftover: Sequence[str] = ()) -> bool:
+        """
+        `leftover`: términos del mensaje que las reglas no reconocieron.
+        """
+        if self.client is None:
+            return False
+        return bool(leftover) or not any(v not in (None, "", []) for v in filters.values())
+
+    async def _call(self, key: str, message: str) -> Dict[str, Any]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self._semaphore:
+                self.calls += 1
+                text = await self.client.complete(self.prompt, message)
+            filters = parse_llm_filters(text)
+            self.cache.put(key, filters, 0)
+            return filters
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ LLM falló: {e!r}")
+            return {}
+        finally:
+            self._inflight.pop(key, None)
+
+    async def llm_filters(self, message: str) -> Dict[str, Any]:
+        """
+        Filtros que entiende el LLM para el mensaje ({} si no hay
+        cliente, si falla o si vence el timeout).
+        """
+        if self.client is None:
+            return {}
+        key = normalize_message(message)
+        cached = self.cache.get(key, 0)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call(key, message))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+
+        try:
+            # shield: el timeout de un request no cancela la llamada compartida
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return {}
+
+    async def complete_filters(self, message: str, filters: Dict[str, Any],
+                               leftover: Sequence[str] = ()) -> Dict[str, Any]:
+        """
+        Filtros de las reglas, completados por el LLM sólo si hace falta
+        (needs_llm). Lo que resolvieron las reglas no se reemplaza.
+        """
+        if not self.needs_llm(filters, leftover):
+            return filters
+        return {**await self.llm_filters(message), **filters}
+
+    async def interpret(self, message: str, contexto_anterior: Optional[dict] = None) -> dict:
+        """
+        Igual que ai_interpreter.interpret_message, con el LLM como
+        segundo nivel.
+        """
+        result = interpret_message(message, contexto_anterior)
+        context = result.get("filters") or result.get("filters_partial") or {}
+        if not self.needs_llm(context, unrecognized_terms(free_text(message))):
+            return result
+        llm = await self.llm_filters(message)
+        if not llm:
+            return result
+        return next_step({**llm, **context})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.client is not None,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+            "cache": self.cache.stats(),
+        }
+
+
+interpreter = TieredInterpreter(default_client())
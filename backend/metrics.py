@@ -0,0 +1,206 @@
+# backend/metrics.py
+"""
+Métricas en proceso, expuestas en formato de texto Prometheus (/metrics).
+
+Sin dependencias: contadores e histogramas con buckets fijos, seguros
+entre hilos. Registrar una observación cuesta un bisect y una suma
+bajo lock; no se escribe nada a stdout en el camino de los requests.
+
+Uso:
+    with ASSISTANT_STAGE.time("search"):
+        ...
+    SEARCH_RETURNED.observe(len(rows))
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000, 100000)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(total)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(label_values)
+            if child is None:
+                child = self._children[label_values] = _HistogramChild(len(self.buckets) + 1)
+            child.counts[i] += 1
+            child.sum += value
+            child.count += 1
+
+    @contextmanager
+    def time(self, *label_values: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, child in sorted(self._children.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}"
+                    )
+                labels = _format_labels(self.labels, values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+                lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Collector:
+    """
+    Valores calculados al momento del scrape (tamaño de la data, stats
+    de los caches): `collect` devuelve [(nombre, tipo, ayuda, valor)],
+    con tipo "gauge" o "counter". Valores None se omiten.
+    """
+
+    def __init__(self, collect: Callable[[], Iterable[Tuple[str, str, str, Optional[float]]]]):
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = []
+        for name, kind, help, value in self.collect():
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+        return lines
+
+
+# =========================
+# REGISTRO
+# =========================
+
+_REGISTRY: List = []
+
+
+def register(metric):
+    _REGISTRY.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        try:
+            lines.extend(metric.render())
+        except Exception as e:  # una métrica rota no tumba el scrape
+            lines.append(f"# error rendering metric: {_escape(repr(e))}")
+    return "\n".join(lines) + "\n"
+
+
+# =========================
+# MÉTRICAS DEL BUSCADOR
+# =========================
+
+ASSISTANT_STAGE = register(Histogram(
+    "assistant_stage_seconds",
+    "Duración de cada etapa de /assistant",
+    labels=("stage",),
+))
+ASSISTANT_REQUESTS = register(Counter(
+    "assistant_requests_total",
+    "Requests a /assistant por resultado",
+    labels=("outcome",),
+))
+SEARCH_SCANNED = register(Histogram(
+    "search_candidates_scanned",
+    "Filas candidatas evaluadas por búsqueda",
+    buckets=SIZE_BUCKETS,
+))
+SEARCH_RETURNED = register(Histogram(
+    "search_results_returned",
+    "Filas que cumplen los filtros por búsqueda",
+    buckets=SIZE_BUCKETS,
+))
+SEARCH_PATH = register(Counter(
+    "search_path_total",
+    "Búsquedas por camino (index / refinement)",
+    labels=("path",),
+))
+SIMILAR_SECONDS = register(Histogram(
+    "similar_seconds",
+    "Duración de /similar (vecinos + armado de la respuesta)",
+))
+PERCOLATE_SECONDS = register(Histogram(
+    "percolate_seconds",
+    "Duración de cada cruce de propiedades nuevas con búsquedas guardadas",
+))
+PERCOLATE_MATCHES = register(Counter(
+    "percolate_matches_total",
+    "Coincidencias (búsqueda guardada, propiedad) encontradas",
+))
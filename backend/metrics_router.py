@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Response
+
+from backend.data_loader import current_snapshot
+from backend.executor import search_executor
+from backend.llm_interpreter import interpreter
+from backend.metrics import Collector, register, render_metrics
+from backend.result_cache import result_cache
+from backend.session_store import session_store
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# =========================
+# ESTADO DEL PROCESO (al momento del scrape)
+# =========================
+
+def data_metrics():
+    snapshot = current_snapshot()
+    yield "data_version", "gauge", "Versión de la data publicada", snapshot.version
+    yield "data_properties", "gauge", "Propiedades en el snapshot publicado", snapshot.store.size
+    yield "data_load_seconds", "gauge", "Duración de la última carga de data", snapshot.load_seconds
+    yield "data_loaded_timestamp_seconds", "gauge", "Momento de la última carga de data", snapshot.loaded_at
+
+
+def cache_metrics():
+    stats = result_cache.stats()
+    yield "result_cache_entries", "gauge", "Respuestas en el cache", stats["size"]
+    yield "result_cache_maxsize", "gauge", "Capacidad del cache de respuestas", stats["maxsize"]
+    for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        yield f"result_cache_{name}_total", "counter", f"Cache de respuestas: {name}", stats[name]
+
+    sessions = session_store.stats()
+    yield "session_hits_total", "counter", "Sesiones encontradas", sessions["hits"]
+    yield "session_misses_total", "counter", "Sesiones no encontradas", sessions["misses"]
+    yield "session_entries", "gauge", "Sesiones en memoria", sessions.get("sessions")
+
+
+def interpreter_metrics():
+    stats = interpreter.stats()
+    for name in ("calls", "coalesced", "timeouts", "errors"):
+        yield f"llm_{name}_total", "counter", f"Intérprete LLM: {name}", stats[name]
+    yield "llm_inflight", "gauge", "Llamadas LLM en curso", stats["inflight"]
+    yield "llm_cache_hits_total", "counter", "Cache del intérprete LLM: hits", stats["cache"]["hits"]
+    yield "llm_cache_misses_total", "counter", "Cache del intérprete LLM: misses", stats["cache"]["misses"]
+
+
+def executor_metrics():
+    stats = search_executor.stats()
+    yield "search_executor_pending", "gauge", "Búsquedas en cola o en ejecución", stats["pending"]
+    yield "search_executor_workers", "gauge", "Hilos del executor de búsqueda", stats["workers"]
+    for name in ("completed", "rejected", "timeouts"):
+        yield f"search_executor_{name}_total", "counter", f"Executor de búsqueda: {name}", stats[name]
+
+
+for collect in (data_metrics, cache_metrics, interpreter_metrics, executor_metrics):
+    register(Collector(collect))
+
+
+@router.get("/metrics")
+def metrics():
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,104 @@
+# backend/ndjson.py
+"""
+Lectura / escritura de registros en streaming.
+
+- iter_records: lee un archivo .ndjson (un JSON por línea) o un .json
+  con un array, registro a registro, sin cargar el archivo entero.
+- write_ndjson: escribe registros a medida que llegan (archivo temporal
+  + reemplazo al final).
+
+Memoria constante respecto al tamaño del feed.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Elementos de un array JSON de nivel superior, uno a la vez.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        started = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        while True:
+            # saltar espacios, '[' inicial y comas
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == "," or (not started and buf[pos] == "[")):
+                if buf[pos] == "[":
+                    started = True
+                pos += 1
+            if pos >= len(buf):
+                if not fill():
+                    return
+                continue
+            if buf[pos] == "]":
+                return
+
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+
+            # un número al final del buffer puede estar cortado
+            if end == len(buf) and not eof and not isinstance(value, (dict, list)):
+                fill()
+                continue
+
+            pos = end
+            yield value
+
+
+def iter_ndjson(path: Path) -> Iterator[Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_records(path: Path) -> Iterator[Any]:
+    """
+    Registros de un .ndjson o de un .json (array), en streaming.
+    """
+    path = Path(path)
+    if path.suffix == ".ndjson":
+        return iter_ndjson(path)
+    return iter_json_array(path)
+
+
+def write_ndjson(path: Path, records: Iterable[Any]) -> int:
+    """
+    Escribe un registro por línea a medida que se consumen.
+    Devuelve la cantidad escrita.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
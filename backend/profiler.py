@@ -0,0 +1,159 @@
+# backend/profiler.py
+"""
+Profiler por muestreo, activable por request.
+
+Con el header `X-Profile: <ADMIN_TOKEN>` el request se ejecuta con un
+hilo que muestrea las pilas de todos los hilos cada PROFILE_INTERVAL
+segundos (incluye el executor de búsqueda). El perfil cubre hasta el
+último fragmento del cuerpo (en respuestas NDJSON en streaming el
+trabajo ocurre al generarlo) y se escribe en formato "folded" (una pila
+por línea + cantidad de muestras, el que consumen flamegraph.pl /
+speedscope) en PROFILE_DIR; la respuesta lleva su nombre en
+`X-Profile-File` (el archivo existe una vez terminado el cuerpo).
+
+Sin el header no hay costo. Un solo perfil a la vez: mientras hay uno
+en curso, los demás requests con el header pasan sin perfilar.
+"""
+
+import asyncio
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+from backend.admin_router import ADMIN_TOKEN
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(BASE_DIR / "data" / "profiles")))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+PROFILE_HEADER = b"x-profile"
+
+# hilos esperando trabajo (pool vacío, event loop en select, reloader dormido)
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py", os.path.join("concurrent", "futures", "thread.py"))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}:{code.co_name}"
+
+
+class Sampler:
+    """
+    Muestreo de pilas en un hilo aparte (sys._current_frames).
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_filename.endswith(IDLE_MODULES):
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+# =========================
+# MIDDLEWARE
+# =========================
+
+_PROFILE_LOCK = threading.Lock()
+
+
+def wants_profile(headers) -> bool:
+    token = None
+    for name, value in headers:
+        if name == PROFILE_HEADER:
+            token = value.decode("latin-1")
+    return bool(ADMIN_TOKEN and token and secrets.compare_digest(token, ADMIN_TOKEN))
+
+
+def profile_path(path: str) -> Path:
+    label = path.strip("/").replace("/", "_") or "root"
+    return PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{secrets.token_hex(3)}.folded"
+
+
+def stop_and_write(sampler: Sampler, target: Path) -> Path:
+    """
+    Bloqueante (join del hilo + disco): se corre fuera del event loop.
+    """
+    sampler.stop()
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    target.write_text(sampler.folded(), encoding="utf-8")
+    return target
+
+
+class ProfileMiddleware:
+    """
+    Middleware ASGI: perfila el request si trae el header (ver arriba).
+    Sin el header sólo se revisan los headers del request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not wants_profile(scope["headers"])
+            or not _PROFILE_LOCK.acquire(blocking=False)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = Sampler()
+        target = profile_path(scope["path"])
+        done = False
+
+        async def finish():
+            nonlocal done
+            if not done:
+                done = True
+                await asyncio.get_running_loop().run_in_executor(None, stop_and_write, sampler, target)
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", target.name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # último fragmento del cuerpo: recién ahí termina el trabajo
+                await finish()
+
+        try:
+            sampler.start()
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            try:
+                await finish()
+            finally:
+                _PROFILE_LOCK.release()
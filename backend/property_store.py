@@ -0,0 +1,482 @@
+# backend/property_store.py
+"""
+Store columnar de propiedades (NumPy).
+
+Se construye a partir de la salida de bootstrap_data(): cada filtro de
+búsqueda se evalúa sobre arrays en vez de dicts anidados, y los dicts
+sólo se arman para las filas que se devuelven.
+"""
+
+from array import array
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.serialization import encode_property
+from backend.utils import comuna_key
+
+
+def as_number(value: Any) -> float:
+    """
+    Valor numérico de una celda; NaN si falta o no es número.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float("nan")
+
+
+def _as_seq(value: Any) -> float:
+    # códigos de la fuente son correlativos → proxy de antigüedad
+    if isinstance(value, str) and value.isdigit():
+        return float(value)
+    return as_number(value)
+
+
+def _prop_path(prop: dict, *keys) -> Any:
+    value: Any = prop
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _superficie(prop: dict) -> float:
+    # enriquecimientos anteriores a superficie_m2 sólo la traen en raw
+    value = as_number(_prop_path(prop, "caracteristicas", "superficie_m2"))
+    if not np.isnan(value):
+        return value
+    for key in ("superficie_construida", "superficie_total"):
+        value = as_number(_prop_path(prop, "raw", key))
+        if value > 0:
+            return value
+    return float("nan")
+
+
+class PatchedSequence(Sequence):
+    """
+    Secuencia = base reindexada + valores reemplazados por fila.
+    source[i] = fila en la base (-1 si el valor viene de `patched`).
+    """
+
+    @classmethod
+    def over(cls, base: Sequence, source: np.ndarray, patched: Dict[int, Any]) -> "PatchedSequence":
+        """
+        Como el constructor, pero si `base` ya es una PatchedSequence se
+        apunta a SU base: deltas encadenados quedan en un solo nivel (un
+        único `source` y una lectura directa por fila).
+        """
+        if not isinstance(base, PatchedSequence):
+            return cls(base, source, patched)
+
+        kept = source >= 0
+        # fila de `base` → fila nueva (-1 = eliminada)
+        position = np.full(len(base), -1, dtype=np.int64)
+        position[source[kept]] = np.flatnonzero(kept)
+        inherited = {
+            int(position[row]): value
+            for row, value in base.patched.items()
+            if position[row] >= 0
+        }
+        flat = np.full(len(source), -1, dtype=np.int64)
+        flat[kept] = base.source[source[kept]]
+        return cls(base._base, flat, {**inherited, **patched})
+
+    def __init__(self, base: Sequence, source: np.ndarray, patched: Dict[int, Any]):
+        self._base = base
+        self._source = source
+        self._patched = patched
+
+    @property
+    def source(self) -> np.ndarray:
+        return self._source
+
+    @property
+    def patched(self) -> Dict[int, Any]:
+        return self._patched
+
+    def __len__(self) -> int:
+        return len(self._source)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        value = self._patched.get(i)
+        if value is not None:
+            return value
+        return self._base[int(self._source[i])]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class Categorical:
+    """
+    Columna categórica: códigos int32 (-1 = sin valor) + etiquetas.
+    """
+
+    def __init__(self, labels: List[Hashable], codes: np.ndarray):
+        self.labels = labels
+        self.lookup: Dict[Hashable, int] = {label: i for i, label in enumerate(labels)}
+        self.codes = codes
+
+    @classmethod
+    def from_values(cls, values: List[Optional[Hashable]]) -> "Categorical":
+        labels: List[Hashable] = []
+        lookup: Dict[Hashable, int] = {}
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None or value == "":
+                codes[i] = -1
+                continue
+            code = lookup.get(value)
+            if code is None:
+                code = len(labels)
+                lookup[value] = code
+                labels.append(value)
+            codes[i] = code
+        return cls(labels, codes)
+
+    def code(self, value: Optional[Hashable]) -> int:
+        return self.lookup.get(value, -1)
+
+
+# Columnas numéricas/booleanas del store (mismo nombre que el atributo)
+NUMERIC_COLUMNS = (
+    "price_uf",
+    "price_clp",
+    "visible",
+    "dormitorios",
+    "banos",
+    "gastos_comunes",
+    "superficie",
+    "source_seq",
+)
+
+CATEGORICAL_COLUMNS = ("comuna", "operacion", "sector")
+
+
+class ColumnBuilder:
+    """
+    Acumula las columnas del store fila a fila (arrays compactos, sin
+    guardar los dicts): sirve tanto para from_properties como para
+    escribir un snapshot en streaming.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._numeric = {name: array("d") for name in NUMERIC_COLUMNS if name != "visible"}
+        self._visible = array("b")
+        self._codes = {name: array("i") for name in CATEGORICAL_COLUMNS}
+        self._lookup: Dict[str, Dict[Hashable, int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+        self._amenity_rows: Dict[str, List[int]] = {}
+        self._ids: List[str] = []
+
+    def _code(self, name: str, value: Optional[Hashable]) -> int:
+        if value is None or value == "":
+            return -1
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(lookup)
+        return code
+
+    def append(self, prop: dict) -> None:
+        i = self.size
+        self.size += 1
+        numeric = self._numeric
+
+        precio = prop.get("precio") or {}
+        self._visible.append(bool(precio.get("visible")))
+        numeric["price_uf"].append(as_number(precio.get("uf") or precio.get("valor")))
+        numeric["price_clp"].append(as_number(precio.get("clp") or precio.get("valor")))
+
+        numeric["dormitorios"].append(as_number(_prop_path(prop, "caracteristicas", "dormitorios")))
+        numeric["banos"].append(as_number(_prop_path(prop, "caracteristicas", "banos")))
+        numeric["gastos_comunes"].append(
+            as_number(_prop_path(prop, "caracteristicas", "gastos_comunes_clp"))
+        )
+        numeric["superficie"].append(_superficie(prop))
+        numeric["source_seq"].append(_as_seq(prop.get("source_id")))
+
+        # comuna se indexa normalizada (comuna_key), igual que el filtro
+        self._codes["comuna"].append(self._code("comuna", comuna_key(_prop_path(prop, "ubicacion", "comuna"))))
+        self._codes["operacion"].append(self._code("operacion", prop.get("operacion")))
+        sector = _prop_path(prop, "ubicacion", "sector")
+        self._codes["sector"].append(
+            self._code("sector", sector.strip() if isinstance(sector, str) else None)
+        )
+
+        for name, value in (prop.get("amenities") or {}).items():
+            if value:
+                self._amenity_rows.setdefault(name, []).append(i)
+
+        self._ids.append(str(prop.get("id")))
+
+    def build(self):
+        """
+        (columns, categoricals, amenities, ids) listos para PropertyStore.
+        """
+        columns = {name: np.array(values, dtype=np.float64) for name, values in self._numeric.items()}
+        columns["visible"] = np.array(self._visible, dtype=bool)
+
+        categoricals = {}
+        for name in CATEGORICAL_COLUMNS:
+            labels = list(self._lookup[name])
+            codes = np.array(self._codes[name], dtype=np.int32)
+            categoricals[name] = Categorical(labels, codes)
+
+        amenities: Dict[str, np.ndarray] = {}
+        for name, rows in self._amenity_rows.items():
+            column = np.zeros(self.size, dtype=bool)
+            column[rows] = True
+            amenities[name] = column
+
+        return columns, categoricals, amenities, np.array(self._ids, dtype=str)
+
+
+class PropertyStore:
+    """
+    Columnas:
+    - price_uf / price_clp: precio comparable (mismas reglas que cumple_precio)
+    - visible, dormitorios, banos, gastos_comunes, superficie (m²)
+    - source_seq: código numérico de la fuente (orden "recientes")
+    - comuna / operacion / sector como categóricas
+    - amenities: una columna booleana por amenity
+    - encoded: cuerpo JSON pre-codificado (bytes) de cada propiedad
+    - ids: id de cada propiedad (para aplicar deltas)
+
+    `rows` y `encoded` sólo necesitan indexarse por fila: pueden ser
+    listas o secuencias perezosas (ver backend/snapshot.py).
+    """
+
+    def __init__(
+        self,
+        rows: Sequence[dict],
+        columns: Dict[str, np.ndarray],
+        categoricals: Dict[str, Categorical],
+        amenities: Dict[str, np.ndarray],
+        encoded: Sequence[bytes],
+        ids: np.ndarray,
+    ):
+        self.rows = rows
+        self.size = len(rows)
+        self.ids = ids
+
+        self.price_uf = columns["price_uf"]
+        self.price_clp = columns["price_clp"]
+        self.visible = columns["visible"]
+        self.dormitorios = columns["dormitorios"]
+        self.banos = columns["banos"]
+        self.gastos_comunes = columns["gastos_comunes"]
+        self.superficie = columns["superficie"]
+        self.source_seq = columns["source_seq"]
+
+        # comuna se indexa normalizada (comuna_key: minúsculas y sin tildes), igual que el filtro
+        self.comuna = categoricals["comuna"]
+        self.operacion = categoricals["operacion"]
+        self.sector = categoricals["sector"]
+
+        self.amenities = amenities
+        self.encoded = encoded
+        self._row_by_id: Optional[Dict[str, int]] = None
+        # sólo en stores salidos de apply_delta: (fila → fila en el store
+        # anterior o -1, filas nuevas / reemplazadas) para parchar índices
+        self.delta: Optional[Tuple[np.ndarray, Dict[int, dict]]] = None
+
+    @classmethod
+    def from_properties(cls, properties: List[dict]) -> "PropertyStore":
+        builder = ColumnBuilder()
+        for prop in properties:
+            builder.append(prop)
+        columns, categoricals, amenities, ids = builder.build()
+
+        return cls(
+            properties,
+            columns,
+            categoricals,
+            amenities,
+            [encode_property(p) for p in properties],
+            ids,
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        return getattr(self, name)
+
+    def row_of(self, property_id) -> Optional[int]:
+        """
+        Fila de un id (None si no está). El mapa se arma al primer uso:
+        el store no cambia (un delta crea otro).
+        """
+        if self._row_by_id is None:
+            self._row_by_id = {rid: i for i, rid in enumerate(self.ids.tolist())}
+        return self._row_by_id.get(str(property_id))
+
+    # =========================
+    # DELTAS
+    # =========================
+
+    def apply_delta(self, upserts: List[dict], removed_ids: List[str]) -> "PropertyStore":
+        """
+        Store NUEVO con el delta aplicado (el actual no se modifica):
+        - upserts con id existente → se reemplazan en su fila
+        - upserts nuevos → se agregan al final
+        - removed_ids → se eliminan
+
+        Sólo se construyen columnas para los registros del delta; el resto
+        se copia columna a columna sin tocar dicts.
+        """
+        drop = np.zeros(self.size, dtype=bool)
+        for rid in removed_ids:
+            row = self.row_of(rid)
+            if row is not None:
+                drop[row] = True
+
+        updated_rows: List[int] = []
+        updated: List[dict] = []
+        appended: List[dict] = []
+        for prop in upserts:
+            row = self.row_of(prop.get("id"))
+            if row is None:
+                appended.append(prop)
+            else:
+                updated_rows.append(row)
+                updated.append(prop)
+
+        patch = PropertyStore.from_properties(updated + appended)
+        n_updated = len(updated)
+        keep = ~np.concatenate([drop, np.zeros(len(appended), dtype=bool)])
+
+        def combine(base: np.ndarray, patched: np.ndarray) -> np.ndarray:
+            column = np.concatenate([base, patched[n_updated:]])
+            column[updated_rows] = patched[:n_updated]
+            return column[keep]
+
+        columns = {
+            name: combine(self.column(name), patch.column(name))
+            for name in NUMERIC_COLUMNS
+        }
+
+        categoricals = {}
+        for name in CATEGORICAL_COLUMNS:
+            base: Categorical = self.column(name)
+            labels = list(base.labels)
+            lookup = dict(base.lookup)
+            for label in patch.column(name).labels:
+                if label not in lookup:
+                    lookup[label] = len(labels)
+                    labels.append(label)
+            remap = np.array([lookup[label] for label in patch.column(name).labels] + [-1], dtype=np.int32)
+            # código -1 → última posición de remap (-1)
+            patch_codes = remap[patch.column(name).codes]
+            categoricals[name] = Categorical(labels, combine(base.codes, patch_codes))
+
+        amenities = {}
+        for name in set(self.amenities) | set(patch.amenities):
+            base_col = self.amenities.get(name)
+            patch_col = patch.amenities.get(name)
+            if base_col is None:
+                base_col = np.zeros(self.size, dtype=bool)
+            if patch_col is None:
+                patch_col = np.zeros(patch.size, dtype=bool)
+            amenities[name] = combine(base_col, patch_col)
+
+        # filas / JSON: referencias a la base + valores del delta
+        source = np.concatenate([np.arange(self.size), np.full(len(appended), -1)])
+        patched_rows: Dict[int, dict] = {}
+        patched_encoded: Dict[int, bytes] = {}
+        for i, prop in enumerate(updated + appended):
+            row = updated_rows[i] if i < n_updated else self.size + i - n_updated
+            patched_rows[row] = prop
+            patched_encoded[row] = patch.encoded[i]
+
+        position = np.cumsum(keep) - 1
+        new_source = source[keep]
+
+        def remap_patched(values: Dict[int, Any]) -> Dict[int, Any]:
+            return {int(position[row]): v for row, v in values.items() if keep[row]}
+
+        patched_rows = remap_patched(patched_rows)
+        store = PropertyStore(
+            PatchedSequence.over(self.rows, new_source, patched_rows),
+            columns,
+            categoricals,
+            amenities,
+            PatchedSequence.over(self.encoded, new_source, remap_patched(patched_encoded)),
+            combine(self.ids, patch.ids),
+        )
+        store.delta = (new_source, patched_rows)
+        return store
+
+    def materialize(self, rows) -> List[dict]:
+        """
+        Arma la lista de dicts sólo para las filas pedidas.
+        """
+        props = self.rows
+        return [props[i] for i in np.asarray(rows).tolist()]
+
+    def encoded_rows(self, rows) -> List[bytes]:
+        encoded = self.encoded
+        return [encoded[i] for i in np.asarray(rows).tolist()]
+
+    # =========================
+    # PREDICADOS VECTORIZADOS
+    # =========================
+
+    def mask(
+        self,
+        rows: Optional[np.ndarray] = None,
+        comuna: Optional[str] = None,
+        operacion: Optional[str] = None,
+        precio_max_uf=None,
+        precio_max_clp=None,
+        amenities: Optional[List[str]] = None,
+        dormitorios_min=None,
+        banos_min=None,
+        gastos_comunes_max_clp=None,
+    ) -> np.ndarray:
+        """
+        Evalúa todos los filtros como UNA máscara booleana sobre `rows`
+        (o sobre todo el store si rows es None).
+        """
+
+        def col(values: np.ndarray) -> np.ndarray:
+            return values if rows is None else values[rows]
+
+        size = self.size if rows is None else len(rows)
+        keep = np.ones(size, dtype=bool)
+
+        # código -1 = "sin valor": un filtro desconocido no debe calzar con él
+        if comuna:
+            code = self.comuna.code(comuna_key(comuna))
+            keep &= (col(self.comuna.codes) == code) if code >= 0 else False
+
+        if operacion:
+            code = self.operacion.code(operacion)
+            keep &= (col(self.operacion.codes) == code) if code >= 0 else False
+
+        # Si hay filtro de precio pero el precio no es visible → descartar
+        if precio_max_clp or precio_max_uf:
+            keep &= col(self.visible)
+
+        # NaN nunca cumple "<=" → sin precio queda fuera
+        if operacion == "venta" and precio_max_uf is not None:
+            keep &= col(self.price_uf) <= precio_max_uf
+        elif operacion == "arriendo" and precio_max_clp is not None:
+            keep &= col(self.price_clp) <= precio_max_clp
+
+        for name in amenities or []:
+            column = self.amenities.get(name)
+            keep &= col(column) if column is not None else False
+
+        if dormitorios_min is not None:
+            keep &= col(self.dormitorios) >= dormitorios_min
+        if banos_min is not None:
+            keep &= col(self.banos) >= banos_min
+        if gastos_comunes_max_clp is not None:
+            keep &= col(self.gastos_comunes) <= gastos_comunes_max_clp
+
+        return keep
@@ -0,0 +1,220 @@
+# backend/relaxation.py
+"""
+Planificador de relajaciones para resultados vacíos o muy chicos.
+
+En vez de sugerir "probar otra comuna o aumentar presupuesto" a ciegas,
+se evalúan consultas relajadas con conteos exactos del índice
+(PropertyIndex.query: conjunto candidato + máscara, nunca un recorrido
+de dicts):
+
+- quitar un amenity (y todos a la vez)
+- subir el precio máximo al siguiente valor con oferta: sobre los
+  precios del resultado SIN filtro de precio (ordenados) se toma el que
+  da al menos RELAX_TARGET resultados; el conteo sale de la misma
+  búsqueda binaria
+- cambiar la comuna por una vecina (lexicon.comunas_vecinas)
+- quitar el texto libre
+- como último recurso, quitar el precio o la comuna
+
+Cada candidata tiene un costo (qué tanto se aleja de lo pedido); se
+devuelven las RELAX_TOP más baratas que mejoran el resultado. Todo se
+corta al agotar RELAX_BUDGET segundos: lo ya evaluado se devuelve.
+"""
+
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.lexicon import comunas_vecinas
+from backend.utils import comuna_key
+from backend.text_index import analyze
+
+RELAX_THRESHOLD = int(os.getenv("RELAX_THRESHOLD", "3"))
+RELAX_TARGET = int(os.getenv("RELAX_TARGET", "5"))
+RELAX_TOP = int(os.getenv("RELAX_TOP", "3"))
+RELAX_NEIGHBOURS = int(os.getenv("RELAX_NEIGHBOURS", "4"))
+RELAX_BUDGET = float(os.getenv("RELAX_BUDGET", "0.01"))
+
+# filtros que entiende PropertyIndex.query (+ texto libre)
+SEARCH_FILTERS = (
+    "comuna", "operacion", "precio_max_uf", "precio_max_clp", "amenities",
+    "dormitorios_min", "banos_min", "gastos_comunes_max_clp", "texto",
+)
+
+# costo base de cada tipo de relajación (menor = más cerca de lo pedido)
+COST_DROP_AMENITY = 1.0
+COST_NEIGHBOUR = 1.5
+COST_DROP_TEXT = 2.0
+COST_DROP_PRICE = 3.0
+COST_DROP_COMUNA = 4.0
+
+
+class Relaxation:
+
+    def __init__(self, filters: Dict[str, Any], change: str, count: int, cost: float):
+        self.filters = filters
+        self.change = change
+        self.count = count
+        self.cost = cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"change": self.change, "count": self.count, "filters": self.filters}
+
+
+def _without(filters: Dict[str, Any], *names: str) -> Dict[str, Any]:
+    return {k: v for k, v in filters.items() if k not in names}
+
+
+def nice_ceiling(value: float) -> float:
+    """
+    Redondea hacia arriba a 2 cifras significativas (612.345 → 620.000).
+    """
+    if value <= 0:
+        return value
+    step = 10 ** max(int(math.floor(math.log10(value))) - 1, 0)
+    return math.ceil(value / step) * step
+
+
+def format_cap(value: float, moneda: str) -> str:
+    amount = f"{int(value):,}".replace(",", ".")
+    return f"${amount}" if moneda == "clp" else f"{amount} UF"
+
+
+class RelaxationPlanner:
+
+    def __init__(self, snapshot, budget: float = RELAX_BUDGET):
+        self.index = snapshot.index
+        self.store = snapshot.store
+        self.budget = budget
+        self.deadline = 0.0
+        self.seen = set()
+
+    def rows(self, filters: Dict[str, Any]) -> np.ndarray:
+        rows = self.index.query(**_without(filters, "texto"))
+        terms = analyze(filters.get("texto"))
+        if terms and len(rows):
+            scores = self.index.text.score(terms, rows)
+            if scores is not None:
+                rows = rows[scores > 0]
+        return rows
+
+    def count(self, filters: Dict[str, Any]) -> int:
+        return int(len(self.rows(filters)))
+
+    def expired(self) -> bool:
+        return time.perf_counter() > self.deadline
+
+    # =========================
+    # CANDIDATAS
+    # =========================
+
+    def drop_amenities(self, filters: Dict[str, Any]):
+        amenities = filters.get("amenities") or []
+        for name in amenities:
+            rest = [a for a in amenities if a != name]
+            relaxed = {**filters, "amenities": rest} if rest else _without(filters, "amenities")
+            yield relaxed, f"sin {name}", COST_DROP_AMENITY
+        if len(amenities) > 1:
+            yield _without(filters, "amenities"), "sin amenities", COST_DROP_AMENITY * len(amenities)
+
+    def raise_price(self, filters: Dict[str, Any]) -> Optional[Relaxation]:
+        operacion = filters.get("operacion")
+        moneda = {"venta": "uf", "arriendo": "clp"}.get(operacion)
+        key = f"precio_max_{moneda}" if moneda else None
+        if not key or filters.get(key) is None:
+            return None
+
+        cap = filters[key]
+        base = _without(filters, "precio_max_uf", "precio_max_clp")
+        rows = self.rows(base)
+        rows = rows[self.store.visible[rows]]
+        prices = np.sort(self.store.column(f"price_{moneda}")[rows])
+        prices = prices[~np.isnan(prices)]
+
+        current = int(np.searchsorted(prices, cap, side="right"))
+        if current >= len(prices):
+            return None  # subir el precio no agrega nada
+
+        # siguiente precio con oferta que llega a RELAX_TARGET (o a lo que haya)
+        target = min(max(current + 1, RELAX_TARGET), len(prices))
+        new_cap = nice_ceiling(float(prices[target - 1]))
+        count = int(np.searchsorted(prices, new_cap, side="right"))
+        relaxed = {**filters, key: int(new_cap) if float(new_cap).is_integer() else new_cap}
+        # costo: cuánto sube el presupuesto (+20% ≈ quitar un amenity); nunca
+        # más caro que quitar el precio, que es un resultado más amplio
+        cost = min(1.0 + 5.0 * (new_cap / cap - 1.0), COST_DROP_PRICE - 0.5) if cap else COST_DROP_PRICE
+        return Relaxation(relaxed, f"hasta {format_cap(new_cap, moneda)}", count, cost)
+
+    def neighbours(self, filters: Dict[str, Any]):
+        comuna = filters.get("comuna")
+        if not comuna:
+            return
+        by_comuna, labels = self.index.by_comuna, self.store.comuna
+        vecinas = comunas_vecinas(comuna)
+        # primero las vecinas con más oferta
+        vecinas.sort(key=lambda v: -len(by_comuna.get(labels.code(comuna_key(v)))))
+        for vecina in vecinas[:RELAX_NEIGHBOURS]:
+            yield {**filters, "comuna": comuna_key(vecina)}, f"en {vecina}", COST_NEIGHBOUR
+
+    def fallbacks(self, filters: Dict[str, Any]):
+        if filters.get("texto"):
+            yield _without(filters, "texto"), f'sin "{filters["texto"]}"', COST_DROP_TEXT
+        if filters.get("precio_max_uf") is not None or filters.get("precio_max_clp") is not None:
+            yield _without(filters, "precio_max_uf", "precio_max_clp"), "sin precio máximo", COST_DROP_PRICE
+        if filters.get("comuna"):
+            yield _without(filters, "comuna"), "en cualquier comuna", COST_DROP_COMUNA
+
+    # =========================
+    # PLAN
+    # =========================
+
+    def plan(self, filters: Dict[str, Any], total: int, top: int = RELAX_TOP) -> List[Relaxation]:
+        """
+        Hasta `top` relajaciones con más resultados que `total`,
+        ordenadas por costo (y luego por cantidad).
+        """
+        self.deadline = time.perf_counter() + self.budget
+        filters = {k: v for k, v in filters.items() if k in SEARCH_FILTERS and v not in (None, [])}
+        found: List[Relaxation] = []
+
+        def consider(relaxed: Dict[str, Any], change: str, cost: float) -> None:
+            key = repr(sorted(relaxed.items()))
+            if key in self.seen:
+                return
+            self.seen.add(key)
+            count = self.count(relaxed)
+            if count > total:
+                found.append(Relaxation(relaxed, change, count, cost))
+
+        for relaxed, change, cost in self.drop_amenities(filters):
+            if self.expired():
+                break
+            consider(relaxed, change, cost)
+
+        if not self.expired():
+            raised = self.raise_price(filters)
+            if raised is not None and raised.count > total:
+                found.append(raised)
+
+        for source in (self.neighbours(filters), self.fallbacks(filters)):
+            for relaxed, change, cost in source:
+                if self.expired():
+                    break
+                consider(relaxed, change, cost)
+
+        found.sort(key=lambda r: (r.cost, -r.count))
+        return found[:top]
+
+
+def relax(snapshot, filters: Dict[str, Any], total: int,
+          threshold: int = RELAX_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Relajaciones (dicts para meta) si el resultado tiene `threshold` o
+    menos propiedades; lista vacía si no hace falta.
+    """
+    if total > threshold:
+        return []
+    return [r.to_dict() for r in RelaxationPlanner(snapshot).plan(filters, total)]
@@ -0,0 +1,132 @@
+# backend/result_cache.py
+"""
+Cache de respuestas ya serializadas.
+
+La clave es el dict de filtros canonicalizado (más paginación / orden /
+proyección). Cada entrada queda atada a la versión de la data
+(DataSnapshot.version): al publicarse una versión nueva el cache se
+vacía solo. Acotado por tamaño (LRU) y por edad (TTL).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))
+
+
+def _freeze(value: Any, fold_text: bool = False) -> Hashable:
+    """
+    `fold_text`: normaliza las cadenas (espacios, mayúsculas). Sólo para
+    valores de texto libre; nombres de campos / orden se respetan tal cual.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v, fold_text)) for k, v in value.items() if v is not None))
+    if isinstance(value, (list, tuple, set)):
+        items = [_freeze(v, fold_text) for v in value]
+        return tuple(sorted(items) if isinstance(value, set) else items)
+    if isinstance(value, str) and fold_text:
+        return value.strip().lower()
+    return value
+
+
+def canonical_key(filters: Dict[str, Any], **extra) -> Hashable:
+    """
+    Clave estable: mismo contenido → misma clave, sin importar el orden
+    de las llaves o filtros en None. Los valores de los filtros no
+    distinguen mayúsculas; `extra` (fields, sort, ...) sí.
+    """
+    return _freeze(filters, fold_text=True), _freeze(extra)
+
+
+class ResultCache:
+    """
+    LRU + TTL, seguro entre hilos. maxsize <= 0 lo deshabilita.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version: int) -> bool:
+        """
+        Vacía el cache si llegó una versión nueva de la data.
+        False si `version` es más vieja que la vigente.
+        """
+        if self.version == version:
+            return True
+        if self.version is not None and version < self.version:
+            return False
+        if self._entries:
+            self.invalidations += 1
+            self._entries.clear()
+        self.version = version
+        return True
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            if not self._sync_version(version):
+                self.misses += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: int) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            # un request lento de una versión anterior no pisa la nueva
+            if not self._sync_version(version):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# cache compartido de /assistant
+result_cache = ResultCache()
@@ -0,0 +1,79 @@
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel
+
+from backend.assistant_router import extract_filters_from_text
+from backend.data_loader import current_snapshot
+from backend.saved_searches import AMENITY_BITS, InvalidFilters, normalize_filters, saved_searches
+from backend.serialization import splice_response
+from backend.session_store import merge_filters, session_store
+
+router = APIRouter(prefix="/saved-searches")
+
+
+class SavedSearchRequest(BaseModel):
+    # filtros explícitos, o el mensaje / la sesión de /assistant
+    filters: Optional[Dict[str, Any]] = None
+    message: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+def request_filters(req: SavedSearchRequest, session) -> Dict[str, Any]:
+    if req.filters is not None:
+        return normalize_filters(req.filters)
+    filters = session.filters if session is not None else {}
+    if req.message:
+        filters = merge_filters(filters, extract_filters_from_text(req.message))
+    return normalize_filters(filters)
+
+
+def get_or_404(search_id: str):
+    search = saved_searches.get(search_id)
+    if search is None:
+        raise HTTPException(status_code=404, detail="Búsqueda no encontrada")
+    return search
+
+
+@router.post("")
+async def create_saved_search(req: SavedSearchRequest):
+    session = await session_store.aload(req.session_id) if req.session_id else None
+    try:
+        filters = request_filters(req, session)
+    except InvalidFilters as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not filters:
+        raise HTTPException(status_code=400, detail="La búsqueda no tiene filtros")
+    unknown = [a for a in filters.get("amenities", []) if a not in AMENITY_BITS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Amenities desconocidos: {', '.join(unknown)}")
+    return saved_searches.add(filters).to_dict()
+
+
+@router.get("/{search_id}")
+def get_saved_search(search_id: str):
+    search = get_or_404(search_id)
+    return {**search.to_dict(), "pending": len(saved_searches.matches(search_id))}
+
+
+@router.delete("/{search_id}")
+def delete_saved_search(search_id: str):
+    if not saved_searches.delete(search_id):
+        raise HTTPException(status_code=404, detail="Búsqueda no encontrada")
+    return {"status": "deleted", "id": search_id}
+
+
+@router.get("/{search_id}/matches")
+def saved_search_matches(search_id: str, clear: bool = False):
+    """
+    Propiedades nuevas o cambiadas que calzaron desde la última entrega
+    (`clear=true` las marca como entregadas). Las que ya no están en la
+    data vigente se omiten de `results`.
+    """
+    get_or_404(search_id)
+    matches = saved_searches.matches(search_id, clear=clear)
+    store = current_snapshot().store
+    rows = [row for row in (store.row_of(m["id"]) for m in matches) if row is not None]
+    envelope = {"type": "matches", "id": search_id, "matches": matches}
+    return Response(content=splice_response(envelope, store.encoded_rows(rows)),
+                    media_type="application/json")
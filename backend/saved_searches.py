@@ -0,0 +1,582 @@
+# backend/saved_searches.py
+"""
+Búsquedas guardadas y alertas por propiedades nuevas (percolador).
+
+En vez de correr cada búsqueda guardada contra todo el dataset después
+de cada actualización (búsquedas × propiedades), se indexan las
+BÚSQUEDAS y cada propiedad nueva o cambiada se cruza sólo con las que
+podrían aceptarla:
+
+- grupos por (operacion, comuna); una búsqueda sin operación o sin
+  comuna va al grupo comodín correspondiente. Una propiedad mira a lo
+  más 4 grupos: (op, comuna), (op, *), (*, comuna), (*, *)
+- dentro de cada grupo, los topes de precio ordenados: las búsquedas
+  que aceptan el precio de la propiedad son un sufijo (bisección)
+- el resto de los filtros (amenities como bitmask, dormitorios, baños,
+  gastos comunes, texto) se evalúa como una máscara sobre esos candidatos
+
+Las reglas son las de PropertyStore.mask / search_scored, evaluadas
+sobre las columnas del store de la versión publicada.
+
+El índice es inmutable: alta / baja de búsquedas sólo lo marcan para
+reconstruirse en la siguiente percolación. Las búsquedas se guardan en
+un log NDJSON (alta / baja por línea) que todos los workers leen y
+sólo agregan; se compacta offline (scripts/compact_saved_searches.py).
+SAVED_SEARCHES_PATH vacío = sólo en memoria. Las coincidencias quedan
+en una bandeja por búsqueda en el backend de sesiones (a lo más
+SAVED_MATCHES_MAX, las más nuevas).
+"""
+
+import math
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from backend.amenities import AMENITIES_KEYWORDS
+from backend.data_loader import on_upserts
+from backend.metrics import PERCOLATE_MATCHES, PERCOLATE_SECONDS
+from backend.ndjson import iter_ndjson, write_ndjson
+from backend.serialization import dumps, loads
+from backend.session_store import SESSION_BACKEND, MemorySessionBackend, RedisSessionBackend
+from backend.text_index import analyze, document_fields
+from backend.utils import comuna_key
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SAVED_SEARCHES_PATH = os.getenv("SAVED_SEARCHES_PATH", str(BASE_DIR / "data" / "saved_searches.ndjson"))
+SAVED_MATCHES_MAX = int(os.getenv("SAVED_MATCHES_MAX", "200"))
+# bandejas: vida sin consultarse y cuántas guarda el backend en memoria
+SAVED_MATCHES_TTL = float(os.getenv("SAVED_MATCHES_TTL", str(30 * 86400)))
+SAVED_INBOX_MAX = int(os.getenv("SAVED_INBOX_MAX", "1000000"))
+# celdas (búsquedas × propiedades) por máscara al percolar un lote
+MATCH_CELLS = int(os.getenv("SAVED_MATCH_CELLS", "2000000"))
+
+# filtros que se pueden guardar (los de search_properties)
+SAVED_FILTERS = (
+    "comuna", "operacion", "precio_max_uf", "precio_max_clp", "amenities",
+    "dormitorios_min", "banos_min", "gastos_comunes_max_clp", "texto",
+)
+
+# un bit por amenity conocido; uno desconocido nunca calza
+AMENITY_BITS = {name: 1 << i for i, name in enumerate(sorted(AMENITIES_KEYWORDS))}
+UNKNOWN_AMENITY_BIT = 1 << 63
+
+
+NUMERIC_FILTERS = (
+    "precio_max_uf", "precio_max_clp", "dormitorios_min", "banos_min", "gastos_comunes_max_clp",
+)
+OPERACIONES = ("venta", "arriendo")
+
+
+class InvalidFilters(ValueError):
+    pass
+
+
+def _filter_number(name: str, value) -> Union[int, float]:
+    # bool es int en Python: "dormitorios_min": true no es un número
+    if isinstance(value, bool):
+        raise InvalidFilters(f"{name}: se esperaba un número")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidFilters(f"{name}: se esperaba un número") from None
+    if not math.isfinite(number) or number < 0:
+        raise InvalidFilters(f"{name}: se esperaba un número >= 0")
+    return int(number) if number.is_integer() else number
+
+
+def normalize_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sólo los filtros de búsqueda, sin vacíos, con su tipo (números
+    como número, comuna como comuna_key). Un valor que no se puede
+    interpretar → InvalidFilters: nunca llega a la percolación.
+    """
+    if filters is None:
+        return {}
+    if not isinstance(filters, dict):
+        raise InvalidFilters("filters: se esperaba un objeto")
+    clean = {k: v for k, v in filters.items() if k in SAVED_FILTERS and v not in (None, "", [])}
+
+    for name in ("comuna", "operacion", "texto"):
+        if name in clean and not isinstance(clean[name], str):
+            raise InvalidFilters(f"{name}: se esperaba texto")
+    if "comuna" in clean:
+        clean["comuna"] = comuna_key(clean["comuna"])
+    if "operacion" in clean:
+        clean["operacion"] = clean["operacion"].strip().lower()
+        if clean["operacion"] not in OPERACIONES:
+            raise InvalidFilters(f"operacion: debe ser {' o '.join(OPERACIONES)}")
+    for name in NUMERIC_FILTERS:
+        if name in clean:
+            clean[name] = _filter_number(name, clean[name])
+    if "amenities" in clean:
+        amenities = clean["amenities"]
+        if not isinstance(amenities, list) or not all(isinstance(a, str) for a in amenities):
+            raise InvalidFilters("amenities: se esperaba una lista de textos")
+        clean["amenities"] = sorted(set(amenities))
+    return clean
+
+
+def amenity_mask(names: Iterable[str]) -> int:
+    mask = 0
+    for name in names or []:
+        mask |= AMENITY_BITS.get(name, UNKNOWN_AMENITY_BIT)
+    return mask
+
+
+def _number(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+class SavedSearch:
+
+    def __init__(self, search_id: str, filters: Dict[str, Any], created_at: Optional[float] = None):
+        self.id = search_id
+        self.filters = filters
+        self.created_at = created_at if created_at is not None else time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "filters": self.filters, "created_at": self.created_at}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SavedSearch":
+        return cls(data["id"], normalize_filters(data.get("filters")), data.get("created_at"))
+
+
+# =========================
+# ÍNDICE
+# =========================
+
+class SearchGroup:
+    """
+    Búsquedas de un (operacion, comuna), ordenadas por tope de precio
+    ascendente (sin tope = inf, al final).
+    """
+
+    def __init__(self, slots: List[int], caps: List[float]):
+        order = np.argsort(caps, kind="stable")
+        self.slots = np.array(slots, dtype=np.int64)[order]
+        self.caps = np.array(caps, dtype=np.float64)[order]
+
+    def accepting(self, lowest: float) -> np.ndarray:
+        """
+        Búsquedas que podrían aceptar algún precio >= `lowest` (NaN = no
+        hay precios: sólo las sin tope).
+        """
+        if np.isnan(lowest):
+            return self.slots[np.searchsorted(self.caps, np.inf, side="left"):]
+        return self.slots[np.searchsorted(self.caps, lowest, side="left"):]
+
+
+class PercolatorIndex:
+    """
+    Índice inmutable de un conjunto de búsquedas guardadas (slot = posición).
+    """
+
+    def __init__(self, searches: List[SavedSearch]):
+        size = len(searches)
+        self.ids = [s.id for s in searches]
+        self.size = size
+        self.caps = np.full(size, np.inf)
+        self.needs_visible = np.zeros(size, dtype=bool)
+        self.amenities = np.zeros(size, dtype=np.uint64)
+        self.dormitorios_min = np.full(size, np.nan)
+        self.banos_min = np.full(size, np.nan)
+        self.gastos_max = np.full(size, np.nan)
+        self.has_text = np.zeros(size, dtype=bool)
+        self.terms: Dict[int, List[str]] = {}
+
+        groups: Dict[Tuple[Optional[str], Optional[str]], Tuple[List[int], List[float]]] = {}
+        for slot, search in enumerate(searches):
+            f = search.filters
+            operacion, comuna = f.get("operacion"), f.get("comuna")
+
+            # mismas reglas que PropertyStore.mask
+            self.needs_visible[slot] = bool(f.get("precio_max_clp") or f.get("precio_max_uf"))
+            cap = None
+            if operacion == "venta":
+                cap = f.get("precio_max_uf")
+            elif operacion == "arriendo":
+                cap = f.get("precio_max_clp")
+            if cap is not None:
+                self.caps[slot] = float(cap)
+
+            self.amenities[slot] = amenity_mask(f.get("amenities"))
+            self.dormitorios_min[slot] = _number(f.get("dormitorios_min"))
+            self.banos_min[slot] = _number(f.get("banos_min"))
+            self.gastos_max[slot] = _number(f.get("gastos_comunes_max_clp"))
+
+            terms = analyze(f.get("texto"))
+            if terms:
+                self.has_text[slot] = True
+                self.terms[slot] = list(dict.fromkeys(terms))
+
+            slots, caps = groups.setdefault((operacion, comuna), ([], []))
+            slots.append(slot)
+            caps.append(self.caps[slot])
+
+        self.groups = {key: SearchGroup(*lists) for key, lists in groups.items()}
+
+    def match(self, store, rows: np.ndarray, text_index=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares (slot, posición en `rows`) de búsqueda que acepta propiedad.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        operaciones = [store.operacion.labels[c] if c >= 0 else None for c in store.operacion.codes[rows].tolist()]
+        comunas = [store.comuna.labels[c] if c >= 0 else None for c in store.comuna.codes[rows].tolist()]
+
+        # posiciones de las propiedades que puede ver cada grupo de búsquedas
+        visible_to: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        for position, key in enumerate(zip(operaciones, comunas)):
+            operacion, comuna = key
+            for group_key in dict.fromkeys((key, (operacion, None), (None, comuna), (None, None))):
+                if group_key in self.groups:
+                    visible_to.setdefault(group_key, []).append(position)
+
+        bits = np.zeros(len(rows), dtype=np.uint64)
+        for name, column in store.amenities.items():
+            bit = AMENITY_BITS.get(name)
+            if bit is not None:
+                bits[np.asarray(column[rows], dtype=bool)] |= np.uint64(bit)
+
+        columns = {
+            "visible": np.asarray(store.visible[rows], dtype=bool),
+            "dormitorios": np.asarray(store.dormitorios[rows]),
+            "banos": np.asarray(store.banos[rows]),
+            "gastos": np.asarray(store.gastos_comunes[rows]),
+            "venta": np.asarray(store.price_uf[rows]),
+            "arriendo": np.asarray(store.price_clp[rows]),
+        }
+
+        slot_parts, position_parts = [], []
+        for group_key, positions in visible_to.items():
+            positions = np.array(positions, dtype=np.int64)
+            price_column = columns.get(group_key[0], columns["arriendo"])
+            prices = price_column[positions]
+            lowest = float(np.nanmin(prices)) if not np.isnan(prices).all() else float("nan")
+            # topes bajo el precio más barato del lote: ni se miran
+            slots = self.groups[group_key].accepting(lowest)
+            if not len(slots):
+                continue
+            for chunk in np.array_split(positions, max(1, len(slots) * len(positions) // MATCH_CELLS)):
+                keep = self._mask(slots, chunk, price_column[chunk], bits, columns)
+                hit_slots, hit_positions = np.nonzero(keep)
+                slot_parts.append(slots[hit_slots])
+                position_parts.append(chunk[hit_positions])
+
+        if not slot_parts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        slots, positions = np.concatenate(slot_parts), np.concatenate(position_parts)
+
+        # texto (pocas búsquedas): como en search_scored, los términos que
+        # no están en el corpus se ignoran
+        textual = np.flatnonzero(self.has_text[slots])
+        if len(textual):
+            vocab = text_index.vocab if text_index is not None else None
+            docs: Dict[int, Set[str]] = {}
+            ok = np.ones(len(slots), dtype=bool)
+            for i in textual.tolist():
+                known = [t for t in self.terms[int(slots[i])] if vocab is None or t in vocab]
+                if not known:
+                    continue
+                position = int(positions[i])
+                doc = docs.get(position)
+                if doc is None:
+                    doc = docs[position] = set()
+                    for text, _ in document_fields(store.rows[int(rows[position])]):
+                        doc.update(analyze(text))
+                ok[i] = not doc.isdisjoint(known)
+            slots, positions = slots[ok], positions[ok]
+        return slots, positions
+
+    def _mask(self, slots: np.ndarray, positions: np.ndarray, prices: np.ndarray,
+              bits: np.ndarray, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Matriz búsquedas × propiedades con el resto de los filtros.
+        """
+        caps = self.caps[slots][:, None]
+        # sin tope siempre pasa; con tope, NaN nunca cumple "<="
+        keep = np.isinf(caps) | (prices[None, :] <= caps)
+        keep &= ~self.needs_visible[slots][:, None] | columns["visible"][positions][None, :]
+        wanted = self.amenities[slots][:, None]
+        keep &= (wanted & bits[positions][None, :]) == wanted
+        for limits, name in ((self.dormitorios_min, "dormitorios"), (self.banos_min, "banos")):
+            limit = limits[slots][:, None]
+            keep &= np.isnan(limit) | (columns[name][positions][None, :] >= limit)
+        limit = self.gastos_max[slots][:, None]
+        keep &= np.isnan(limit) | (columns["gastos"][positions][None, :] <= limit)
+        return keep
+
+
+# =========================
+# STORE
+# =========================
+
+class SavedSearchStore:
+    """
+    Búsquedas guardadas + bandejas de coincidencias, coherentes entre
+    workers:
+
+    - el log NDJSON es la fuente de verdad de las búsquedas: cada
+      proceso lo relee desde donde quedó cuando crece (o entero si se
+      reemplazó al compactarse). Las altas / bajas sólo agregan líneas;
+      compactar es tarea offline (scripts/compact_saved_searches.py)
+    - las bandejas viven en el backend de sesiones (SESSION_BACKEND): con
+      redis las comparten todos los workers. Cada worker percola los
+      mismos deltas; una propiedad ya en la bandeja no se duplica
+    """
+
+    def __init__(self, path: Optional[str] = SAVED_SEARCHES_PATH, max_matches: int = SAVED_MATCHES_MAX,
+                 inbox=None):
+        self.path = Path(path) if path else None
+        self.max_matches = max_matches
+        self.inbox = inbox if inbox is not None else create_inbox_backend()
+        self._searches: Dict[str, SavedSearch] = {}
+        self._index: Optional[PercolatorIndex] = None
+        self._lock = threading.Lock()
+        # hasta dónde se leyó el log (inodo, bytes)
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self.percolations = 0
+        self.matched = 0
+        self.last_seconds = 0.0
+
+    # ---------- persistencia ----------
+
+    def _refresh(self) -> None:
+        """
+        Aplica las líneas del log que otros procesos (o éste) agregaron
+        desde la última lectura.
+        """
+        if self.path is None:
+            return
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            stat = None
+        inode = stat.st_ino if stat is not None else None
+        size = stat.st_size if stat is not None else 0
+        if inode != self._inode or size < self._offset:
+            # log reemplazado (compactado) o borrado: se relee entero
+            self._searches = {}
+            self._index = None
+            self._inode, self._offset = inode, 0
+        if size == self._offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        # sólo líneas completas: otro proceso puede estar escribiendo
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply(line)
+        self._index = None
+
+    def _apply(self, line: bytes) -> None:
+        try:
+            entry = loads(line)
+            if "put" in entry:
+                search = SavedSearch.from_dict(entry["put"])
+                self._searches[search.id] = search
+            elif "delete" in entry:
+                self._searches.pop(entry["delete"], None)
+        except (InvalidFilters, KeyError, TypeError, ValueError) as e:
+            # una entrada mala no debe frenar las alertas de todas las demás;
+            # compact() la aparta en <log>.rejected
+            print(f"⚠️ entrada inválida en búsquedas guardadas, se ignora: {e!r}")
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Agrega entradas al log con UNA escritura en modo append (las
+        líneas de distintos workers no se mezclan) y las aplica.
+        """
+        if self.path is None:
+            for entry in entries:
+                self._apply(dumps(entry))
+            self._index = None
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(dumps(entry) + b"\n" for entry in entries))
+        self._refresh()
+
+    def compact(self) -> int:
+        """
+        Reescribe el log sólo con las altas vigentes y aparta las entradas
+        inválidas en <log>.rejected. Correr con los workers detenidos: lo
+        que se agregue mientras tanto se pierde. Devuelve las búsquedas.
+        """
+        if self.path is None or not self.path.exists():
+            return 0
+        with self._lock:
+            searches: Dict[str, SavedSearch] = {}
+            rejected = []
+            for entry in iter_ndjson(self.path):
+                try:
+                    if "put" in entry:
+                        search = SavedSearch.from_dict(entry["put"])
+                        searches[search.id] = search
+                    elif "delete" in entry:
+                        searches.pop(entry["delete"], None)
+                except (InvalidFilters, KeyError, TypeError) as e:
+                    print(f"⚠️ búsqueda guardada inválida, apartada: {e!r}")
+                    rejected.append(entry)
+            if rejected:
+                with open(self.path.with_name(self.path.name + ".rejected"), "ab") as f:
+                    f.writelines(dumps(entry) + b"\n" for entry in rejected)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            write_ndjson(tmp, ({"put": s.to_dict()} for s in searches.values()))
+            os.replace(tmp, self.path)
+            self._refresh()
+            return len(searches)
+
+    # ---------- altas / bajas ----------
+
+    def add(self, filters: Dict[str, Any], search_id: Optional[str] = None) -> SavedSearch:
+        search = SavedSearch(search_id or secrets.token_urlsafe(9), normalize_filters(filters))
+        with self._lock:
+            self._append([{"put": search.to_dict()}])
+        return search
+
+    def add_many(self, filters: Iterable[Dict[str, Any]]) -> List[SavedSearch]:
+        searches = [SavedSearch(secrets.token_urlsafe(9), normalize_filters(f)) for f in filters]
+        with self._lock:
+            self._append([{"put": s.to_dict()} for s in searches])
+        return searches
+
+    def get(self, search_id: str) -> Optional[SavedSearch]:
+        with self._lock:
+            self._refresh()
+            return self._searches.get(search_id)
+
+    def delete(self, search_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            if search_id not in self._searches:
+                return False
+            self._append([{"delete": search_id}])
+        self.inbox.delete(search_id)
+        return True
+
+    def index(self) -> PercolatorIndex:
+        with self._lock:
+            self._refresh()
+            if self._index is None:
+                self._index = PercolatorIndex(list(self._searches.values()))
+            return self._index
+
+    # ---------- percolación ----------
+
+    def percolate(self, snapshot, property_ids: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Cruza propiedades nuevas / cambiadas (ids de la versión `snapshot`)
+        con las búsquedas guardadas. Devuelve búsqueda → ids que calzan
+        (array) y los deja en la bandeja de cada búsqueda.
+        """
+        started = time.perf_counter()
+        index = self.index()
+        store = snapshot.store
+        text_index = snapshot.index.text if index.has_text.any() else None
+
+        rows, matched_ids = [], []
+        for property_id in property_ids:
+            row = store.row_of(property_id)
+            if row is not None:  # si no, removida después en el mismo delta
+                rows.append(row)
+                matched_ids.append(str(property_id))
+
+        found: Dict[str, np.ndarray] = {}
+        slots, positions = index.match(store, np.array(rows, dtype=np.int64), text_index)
+        if len(slots):
+            # agrupado por búsqueda (propiedades en el orden del lote); cada
+            # búsqueda recibe una vista de UN array de ids, sin copiar
+            order = np.argsort(slots * max(len(rows), 1) + positions)
+            slots = slots[order]
+            ids = np.array(matched_ids, dtype=object)[positions[order]]
+            bounds = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1], True]).tolist()
+            search_ids = index.ids
+            for slot, start, end in zip(slots[bounds[:-1]].tolist(), bounds[:-1], bounds[1:]):
+                found[search_ids[slot]] = ids[start:end]
+
+        for search_id, matched in found.items():
+            self._deliver(search_id, snapshot.version, matched.tolist())
+
+        self.percolations += 1
+        self.matched += sum(len(m) for m in found.values())
+        self.last_seconds = time.perf_counter() - started
+        PERCOLATE_SECONDS.observe(self.last_seconds)
+        PERCOLATE_MATCHES.inc(amount=sum(len(m) for m in found.values()))
+        return found
+
+    # ---------- bandejas ----------
+
+    def _read_inbox(self, search_id: str) -> "OrderedDict[str, int]":
+        raw = self.inbox.get(search_id)
+        if raw is None:
+            return OrderedDict()
+        try:
+            return OrderedDict((pid, version) for pid, version in loads(raw))
+        except (ValueError, TypeError):
+            return OrderedDict()
+
+    def _deliver(self, search_id: str, version: int, property_ids: List[str]) -> None:
+        """
+        Agrega coincidencias a la bandeja: una propiedad queda una sola vez
+        (con su última versión, al final) y sólo las max_matches más nuevas.
+        """
+        latest = self._read_inbox(search_id)
+        for property_id in property_ids:
+            latest.pop(property_id, None)
+            latest[property_id] = version
+        while len(latest) > self.max_matches:
+            latest.popitem(last=False)
+        self.inbox.set(search_id, dumps(list(latest.items())))
+
+    def matches(self, search_id: str, clear: bool = False) -> List[Dict[str, Any]]:
+        """
+        Coincidencias pendientes (más nuevas al final); `clear` las marca
+        como entregadas.
+        """
+        latest = self._read_inbox(search_id)
+        if clear:
+            self.inbox.delete(search_id)
+        return [{"id": pid, "version": version} for pid, version in latest.items()]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            searches = len(self._searches)
+        return {
+            "searches": searches,
+            "percolations": self.percolations,
+            "matched": self.matched,
+            "last_seconds": round(self.last_seconds, 4),
+            "inbox": self.inbox.stats(),
+        }
+
+
+def create_inbox_backend(backend: str = SESSION_BACKEND):
+    """
+    Bandejas en el mismo tipo de backend que las sesiones, con su propio
+    TTL y prefijo.
+    """
+    if backend == "memory":
+        return MemorySessionBackend(ttl=SAVED_MATCHES_TTL, maxsize=SAVED_INBOX_MAX)
+    if backend == "redis":
+        return RedisSessionBackend(ttl=SAVED_MATCHES_TTL, prefix="saved-matches:")
+    raise ValueError(f"SESSION_BACKEND inválido: {backend}")
+
+
+saved_searches = SavedSearchStore()
+
+# cada delta publicado por el reloader se cruza con las búsquedas guardadas
+on_upserts(saved_searches.percolate)
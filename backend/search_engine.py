@@ -1,19 +1,24 @@
 # backend/search_engine.py
 print("🧠 search_engine imported")
 
-from typing import List, Optional, Any
-from backend.data_loader import load_enriched
-
-def comuna_to_str(value: Any) -> Optional[str]:
-    if value is None:
-        return None
-    if isinstance(value, str):
-        return value.strip()
-    if isinstance(value, dict):
-        nombre = value.get("nombre")
-        if isinstance(nombre, str):
-            return nombre.strip()
-    return None
+import heapq
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.data_loader import DataSnapshot, current_snapshot
+from backend.facets import compute_facets
+from backend.metrics import SEARCH_PATH, SEARCH_RETURNED, SEARCH_SCANNED
+from backend.property_store import as_number
+from backend.search_index import ResultHandle
+from backend.text_index import analyze
+from backend.utils import comuna_key, comuna_to_str
+
+# Modo verificación: compara el índice contra el recorrido lineal original
+VERIFY_INDEX = os.getenv("SEARCH_VERIFY_INDEX", "").lower() in ("1", "true", "si")
+
+SORT_OPTIONS = ("precio_asc", "precio_desc", "dormitorios", "recientes")
 
 def operacion_match(prop: dict, operacion: Optional[str]) -> bool:
     if not operacion:
@@ -59,16 +64,21 @@ def cumple_precio(prop: dict, filtros: dict) -> bool:
     return True
 
 
-def search_properties(
+def scan_properties(
+    properties: List[dict],
     comuna: Optional[Any] = None,
     operacion: Optional[str] = None,
     precio_max_uf: Optional[int] = None,
     precio_max_clp: Optional[int] = None,
     amenities: Optional[List[str]] = None,
-):
-    print("🔍 search_properties called")
-
-    properties = load_enriched()
+    dormitorios_min: Optional[float] = None,
+    banos_min: Optional[float] = None,
+    gastos_comunes_max_clp: Optional[int] = None,
+) -> List[dict]:
+    """
+    Recorrido lineal de referencia (implementación original).
+    Se usa sólo para verificar el índice.
+    """
     results: List[dict] = []
 
     filtro_comuna = comuna_to_str(comuna)
@@ -82,15 +92,15 @@ def search_properties(
     for prop in properties:
         # --- comuna
         if filtro_comuna:
-            prop_comuna = comuna_to_str(prop.get("ubicacion", {}).get("comuna"))
-            if not prop_comuna or prop_comuna.lower() != filtro_comuna.lower():
+            prop_comuna = comuna_key(prop.get("ubicacion", {}).get("comuna"))
+            if not prop_comuna or prop_comuna != comuna_key(filtro_comuna):
                 continue
 
         # --- operación
         if operacion and not operacion_match(prop, operacion):
             continue
 
-        # --- precio (🔥 ESTO FALTABA)
+        # --- precio
         if not cumple_precio(prop, filtros):
             continue
 
@@ -100,7 +110,277 @@ def search_properties(
             if not all(prop_amenities.get(a) for a in amenities):
                 continue
 
+        # --- rangos (sin dato → se descarta)
+        caracteristicas = prop.get("caracteristicas", {})
+        if dormitorios_min is not None and not (
+            as_number(caracteristicas.get("dormitorios")) >= dormitorios_min
+        ):
+            continue
+        if banos_min is not None and not (
+            as_number(caracteristicas.get("banos")) >= banos_min
+        ):
+            continue
+        if gastos_comunes_max_clp is not None and not (
+            as_number(caracteristicas.get("gastos_comunes_clp")) <= gastos_comunes_max_clp
+        ):
+            continue
+
         results.append(prop)
 
-    print(f"✅ search_properties results: {len(results)}")
     return results
+
+
+# =========================
+# REFINAMIENTO
+# =========================
+
+# filtro → cómo se estrecha ("eq": igual, "max": baja, "min": sube,
+# "all": se agregan, "terms": ver is_narrowing)
+NARROWING_RULES = {
+    "comuna": "eq",
+    "operacion": "eq",
+    "precio_max_uf": "max",
+    "precio_max_clp": "max",
+    "gastos_comunes_max_clp": "max",
+    "dormitorios_min": "min",
+    "banos_min": "min",
+    "amenities": "all",
+    "texto": "terms",
+}
+
+
+def is_narrowing(previous: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    """
+    True si `current` sólo agrega o endurece restricciones de `previous`:
+    entonces su resultado es un subconjunto del anterior.
+
+    "texto" se compara como términos conocidos (text_terms): una fila
+    calza si contiene ALGUNO, así que sólo estrecha quedarse con los
+    mismos términos o con parte de ellos. Texto nuevo sobre un turno sin
+    texto no cuenta como refinamiento (se busca en el índice completo).
+    """
+    for name, rule in NARROWING_RULES.items():
+        if rule == "terms":
+            old, new = set(previous.get(name) or ()), set(current.get(name) or ())
+            if old != new and not (old and new and new <= old):
+                return False
+            continue
+        old = previous.get(name)
+        if old is None or old == []:
+            continue
+        new = current.get(name)
+        if new is None:
+            return False  # restricción eliminada
+        if rule == "eq" and str(new).lower() != str(old).lower():
+            return False
+        if rule == "max" and not new <= old:
+            return False
+        if rule == "min" and not new >= old:
+            return False
+        if rule == "all" and not set(old) <= set(new):
+            return False
+    return True
+
+
+def text_terms(index, texto: Optional[str]) -> List[str]:
+    """
+    Términos del texto que aparecen en el corpus (los únicos que
+    restringen; vacío = el texto no filtra nada).
+    """
+    if not texto:
+        return []
+    return index.text.known_terms(analyze(texto))
+
+
+def search_scored(
+    comuna: Optional[Any] = None,
+    operacion: Optional[str] = None,
+    precio_max_uf: Optional[int] = None,
+    precio_max_clp: Optional[int] = None,
+    amenities: Optional[List[str]] = None,
+    dormitorios_min: Optional[float] = None,
+    banos_min: Optional[float] = None,
+    gastos_comunes_max_clp: Optional[int] = None,
+    verify: Optional[bool] = None,
+    snapshot: Optional[DataSnapshot] = None,
+    prior: Optional[ResultHandle] = None,
+    prior_filters: Optional[Dict[str, Any]] = None,
+    texto: Optional[str] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    (filas, puntajes): filas del store (en orden original) que cumplen
+    los filtros. No arma ningún dict. `snapshot` fija la versión de la
+    data a usar.
+
+    `prior` / `prior_filters`: resultado y filtros del turno anterior.
+    Si los filtros nuevos sólo estrechan a los anteriores (y la data es
+    la misma versión), se filtra únicamente ese subconjunto.
+
+    `texto`: texto libre (BM25 sobre descripción / sector / tipo). Sólo
+    se puntúan las filas que ya cumplen los filtros estructurados, y
+    quedan las que contienen algún término. Los términos que no aparecen
+    en ninguna propiedad se ignoran; si no queda ninguno, el texto no
+    restringe (puntajes = None).
+    """
+    filtros = {
+        "comuna": comuna_to_str(comuna),
+        "operacion": operacion,
+        "precio_max_uf": precio_max_uf,
+        "precio_max_clp": precio_max_clp,
+        "amenities": amenities,
+        "dormitorios_min": dormitorios_min,
+        "banos_min": banos_min,
+        "gastos_comunes_max_clp": gastos_comunes_max_clp,
+    }
+
+    # candidatos desde el índice + una sola máscara booleana
+    snapshot = snapshot or current_snapshot()
+    index = snapshot.index
+    store = index.store
+
+    if (
+        prior is not None
+        and prior_filters is not None
+        and prior.matches(snapshot.version, store.size)
+        and is_narrowing(
+            {**prior_filters, "texto": text_terms(index, prior_filters.get("texto"))},
+            {**filtros, "texto": text_terms(index, texto)},
+        )
+    ):
+        # el resultado es subconjunto del anterior: sólo se evalúan esas filas
+        candidates = prior.rows()
+        rows = candidates[store.mask(candidates, **filtros)]
+        scanned = len(candidates)
+        SEARCH_PATH.inc("refinement")
+    else:
+        candidates = index.candidates(**filtros)
+        rows = index.scan(candidates, **filtros)
+        scanned = store.size if candidates is None else len(candidates)
+        SEARCH_PATH.inc("index")
+
+    SEARCH_SCANNED.observe(scanned)
+
+    if verify is None:
+        verify = VERIFY_INDEX
+
+    if verify:
+        # el recorrido de referencia cubre sólo los filtros estructurados
+        results = store.materialize(rows)
+        expected = scan_properties(snapshot.rows, **filtros)
+        if [p.get("id") for p in results] != [p.get("id") for p in expected]:
+            raise AssertionError(
+                f"Índice inconsistente: {len(results)} resultados vs {len(expected)} del recorrido lineal"
+            )
+
+    scores = None
+    terms = analyze(texto) if texto else []
+    if terms:
+        scores = index.text.score(terms, rows)
+        if scores is not None:
+            matched = scores > 0
+            rows, scores = rows[matched], scores[matched]
+
+    SEARCH_RETURNED.observe(len(rows))
+    return rows, scores
+
+
+def search_rows(**filtros) -> np.ndarray:
+    """
+    Filas del store (en orden original) que cumplen los filtros
+    (ver search_scored).
+    """
+    return search_scored(**filtros)[0]
+
+
+def search_properties(**filtros) -> List[dict]:
+    """
+    Todas las propiedades que cumplen los filtros (ver search_scored);
+    con `texto`, de más a menos relevante.
+    """
+    snapshot = current_snapshot()
+    rows, scores = search_scored(snapshot=snapshot, **filtros)
+    if scores is not None:
+        rows = rows[np.argsort(-scores, kind="stable")]
+    return snapshot.store.materialize(rows)
+
+
+# =========================
+# ORDEN + TOP-K
+# =========================
+
+def _sort_keys(store, rows: np.ndarray, sort: str) -> List[float]:
+    """
+    Clave ascendente por fila; sin dato (NaN) siempre al final.
+    """
+    if sort == "precio_asc":
+        keys = store.price_clp[rows]
+    elif sort == "precio_desc":
+        keys = -store.price_clp[rows]
+    elif sort == "dormitorios":
+        keys = -store.dormitorios[rows]
+    elif sort == "recientes":
+        keys = -store.source_seq[rows]
+    else:
+        raise ValueError(f"sort inválido: {sort}")
+    return np.where(np.isnan(keys), np.inf, keys).tolist()
+
+
+def top_k_rows(store, rows: np.ndarray, sort: Optional[str], k: int,
+               scores: Optional[np.ndarray] = None) -> List[int]:
+    """
+    Primeras k filas según `sort`, con un heap (heapq.nsmallest):
+    nunca se ordena la lista completa. Empates → orden original.
+    Sin `sort`, con `scores` (búsqueda de texto) → por relevancia.
+    """
+    if k <= 0:
+        return []
+    if not sort and scores is None:
+        return rows[:k].tolist()
+    keys = _sort_keys(store, rows, sort) if sort else (-scores).tolist()
+    best = heapq.nsmallest(k, zip(keys, rows.tolist()))
+    return [row for _, row in best]
+
+
+def search_page(
+    sort: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 20,
+    with_dicts: bool = True,
+    snapshot: Optional[DataSnapshot] = None,
+    prior: Optional[ResultHandle] = None,
+    prior_filters: Optional[Dict[str, Any]] = None,
+    facets: Union[bool, Sequence[str]] = False,
+    **filtros,
+) -> Dict[str, Any]:
+    """
+    Página de resultados: total de coincidencias + sólo los dicts (y su
+    JSON pre-codificado) de la página pedida.
+    with_dicts=False evita decodificar filas cuando basta el JSON.
+    prior / prior_filters / texto: ver search_scored.
+    facets=True agrega las facetas del resultado completo (backend/facets.py);
+    una lista de nombres, sólo esas.
+    """
+    # una sola versión de la data para toda la página
+    snapshot = snapshot or current_snapshot()
+    store = snapshot.store
+    rows, scores = search_scored(snapshot=snapshot, prior=prior, prior_filters=prior_filters, **filtros)
+
+    page_rows = top_k_rows(store, rows, sort, offset + limit, scores)[offset:]
+
+    page = {
+        "version": snapshot.version,
+        "total": int(len(rows)),
+        "rows": rows,
+        "results": store.materialize(page_rows) if with_dicts else [],
+        "encoded": store.encoded_rows(page_rows),
+    }
+    if facets:
+        only = None if facets is True else facets
+        if len(rows) == store.size:
+            # todo el dataset → facetas precalculadas de la versión
+            page["facets"] = snapshot.facets if only is None else {
+                name: value for name, value in snapshot.facets.items() if name == "total" or name in only
+            }
+        else:
+            page["facets"] = compute_facets(store, rows, only=only)
+    return page
@@ -0,0 +1,248 @@
+# backend/search_index.py
+"""
+Índice invertido sobre el store columnar de propiedades.
+
+Se construye UNA vez cuando se carga la data (ver data_loader) y permite
+resolver una búsqueda sin recorrer todo el dataset:
+
+- posting lists por comuna normalizada y por operación
+- columnas numéricas ordenadas (precio UF / CLP, dormitorios, baños,
+  gastos comunes) → rango por bisección
+- posting lists por amenity (columnas booleanas del store)
+- índice de texto BM25 sobre descripción / sector / tipo (text_index),
+  que sólo puntúa el resultado de los filtros estructurados
+
+Se elige el conjunto candidato más chico y el resto de los filtros se
+evalúa como una sola máscara booleana sobre esos candidatos
+(PropertyStore.mask). Las reglas son EXACTAMENTE las de
+search_engine.cumple_precio; el modo verificación de search_engine
+compara ambos caminos.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.property_store import Categorical, PropertyStore
+from backend.text_index import TextIndex
+from backend.utils import comuna_key
+
+
+class Postings:
+    """
+    Posting lists de una columna categórica: filas (ascendentes) por código.
+    """
+
+    def __init__(self, order: np.ndarray, offsets: np.ndarray):
+        self.order = order
+        self.offsets = offsets
+
+    @staticmethod
+    def arrays(column: Categorical) -> Tuple[np.ndarray, np.ndarray]:
+        codes = column.codes
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(column.labels))
+        # las filas sin valor (-1) quedan al principio del orden
+        start = int(np.count_nonzero(codes < 0))
+        return order, start + np.concatenate(([0], np.cumsum(counts)))
+
+    def get(self, code: int) -> np.ndarray:
+        if code < 0 or code + 1 >= len(self.offsets):
+            return self.order[:0]
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+
+class SortedColumn:
+    """
+    Columna numérica ordenada con su fila de origen (NaN excluidos).
+    """
+
+    def __init__(self, rows: np.ndarray, values: np.ndarray):
+        self.rows = rows
+        self.values = values
+
+    @staticmethod
+    def arrays(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        valid = np.flatnonzero(~np.isnan(values))
+        order = valid[np.argsort(values[valid], kind="stable")]
+        return order, values[order]
+
+    def rows_le(self, max_value) -> np.ndarray:
+        return self.rows[:np.searchsorted(self.values, max_value, side="right")]
+
+    def rows_ge(self, min_value) -> np.ndarray:
+        return self.rows[np.searchsorted(self.values, min_value, side="left"):]
+
+
+POSTING_COLUMNS = ("comuna", "operacion")
+SORTED_COLUMNS = ("price_uf", "price_clp", "dormitorios", "banos", "gastos_comunes")
+
+
+def index_arrays(
+    columns: Dict[str, np.ndarray],
+    categoricals: Dict[str, Categorical],
+    amenities: Dict[str, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Todas las estructuras del índice como arrays planos (nombre → array),
+    para construirlo en memoria o guardarlo en el snapshot.
+    """
+    arrays: Dict[str, np.ndarray] = {"visible": np.flatnonzero(columns["visible"])}
+    for name in POSTING_COLUMNS:
+        arrays[f"{name}.order"], arrays[f"{name}.offsets"] = Postings.arrays(categoricals[name])
+    for name in SORTED_COLUMNS:
+        arrays[f"{name}.rows"], arrays[f"{name}.values"] = SortedColumn.arrays(columns[name])
+    for name, column in amenities.items():
+        arrays[f"amenity.{name}"] = np.flatnonzero(column)
+    return arrays
+
+
+class PropertyIndex:
+    """
+    `arrays` (ver index_arrays) permite usar estructuras ya calculadas,
+    por ejemplo mapeadas desde el snapshot y compartidas entre workers.
+    """
+
+    def __init__(self, store: PropertyStore, arrays: Optional[Dict[str, np.ndarray]] = None,
+                 text: Optional[TextIndex] = None):
+        self.store = store
+        self.size = store.size
+
+        if arrays is None:
+            arrays = index_arrays(
+                {name: store.column(name) for name in ("visible",) + SORTED_COLUMNS},
+                {name: store.column(name) for name in POSTING_COLUMNS},
+                store.amenities,
+            )
+
+        self.by_comuna = Postings(arrays["comuna.order"], arrays["comuna.offsets"])
+        self.by_operacion = Postings(arrays["operacion.order"], arrays["operacion.offsets"])
+        self.visible = arrays["visible"]
+        self.by_amenity: Dict[str, np.ndarray] = {
+            name: arrays[f"amenity.{name}"] for name in store.amenities
+        }
+
+        self.price_uf = SortedColumn(arrays["price_uf.rows"], arrays["price_uf.values"])
+        self.price_clp = SortedColumn(arrays["price_clp.rows"], arrays["price_clp.values"])
+        self.dormitorios = SortedColumn(arrays["dormitorios.rows"], arrays["dormitorios.values"])
+        self.banos = SortedColumn(arrays["banos.rows"], arrays["banos.values"])
+        self.gastos_comunes = SortedColumn(
+            arrays["gastos_comunes.rows"], arrays["gastos_comunes.values"]
+        )
+
+        # texto: ya armado (delta), del snapshot si viene, o al primer uso
+        if text is None and "text.vocab" in arrays:
+            text = TextIndex(arrays)
+        self._text = text
+
+    @property
+    def text(self) -> TextIndex:
+        if self._text is None:
+            self._text = TextIndex.build(self.store.rows)
+        return self._text
+
+    def candidates(
+        self,
+        comuna: Optional[str] = None,
+        operacion: Optional[str] = None,
+        precio_max_uf=None,
+        precio_max_clp=None,
+        amenities: Optional[List[str]] = None,
+        dormitorios_min=None,
+        banos_min=None,
+        gastos_comunes_max_clp=None,
+    ) -> Optional[np.ndarray]:
+        """
+        Conjunto candidato más chico entre los filtros activos.
+        None = no hay filtros (todo el dataset es candidato).
+        """
+        sets: List[np.ndarray] = []
+
+        if comuna:
+            sets.append(self.by_comuna.get(self.store.comuna.code(comuna_key(comuna))))
+
+        if operacion:
+            sets.append(self.by_operacion.get(self.store.operacion.code(operacion)))
+
+        if precio_max_clp or precio_max_uf:
+            sets.append(self.visible)
+
+        if operacion == "venta" and precio_max_uf is not None:
+            sets.append(self.price_uf.rows_le(precio_max_uf))
+        elif operacion == "arriendo" and precio_max_clp is not None:
+            sets.append(self.price_clp.rows_le(precio_max_clp))
+
+        for name in amenities or []:
+            sets.append(self.by_amenity.get(name, self.visible[:0]))
+
+        if dormitorios_min is not None:
+            sets.append(self.dormitorios.rows_ge(dormitorios_min))
+        if banos_min is not None:
+            sets.append(self.banos.rows_ge(banos_min))
+        if gastos_comunes_max_clp is not None:
+            sets.append(self.gastos_comunes.rows_le(gastos_comunes_max_clp))
+
+        if not sets:
+            return None
+        return min(sets, key=len)
+
+    def query(self, **filters) -> np.ndarray:
+        """
+        Filas (en orden original) que cumplen todos los filtros.
+        """
+        return self.scan(self.candidates(**filters), **filters)
+
+    def scan(self, rows: Optional[np.ndarray], **filters) -> np.ndarray:
+        """
+        Filtra un conjunto candidato (de `candidates`) con una máscara.
+        """
+        if rows is None:
+            return np.arange(self.size)
+        if not len(rows):
+            return rows
+
+        rows = rows[self.store.mask(rows, **filters)]
+        rows.sort()
+        return rows
+
+
+# =========================
+# HANDLE DE RESULTADOS
+# =========================
+
+class ResultHandle:
+    """
+    Conjunto de filas de un resultado atado a la versión de la data en
+    que se calculó, en la codificación más chica:
+
+    - "bits": bitmap (1 bit por propiedad del dataset), para resultados densos
+    - "d2" / "d4": filas ordenadas como saltos (uint16 / uint32), para
+      resultados chicos: ocupa según el resultado, no según el dataset
+    """
+
+    def __init__(self, version: int, size: int, data: bytes, kind: str = "bits"):
+        self.version = version
+        self.size = size
+        self.data = data
+        self.kind = kind
+
+    @classmethod
+    def from_rows(cls, version: int, size: int, rows: np.ndarray) -> "ResultHandle":
+        rows = np.asarray(rows, dtype=np.int64)
+        gaps = np.diff(rows, prepend=0)
+        kind, dtype = ("d2", np.uint16) if not len(gaps) or gaps.max() <= 0xFFFF else ("d4", np.uint32)
+        if len(rows) * np.dtype(dtype).itemsize < (size + 7) // 8:
+            return cls(version, size, gaps.astype(dtype).tobytes(), kind)
+        bitmap = np.zeros(size, dtype=bool)
+        bitmap[rows] = True
+        return cls(version, size, np.packbits(bitmap).tobytes())
+
+    def rows(self) -> np.ndarray:
+        if self.kind == "bits":
+            bitmap = np.unpackbits(np.frombuffer(self.data, dtype=np.uint8), count=self.size)
+            return np.flatnonzero(bitmap)
+        dtype = np.uint16 if self.kind == "d2" else np.uint32
+        return np.cumsum(np.frombuffer(self.data, dtype=dtype), dtype=np.int64)
+
+    def matches(self, version: int, size: int) -> bool:
+        return self.version == version and self.size == size
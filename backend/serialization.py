@@ -0,0 +1,50 @@
+# backend/serialization.py
+"""
+Serialización JSON rápida.
+
+La data se limpia (NaN / Infinity) UNA vez en bootstrap_data y cada
+propiedad se pre-codifica a bytes al construir el store. Una respuesta
+se arma pegando esos fragmentos; no hay copia profunda por request.
+
+Usa orjson si está instalado; si no, json de la stdlib.
+"""
+
+import json
+from typing import Any, Dict, Iterable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+# Campos que NO van en la respuesta salvo que se pidan en `fields`
+DEFAULT_EXCLUDED_FIELDS = {"raw"}
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_property(prop: dict) -> bytes:
+    """
+    Cuerpo JSON por defecto de una propiedad (sin campos excluidos).
+    """
+    return dumps({k: v for k, v in prop.items() if k not in DEFAULT_EXCLUDED_FIELDS})
+
+
+def splice_response(envelope: Dict[str, Any], fragments: Iterable[bytes]) -> bytes:
+    """
+    {...envelope, "results": [fragmentos...]} sin volver a codificar
+    los resultados.
+    """
+    head = dumps(envelope)
+    sep = b"," if len(head) > 2 else b""
+    return head[:-1] + sep + b'"results":[' + b",".join(fragments) + b"]}"
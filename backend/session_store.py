@@ -0,0 +1,223 @@
+# backend/session_store.py
+"""
+Contexto de conversación por session_id.
+
+Cada sesión guarda los filtros acumulados y el handle del último
+resultado (filas + versión de la data; ver ResultHandle). El estado se guarda
+serializado (bytes) para que el backend sea intercambiable:
+
+- memory: dict en el proceso (LRU por tamaño + TTL)
+- redis:  cualquier servidor compatible con Redis, para varios workers
+          (el TTL lo aplica el servidor; el tamaño, su maxmemory)
+
+SESSION_BACKEND elige el backend (memory por defecto).
+"""
+
+import asyncio
+import base64
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.search_index import ResultHandle
+from backend.serialization import dumps, loads
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - depende del entorno
+    redis = None
+
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+
+
+# =========================
+# ESTADO
+# =========================
+
+class SessionState:
+
+    def __init__(self, filters: Dict[str, Any], handle: Optional[ResultHandle] = None):
+        self.filters = filters
+        self.handle = handle
+
+    def to_bytes(self) -> bytes:
+        data: Dict[str, Any] = {"f": self.filters}
+        if self.handle is not None:
+            data["h"] = [
+                self.handle.version,
+                self.handle.size,
+                base64.b64encode(self.handle.data).decode("ascii"),
+                self.handle.kind,
+            ]
+        return dumps(data)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "SessionState":
+        data = loads(raw)
+        handle = None
+        if data.get("h"):
+            # sin codificación (estado anterior): bitmap
+            version, size, encoded, *kind = data["h"]
+            handle = ResultHandle(version, size, base64.b64decode(encoded), *kind)
+        return cls(data.get("f") or {}, handle)
+
+
+# =========================
+# BACKENDS
+# =========================
+
+class MemorySessionBackend:
+    """
+    LRU + TTL en el proceso, seguro entre hilos.
+    """
+
+    blocking = False
+
+    def __init__(self, ttl: float = SESSION_TTL, maxsize: int = SESSION_MAX):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._entries),
+                "bytes": sum(len(v) for _, v in self._entries.values()),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class RedisSessionBackend:
+    """
+    Sesiones compartidas entre workers en un servidor compatible con Redis.
+    """
+
+    blocking = True  # I/O de red: fuera del event loop
+
+    def __init__(self, url: str = SESSION_REDIS_URL, ttl: float = SESSION_TTL,
+                 prefix: str = "session:"):
+        if redis is None:
+            raise RuntimeError("SESSION_BACKEND=redis requiere el paquete `redis`")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=max(int(self.ttl), 1))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "ttl": self.ttl}
+
+
+# =========================
+# STORE
+# =========================
+
+class SessionStore:
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        raw = self.backend.get(session_id)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            return SessionState.from_bytes(raw)
+        except (ValueError, TypeError, KeyError):
+            # estado corrupto o de otro formato → sesión nueva
+            self.backend.delete(session_id)
+            return None
+
+    def save(self, session_id: str, state: SessionState) -> None:
+        self.backend.set(session_id, state.to_bytes())
+
+    def delete(self, session_id: str) -> None:
+        self.backend.delete(session_id)
+
+    # versiones async: un backend de red no bloquea el event loop
+    async def aload(self, session_id: str) -> Optional[SessionState]:
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(self.load, session_id)
+        return self.load(session_id)
+
+    async def asave(self, session_id: str, state: SessionState) -> None:
+        if getattr(self.backend, "blocking", False):
+            await asyncio.to_thread(self.save, session_id, state)
+        else:
+            self.save(session_id, state)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, **self.backend.stats()}
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    if backend == "memory":
+        return SessionStore(MemorySessionBackend())
+    if backend == "redis":
+        return SessionStore(RedisSessionBackend())
+    raise ValueError(f"SESSION_BACKEND inválido: {backend}")
+
+
+def merge_filters(previous: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Filtros del turno actual sobre los acumulados: los valores nuevos
+    reemplazan a los anteriores y los amenities se suman.
+    """
+    merged = dict(previous)
+    for key, value in new.items():
+        if key == "amenities":
+            merged[key] = sorted(set(previous.get(key) or []) | set(value))
+        else:
+            merged[key] = value
+    return merged
+
+
+session_store = create_session_store()
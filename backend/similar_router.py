@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from backend.data_loader import current_snapshot
+from backend.executor import Overloaded, search_executor
+from backend.metrics import SIMILAR_SECONDS
+from backend.serialization import splice_response
+from backend.similarity import SIMILAR_K, SIMILAR_MAX_K
+
+router = APIRouter()
+
+
+def similar_body(snapshot, property_id: str, k: int):
+    """
+    Respuesta de /similar ya serializada; None si el id no existe.
+    """
+    similar = snapshot.similar
+    row = similar.row_of(property_id)
+    if row is None:
+        return None
+
+    rows, distances = similar.nearest(row, k)
+    store = snapshot.store
+    comuna = store.comuna.codes[row]
+    operacion = store.operacion.codes[row]
+    envelope = {
+        "type": "similar",
+        "id": property_id,
+        "meta": {
+            "total": int(len(rows)),
+            "k": k,
+            "operacion": store.operacion.labels[operacion] if operacion >= 0 else None,
+            "comuna": store.comuna.labels[comuna] if comuna >= 0 else None,
+            # una distancia por resultado, en el mismo orden
+            "distances": [round(d, 4) for d in distances.tolist()],
+        },
+    }
+    return splice_response(envelope, store.encoded_rows(rows))
+
+
+@router.get("/similar/{property_id}")
+async def similar(property_id: str, k: int = Query(SIMILAR_K, ge=1, le=SIMILAR_MAX_K)):
+    with SIMILAR_SECONDS.time():
+        snapshot = current_snapshot()
+        try:
+            body = await search_executor.run(similar_body, snapshot, property_id, k)
+        except Overloaded:
+            raise HTTPException(status_code=503, detail="Hay muchas búsquedas en curso",
+                                headers={"Retry-After": "1"})
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="La búsqueda tardó demasiado")
+
+    if body is None:
+        raise HTTPException(status_code=404, detail="Propiedad no encontrada")
+    return Response(content=body, media_type="application/json")
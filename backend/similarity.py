@@ -0,0 +1,203 @@
+# backend/similarity.py
+"""
+Propiedades parecidas a una dada ("algo parecido a esta").
+
+Cada propiedad tiene un vector numérico precalculado (una matriz
+float32 por versión de la data, armada desde las columnas del store,
+o sea desde los mismos registros de enrich_property):
+
+- precio en UF (log), superficie (log), gastos comunes (log),
+  dormitorios y baños: estandarizados dentro de su operación (un
+  faltante queda en el promedio)
+- un bit por amenity
+
+Cada columna va multiplicada por la raíz de su peso, así la distancia
+euclidiana al cuadrado es la suma ponderada de diferencias. La comuna y
+el sector no entran al vector: se usan para particionar y como
+penalización.
+
+Una consulta nunca recorre todo el dataset: compara sólo contra la
+misma operación en la misma comuna (posting list del índice); si eso no
+alcanza, suma las comunas vecinas y, como último recurso, el resto de
+la operación, cada grupo con su penalización. El top-K sale de
+argpartition sobre las distancias.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.lexicon import comunas_vecinas
+from backend.property_store import PropertyStore
+from backend.utils import comuna_key
+
+SIMILAR_K = int(os.getenv("SIMILAR_K", "10"))
+SIMILAR_MAX_K = int(os.getenv("SIMILAR_MAX_K", "50"))
+# candidatos mínimos antes de sumar comunas vecinas
+SIMILAR_MIN_POOL = int(os.getenv("SIMILAR_MIN_POOL", "30"))
+
+# peso de cada diferencia (sobre valores estandarizados)
+FEATURE_WEIGHTS = (
+    ("precio", 4.0),
+    ("superficie", 2.0),
+    ("dormitorios", 2.0),
+    ("banos", 1.0),
+    ("gastos_comunes", 0.5),
+)
+AMENITY_WEIGHT = 0.5
+
+# penalizaciones (se suman a la distancia al cuadrado)
+PENALTY_SECTOR = 1.0
+PENALTY_VECINA = 2.0
+PENALTY_OTRA_COMUNA = 6.0
+
+
+# =========================
+# MATRIZ DE FEATURES
+# =========================
+
+def _log(values: np.ndarray, shift: float = 0.0) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    valid = values + shift > 0
+    out[valid] = np.log(values[valid] + shift)
+    return out
+
+
+def standardize(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """
+    z-score dentro de cada grupo; NaN (faltante) → 0 = promedio del grupo.
+    """
+    out = np.zeros(len(values), dtype=np.float32)
+    valid = ~np.isnan(values)
+    for code in np.unique(groups).tolist():
+        member = (groups == code) & valid
+        sample = values[member]
+        if len(sample) < 2:
+            continue
+        std = float(sample.std()) or 1.0
+        out[member] = (sample - sample.mean()) / std
+    return out
+
+
+def raw_features(store: PropertyStore) -> Dict[str, np.ndarray]:
+    """
+    Valores numéricos antes de estandarizar (NaN = sin dato).
+    """
+    price = np.where(store.visible, store.price_uf, np.nan)
+    return {
+        "precio": _log(price),
+        "superficie": _log(store.superficie),
+        "dormitorios": np.asarray(store.dormitorios, dtype=np.float64),
+        "banos": np.asarray(store.banos, dtype=np.float64),
+        "gastos_comunes": _log(store.gastos_comunes, shift=1.0),
+    }
+
+
+def feature_matrix(store: PropertyStore) -> Tuple[np.ndarray, List[str]]:
+    """
+    (matriz n × d float32, nombre de cada columna).
+    """
+    groups = np.asarray(store.operacion.codes)
+    raw = raw_features(store)
+
+    columns: List[np.ndarray] = []
+    names: List[str] = []
+    for name, weight in FEATURE_WEIGHTS:
+        columns.append(standardize(raw[name], groups) * np.float32(np.sqrt(weight)))
+        names.append(name)
+    amenity_scale = np.float32(np.sqrt(AMENITY_WEIGHT))
+    for name in sorted(store.amenities):
+        columns.append(np.asarray(store.amenities[name], dtype=np.float32) * amenity_scale)
+        names.append(f"amenity.{name}")
+
+    matrix = np.empty((store.size, len(columns)), dtype=np.float32)
+    for j, column in enumerate(columns):
+        matrix[:, j] = column
+    return matrix, names
+
+
+# =========================
+# CONSULTA
+# =========================
+
+class SimilarityIndex:
+    """
+    Matriz de features de una versión de la data + búsqueda de vecinos
+    sobre las particiones del índice (operación × comuna).
+    """
+
+    def __init__(self, store: PropertyStore, index,
+                 features: Optional[Tuple[np.ndarray, List[str]]] = None):
+        """
+        `features`: (matriz, columnas) ya calculadas, p. ej. mapeadas desde
+        el snapshot y compartidas entre workers.
+        """
+        self.store = store
+        self.index = index
+        self.matrix, self.features = features if features is not None else feature_matrix(store)
+
+    def row_of(self, property_id: str) -> Optional[int]:
+        return self.store.row_of(property_id)
+
+    def pool(self, row: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidatos de la misma operación (sin la propiedad misma) y su
+        penalización: misma comuna, luego vecinas, luego el resto.
+        """
+        store = self.store
+        operacion = store.operacion.codes[row]
+        comuna = int(store.comuna.codes[row])
+
+        parts: List[np.ndarray] = []
+        penalties: List[np.ndarray] = []
+        seen: List[int] = []
+
+        def add(candidates: np.ndarray, penalty: float) -> int:
+            candidates = candidates[(store.operacion.codes[candidates] == operacion) & (candidates != row)]
+            parts.append(candidates)
+            penalties.append(np.full(len(candidates), penalty, dtype=np.float32))
+            return len(candidates)
+
+        found = 0
+        if comuna >= 0:
+            seen.append(comuna)
+            found += add(self.index.by_comuna.get(comuna), 0.0)
+            if found < max(k, SIMILAR_MIN_POOL):
+                for vecina in comunas_vecinas(store.comuna.labels[comuna]):
+                    code = store.comuna.code(comuna_key(vecina))
+                    if code >= 0 and code not in seen:
+                        seen.append(code)
+                        found += add(self.index.by_comuna.get(code), PENALTY_VECINA)
+
+        if found < k:
+            rest = self.index.by_operacion.get(int(operacion))
+            rest = rest[~np.isin(store.comuna.codes[rest], seen)]
+            add(rest, PENALTY_OTRA_COMUNA)
+
+        return np.concatenate(parts), np.concatenate(penalties)
+
+    def nearest(self, row: int, k: int = SIMILAR_K) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (filas, distancias) de las k propiedades más parecidas a `row`,
+        de la más cercana a la más lejana.
+        """
+        rows, distances = self.pool(row, k)
+        if not len(rows):
+            return rows, distances
+
+        diff = self.matrix[rows] - self.matrix[row]
+        distances += np.einsum("ij,ij->i", diff, diff)
+
+        sector = self.store.sector.codes
+        if sector[row] >= 0:
+            distances += PENALTY_SECTOR * (sector[rows] != sector[row])
+
+        if k < len(rows):
+            top = np.argpartition(distances, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        # empates: fila ascendente (resultado estable)
+        top = top[np.lexsort((rows[top], distances[top]))]
+        return rows[top], np.sqrt(distances[top])
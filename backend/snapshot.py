@@ -0,0 +1,348 @@
+# backend/snapshot.py
+"""
+Snapshot binario del dataset enriquecido.
+
+Lo escribe el paso de enriquecimiento (scripts/enrich_nexxos.py; en
+modo incremental sólo se le aplica el delta, apply_snapshot_delta) y lo
+carga data_loader en vez de parsear el JSON completo. Formato
+(un directorio):
+
+- meta.json                 tamaño, etiquetas categóricas, amenities
+- <columna>.npy             columnas numéricas / códigos (memory-mapped)
+- ids.npy                   id de cada propiedad
+- amenity__<nombre>.npy     columnas booleanas por amenity
+- bodies.bin + .offsets.npy JSON pre-codificado (sin raw) por propiedad
+- raw.bin + .offsets.npy    registro `raw` original por propiedad
+- index__<nombre>.npy       estructuras del índice (search_index.index_arrays
+                            + índice de texto, text_index)
+- similar__matrix.npy       vectores de "propiedades parecidas" (similarity)
+- derived.json              facetas de todo el dataset + columnas de esos vectores
+
+El arranque sólo lee meta.json y mapea archivos: no depende del tamaño
+de los `raw`, que se decodifican únicamente al pedir una fila. Como todo
+se mapea en modo lectura, varios workers comparten las mismas páginas
+(page cache): un worker más casi no suma memoria.
+"""
+
+import json
+import mmap
+import os
+import shutil
+from pathlib import Path
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.property_store import (
+    CATEGORICAL_COLUMNS,
+    NUMERIC_COLUMNS,
+    Categorical,
+    ColumnBuilder,
+    PropertyStore,
+)
+from backend.facets import compute_facets
+from backend.search_index import index_arrays
+from backend.serialization import dumps, encode_property, loads
+from backend.similarity import feature_matrix
+from backend.text_index import TextIndex, TextIndexBuilder
+
+SNAPSHOT_VERSION = 7
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SNAPSHOT_DIR = BASE_DIR / "data" / "enriched" / "nexxos_snapshot"
+
+
+# =========================
+# BLOBS (bytes + offsets)
+# =========================
+
+class BlobSequence(Sequence[bytes]):
+    """
+    Secuencia de blobs sobre un archivo mapeado en memoria.
+    offsets tiene len + 1 entradas.
+    """
+
+    def __init__(self, buffer, offsets: np.ndarray):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self._buffer[int(self._offsets[i]):int(self._offsets[i + 1])]
+
+
+class LazyRows(Sequence[dict]):
+    """
+    Filas como dicts, decodificadas sólo al accederlas.
+    """
+
+    def __init__(self, bodies: BlobSequence, raws: BlobSequence):
+        self._bodies = bodies
+        self._raws = raws
+
+    @property
+    def raws(self) -> BlobSequence:
+        return self._raws
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        prop = loads(self._bodies[i])
+        prop["raw"] = loads(self._raws[i])
+        return prop
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _map_blobs(path: Path) -> BlobSequence:
+    offsets = np.load(path.with_suffix(".offsets.npy"), mmap_mode="r")
+    if path.stat().st_size == 0:
+        return BlobSequence(b"", offsets)
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return BlobSequence(buffer, offsets)
+
+
+# =========================
+# ESCRITURA
+# =========================
+
+class _BlobWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._offsets = array("q", [0])
+
+    def write(self, blob: bytes) -> None:
+        self._file.write(blob)
+        self._offsets.append(self._offsets[-1] + len(blob))
+
+    def close(self) -> None:
+        self._file.close()
+        np.save(self.path.with_suffix(".offsets.npy"), np.array(self._offsets, dtype=np.int64))
+
+
+class SnapshotWriter:
+    """
+    Escribe el snapshot registro a registro: los blobs van directo a
+    disco y las columnas se acumulan en arrays compactos (ColumnBuilder).
+    Se arma en un directorio temporal y se reemplaza en close().
+    """
+
+    def __init__(self, target: Path = SNAPSHOT_DIR):
+        self.target = Path(target)
+        self._tmp = _fresh_tmp(self.target)
+
+        self._columns = ColumnBuilder()
+        self._text = TextIndexBuilder()
+        self._bodies = _BlobWriter(self._tmp / "bodies.bin")
+        self._raws = _BlobWriter(self._tmp / "raw.bin")
+
+    def append(self, prop: dict) -> None:
+        """
+        Agrega una propiedad YA normalizada (ver bootstrap_record).
+        """
+        self._columns.append(prop)
+        self._text.append(prop)
+        self._bodies.write(encode_property(prop))
+        self._raws.write(dumps(prop.get("raw")))
+
+    def close(self) -> Path:
+        self._bodies.close()
+        self._raws.close()
+        columns, categoricals, amenities, ids = self._columns.build()
+        _write_arrays(self._tmp, self._columns.size, columns, categoricals, amenities, ids,
+                      self._text.arrays())
+        return _replace_dir(self._tmp, self.target)
+
+
+def _fresh_tmp(target: Path) -> Path:
+    tmp = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    return tmp
+
+
+def _write_arrays(tmp: Path, size: int, columns, categoricals, amenities, ids,
+                  text_arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Columnas, índice y meta.json de un snapshot (los blobs ya escritos).
+    """
+    for name in NUMERIC_COLUMNS:
+        np.save(tmp / f"{name}.npy", columns[name])
+
+    labels: Dict[str, list] = {}
+    for name in CATEGORICAL_COLUMNS:
+        np.save(tmp / f"{name}_codes.npy", categoricals[name].codes)
+        labels[name] = categoricals[name].labels
+
+    np.save(tmp / "ids.npy", ids)
+
+    amenity_names = sorted(amenities)
+    for name in amenity_names:
+        np.save(tmp / f"amenity__{name}.npy", amenities[name])
+
+    index = {**index_arrays(columns, categoricals, amenities), **text_arrays}
+    for name, values in index.items():
+        np.save(tmp / f"index__{name}.npy", values)
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "size": size,
+        "categoricals": labels,
+        "amenities": amenity_names,
+        "index": sorted(index),
+    }
+    # meta.json se escribe al final: su presencia marca el snapshot completo
+    (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    _write_derived(tmp)
+
+
+def _write_derived(tmp: Path) -> None:
+    """
+    Agregados de todo el dataset que cada worker calcularía al publicar
+    la versión: se calculan una vez aquí (sobre el snapshot recién
+    escrito, aún no publicado) y los workers sólo los leen / mapean.
+    """
+    store, _ = load_snapshot_with_index(tmp)
+    matrix, features = feature_matrix(store)
+    np.save(tmp / "similar__matrix.npy", matrix)
+    derived = {"facets": compute_facets(store), "similar_features": features}
+    (tmp / "derived.json").write_text(json.dumps(derived, ensure_ascii=False), encoding="utf-8")
+
+
+def _replace_dir(tmp: Path, target: Path) -> Path:
+    old = target.with_name(target.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if target.exists():
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def write_snapshot(properties: Iterable[dict], target: Path = SNAPSHOT_DIR) -> Path:
+    """
+    Escribe el snapshot de propiedades YA normalizadas (salida de
+    bootstrap_data / bootstrap_records). Acepta cualquier iterable.
+    """
+    writer = SnapshotWriter(target)
+    for prop in properties:
+        writer.append(prop)
+    return writer.close()
+
+
+def apply_snapshot_delta(upserts: List[dict], removed_ids: List[str], target: Path = SNAPSHOT_DIR) -> Path:
+    """
+    Aplica un delta (registros YA normalizados + ids eliminados) sobre el
+    snapshot existente, con las mismas reglas que PropertyStore.apply_delta.
+    Sólo se codifican y tokenizan las filas del delta: los blobs de las
+    demás se copian tal cual y sus postings se reordenan.
+    """
+    target = Path(target)
+    base, arrays = load_snapshot_with_index(target)
+    store = base.apply_delta(upserts, removed_ids)
+    source, patched = store.delta
+    if arrays is not None and "text.vocab" in arrays:
+        text = TextIndex(arrays).patched(source, patched)
+    else:
+        text = TextIndex.build(store.rows)
+
+    tmp = _fresh_tmp(target)
+    bodies, raws = _BlobWriter(tmp / "bodies.bin"), _BlobWriter(tmp / "raw.bin")
+    base_raws = base.rows.raws
+    for row, row_source in enumerate(source.tolist()):
+        bodies.write(store.encoded[row])
+        prop = patched.get(row)
+        raws.write(dumps(prop.get("raw")) if prop is not None else base_raws[row_source])
+    bodies.close()
+    raws.close()
+
+    _write_arrays(
+        tmp, store.size,
+        {name: store.column(name) for name in NUMERIC_COLUMNS},
+        {name: store.column(name) for name in CATEGORICAL_COLUMNS},
+        store.amenities, store.ids, text.arrays(),
+    )
+    return _replace_dir(tmp, target)
+
+
+# =========================
+# LECTURA
+# =========================
+
+def snapshot_exists(target: Path = SNAPSHOT_DIR) -> bool:
+    return (Path(target) / "meta.json").exists()
+
+
+def snapshot_mtime(target: Path = SNAPSHOT_DIR) -> float:
+    return (Path(target) / "meta.json").stat().st_mtime
+
+
+def load_snapshot_with_index(
+    target: Path = SNAPSHOT_DIR,
+) -> Tuple[PropertyStore, Optional[Dict[str, np.ndarray]]]:
+    """
+    PropertyStore respaldado por archivos mapeados en memoria, más las
+    estructuras del índice (también mapeadas) para PropertyIndex.
+    """
+    target = Path(target)
+    meta = json.loads((target / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Versión de snapshot no soportada: {meta.get('version')}")
+
+    columns = {
+        name: np.load(target / f"{name}.npy", mmap_mode="r")
+        for name in NUMERIC_COLUMNS
+    }
+    categoricals = {
+        name: Categorical(labels, np.load(target / f"{name}_codes.npy", mmap_mode="r"))
+        for name, labels in meta["categoricals"].items()
+    }
+    amenities = {
+        name: np.load(target / f"amenity__{name}.npy", mmap_mode="r")
+        for name in meta["amenities"]
+    }
+
+    bodies = _map_blobs(target / "bodies.bin")
+    raws = _map_blobs(target / "raw.bin")
+
+    ids = np.load(target / "ids.npy", mmap_mode="r")
+
+    store = PropertyStore(LazyRows(bodies, raws), columns, categoricals, amenities, bodies, ids)
+    index = {
+        name: np.load(target / f"index__{name}.npy", mmap_mode="r")
+        for name in meta.get("index", [])
+    }
+    return store, index or None
+
+
+def load_derived(target: Path = SNAPSHOT_DIR) -> Optional[Dict[str, object]]:
+    """
+    {"facets", "similar": (matriz mapeada, columnas)} del snapshot, o None
+    si no están (se calculan al publicar, ver DataSnapshot).
+    """
+    target = Path(target)
+    try:
+        derived = json.loads((target / "derived.json").read_text(encoding="utf-8"))
+        matrix = np.load(target / "similar__matrix.npy", mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    return {"facets": derived["facets"], "similar": (matrix, derived["similar_features"])}
+
+
+def load_snapshot(target: Path = SNAPSHOT_DIR) -> PropertyStore:
+    """
+    PropertyStore respaldado por archivos mapeados en memoria.
+    """
+    return load_snapshot_with_index(target)[0]
@@ -0,0 +1,313 @@
+# backend/text_index.py
+"""
+Índice invertido de texto libre con ranking BM25.
+
+Campos indexados por propiedad (del registro original, `raw`):
+descripción, sector y tipo de propiedad. El análisis es el mismo para
+documentos y consultas:
+
+- minúsculas y sin tildes (amenities.fold)
+- sin stopwords del español
+- stemming liviano (plural y luego género): "mascotas" / "mascota"
+  → "mascot", "luces" → "luz", "casas" → "casa"
+
+Estructura (arrays planos, como el resto del índice, para guardarla en
+el snapshot y mapearla entre workers):
+
+- text.vocab    términos ordenados (id = posición)
+- text.offsets  inicio de las postings de cada término (CSR)
+- text.docs     filas de cada posting list (ascendentes)
+- text.tf       frecuencia ponderada por campo
+- text.doclen   largo (ponderado) de cada documento
+
+La consulta sólo puntúa un conjunto candidato (el resultado de los
+filtros estructurados): cada posting list se cruza con ese conjunto por
+búsqueda binaria, desde el lado más chico.
+"""
+
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.amenities import fold
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# sector y tipo son cortos y muy específicos: pesan más que la descripción
+FIELD_WEIGHTS = (("descripcion", 1.0), ("sector", 2.0), ("tipo_propiedad", 2.0))
+
+STOPWORDS = frozenset(fold(w) for w in """
+    a al algo algun alguna algunos ante antes como con contra cual cuando de del desde
+    donde durante e el ella ellas ellos en entre era es esa ese eso esta estan este esto
+    ha hay hasta la las le les lo los mas me mi mis mucho muy ni no nos o para pero
+    por que quien se sea ser si sin sobre son su sus tambien te tiene tienen todo
+    todos tu un una uno unos y ya
+""".split())
+
+SYNONYMS = {
+    "depto": "departamento",
+    "dpto": "departamento",
+    "deptos": "departamento",
+}
+
+# tope del cache de términos (las consultas traen palabras arbitrarias)
+STEM_CACHE_SIZE = 200_000
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+# =========================
+# ANÁLISIS
+# =========================
+
+def stem(word: str) -> str:
+    """
+    Stemmer liviano (palabra ya sin tildes): quita el plural y luego la
+    vocal de género en palabras de más de 4 letras.
+    """
+    if len(word) > 4 and word.endswith("ces"):
+        word = word[:-3] + "z"          # luces → luz
+    elif len(word) > 4 and word.endswith("es") and word[-3] not in "aeiou":
+        word = word[:-2]                # colores → color
+    elif len(word) > 3 and word.endswith("s") and word[-2] in "aeo":
+        word = word[:-1]                # casas → casa
+    if len(word) > 4 and word[-1] in "aeo":
+        word = word[:-1]                # luminosa / luminoso → luminos
+    return word
+
+
+_STEMS: Dict[str, Optional[str]] = {}
+
+
+def analyze(text) -> List[str]:
+    """
+    Términos de un texto (documento o consulta), en orden.
+    """
+    if not text or not isinstance(text, str):
+        return []
+    terms = []
+    for token in _TOKEN_RE.findall(fold(text)):
+        term = _STEMS.get(token, "")
+        if term == "":
+            if len(token) < 2 or token in STOPWORDS:
+                term = None
+            else:
+                term = stem(SYNONYMS.get(token, token))
+            if len(_STEMS) < STEM_CACHE_SIZE:
+                _STEMS[token] = term
+        if term is not None:
+            terms.append(term)
+    return terms
+
+
+def document_fields(prop: dict) -> List[Tuple[str, float]]:
+    """
+    (texto, peso) de cada campo indexado de una propiedad normalizada.
+    """
+    raw = prop.get("raw") or {}
+    ubicacion = prop.get("ubicacion") or {}
+    values = {
+        "descripcion": raw.get("descripcion") or prop.get("descripcion"),
+        "sector": ubicacion.get("sector") or raw.get("sector"),
+        "tipo_propiedad": raw.get("tipo_propiedad") or prop.get("tipo_propiedad"),
+    }
+    return [(values[name], weight) for name, weight in FIELD_WEIGHTS if values[name]]
+
+
+# =========================
+# CONSTRUCCIÓN
+# =========================
+
+class TextIndexBuilder:
+    """
+    Acumula postings fila a fila (arrays compactos) y arma el CSR en
+    arrays(). Lo usan el SnapshotWriter y la construcción en memoria.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._terms: Dict[str, int] = {}
+        self._term_ids = array("i")
+        self._rows = array("i")
+        self._tf = array("f")
+        self._doclen = array("f")
+
+    def append(self, prop: dict) -> None:
+        row = self.size
+        self.size += 1
+        weights: Counter = Counter()
+        for text, weight in document_fields(prop):
+            for term in analyze(text):
+                weights[term] += weight
+        terms = self._terms
+        for term, tf in weights.items():
+            term_id = terms.get(term)
+            if term_id is None:
+                term_id = terms[term] = len(terms)
+            self._term_ids.append(term_id)
+            self._rows.append(row)
+            self._tf.append(tf)
+        self._doclen.append(sum(weights.values()))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        vocab = sorted(self._terms)
+        # id de inserción → id en el vocabulario ordenado
+        remap = np.empty(len(vocab), dtype=np.int32)
+        for new_id, term in enumerate(vocab):
+            remap[self._terms[term]] = new_id
+
+        term_ids = remap[np.array(self._term_ids, dtype=np.int32)]
+        rows = np.array(self._rows, dtype=np.int32)
+        tf = np.array(self._tf, dtype=np.float32)
+
+        # postings por término; dentro de cada término, filas ascendentes
+        order = np.argsort(term_ids, kind="stable")
+        counts = np.bincount(term_ids, minlength=len(vocab))
+        return {
+            "text.vocab": np.array(vocab, dtype=str),
+            "text.offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            "text.docs": rows[order],
+            "text.tf": tf[order],
+            "text.doclen": np.array(self._doclen, dtype=np.float32),
+        }
+
+
+# =========================
+# CONSULTA
+# =========================
+
+class TextIndex:
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        vocab = arrays["text.vocab"]
+        self.terms = vocab
+        self.vocab: Dict[str, int] = {term: i for i, term in enumerate(vocab.tolist())}
+        self.offsets = arrays["text.offsets"]
+        self.docs = arrays["text.docs"]
+        self.tf = arrays["text.tf"]
+        self.doclen = arrays["text.doclen"]
+        self.size = len(self.doclen)
+        self.avgdl = float(self.doclen.mean()) if self.size else 0.0
+
+    @classmethod
+    def build(cls, properties: Iterable[dict]) -> "TextIndex":
+        builder = TextIndexBuilder()
+        for prop in properties:
+            builder.append(prop)
+        return cls(builder.arrays())
+
+    def patched(self, source: np.ndarray, props: Dict[int, dict]) -> "TextIndex":
+        """
+        Índice de una versión derivada de ésta (PropertyStore.apply_delta):
+        la fila i reutiliza los postings de la fila source[i] (-1 = nueva),
+        salvo las filas de `props` (fila → registro), que se re-tokenizan.
+        Sólo se analiza el texto del delta; el resto es reordenar arrays.
+        Da los mismos arrays que reconstruir todo.
+        """
+        size = len(source)
+        reused = np.asarray(source, dtype=np.int64).copy()
+        patched_rows = np.array(sorted(props), dtype=np.int64)
+        reused[patched_rows] = -1
+        keep = reused >= 0
+
+        # postings de la base → fila nueva (-1 = fila eliminada o re-tokenizada)
+        new_row = np.full(self.size, -1, dtype=np.int64)
+        new_row[reused[keep]] = np.flatnonzero(keep)
+        base_terms = np.repeat(np.arange(len(self.terms)), np.diff(self.offsets))
+        base_docs = new_row[self.docs]
+        alive = base_docs >= 0
+
+        builder = TextIndexBuilder()
+        for row in patched_rows.tolist():
+            builder.append(props[row])
+        patch = builder.arrays()
+        patch_terms = np.repeat(np.arange(len(patch["text.vocab"])), np.diff(patch["text.offsets"]))
+
+        # vocabulario unido y ordenado; ids de cada lado → id unido
+        vocab = np.union1d(self.terms, patch["text.vocab"])
+        terms = np.concatenate([
+            np.searchsorted(vocab, self.terms)[base_terms[alive]],
+            np.searchsorted(vocab, patch["text.vocab"])[patch_terms],
+        ])
+        docs = np.concatenate([base_docs[alive], patched_rows[patch["text.docs"]]]).astype(np.int32)
+        tf = np.concatenate([self.tf[alive], patch["text.tf"]])
+
+        # términos que quedaron sin postings salen del vocabulario
+        counts = np.bincount(terms, minlength=len(vocab))
+        used = counts > 0
+        compact = np.cumsum(used) - 1
+        terms = compact[terms]
+        order = np.lexsort((docs, terms))
+
+        doclen = np.zeros(size, dtype=np.float32)
+        doclen[keep] = self.doclen[reused[keep]]
+        doclen[patched_rows] = patch["text.doclen"]
+        return TextIndex({
+            "text.vocab": vocab[used],
+            "text.offsets": np.concatenate(([0], np.cumsum(counts[used]))).astype(np.int64),
+            "text.docs": docs[order],
+            "text.tf": tf[order],
+            "text.doclen": doclen,
+        })
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "text.vocab": self.terms,
+            "text.offsets": self.offsets,
+            "text.docs": self.docs,
+            "text.tf": self.tf,
+            "text.doclen": self.doclen,
+        }
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        term_id = self.vocab.get(term)
+        if term_id is None:
+            return self.docs[:0], self.tf[:0]
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.docs[start:end], self.tf[start:end]
+
+    def idf(self, df: int) -> float:
+        return math.log(1.0 + (self.size - df + 0.5) / (df + 0.5))
+
+    def known_terms(self, terms: Iterable[str]) -> List[str]:
+        return [t for t in dict.fromkeys(terms) if t in self.vocab]
+
+    def score(self, terms: List[str], rows: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Puntaje BM25 de cada fila de `rows` (ascendentes; None = todas).
+        0 = no contiene ningún término. None si ningún término de la
+        consulta aparece en el corpus (la consulta no restringe nada).
+        """
+        terms = self.known_terms(terms)
+        if not terms:
+            return None
+
+        size = self.size if rows is None else len(rows)
+        scores = np.zeros(size, dtype=np.float32)
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doclen / max(self.avgdl, 1e-9))
+
+        if not size:
+            return scores
+
+        for term in terms:
+            docs, tf = self.postings(term)
+            idf = self.idf(len(docs))
+            if rows is None:
+                positions = docs
+            elif len(rows) < len(docs):
+                # candidatos chicos: cada candidato se busca en la posting list
+                found = np.minimum(np.searchsorted(docs, rows), len(docs) - 1)
+                hit = docs[found] == rows
+                positions, docs, tf = np.flatnonzero(hit), rows[hit], tf[found[hit]]
+            else:
+                # posting list chica: cada posting se busca en los candidatos
+                found = np.minimum(np.searchsorted(rows, docs), len(rows) - 1)
+                hit = rows[found] == docs
+                positions, docs, tf = found[hit], docs[hit], tf[hit]
+            scores[positions] += idf * tf * (BM25_K1 + 1.0) / (tf + norm[docs])
+        return scores
@@ -1,5 +1,33 @@
 # backend/utils.py
 import math
+from typing import Any, Optional
+
+from backend.amenities import fold
+
+
+def comuna_to_str(value: Any) -> Optional[str]:
+    """
+    Normaliza la comuna a string, venga como texto o como dict {"nombre": ...}.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        nombre = value.get("nombre")
+        if isinstance(nombre, str):
+            return nombre.strip()
+    return None
+
+
+def comuna_key(value: Any) -> Optional[str]:
+    """
+    Clave de comparación de una comuna: minúsculas y sin tildes, así
+    "Los Ángeles" (léxico) y "Los Angeles" (data) son la misma.
+    """
+    comuna = comuna_to_str(value)
+    return fold(comuna) if comuna else None
+
 
 def clean_for_json(obj):
     """
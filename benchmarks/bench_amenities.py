@@ -0,0 +1,94 @@
+"""
+Benchmark: detector de amenities compilado vs. implementación anterior
+(una re.search por palabra clave y por fila).
+
+Uso: python benchmarks/bench_amenities.py [archivo.xlsx]
+
+Toma las descripciones del Excel (columnas de "descripcion" en
+scripts/column_map.json). Si el export no trae descripciones, usa el
+texto libre disponible por fila (tipo, dirección, sector, comuna).
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.amenities import AMENITIES_KEYWORDS, extract_amenities  # noqa: E402
+
+FALLBACK_TEXT_COLUMNS = ["Tipo 1", "Dirección web", "Calle", "Sector", "Comuna"]
+
+
+def legacy_extract_amenities(text):
+    # Copia de la versión original de scripts/xls_to_json.py
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return {}
+    text = str(text).lower().strip()
+    if not text:
+        return {}
+    amenities = {}
+    for amenity, keywords in AMENITIES_KEYWORDS.items():
+        amenities[amenity] = any(
+            re.search(rf"\b{re.escape(k)}\b", text) for k in keywords
+        )
+    return amenities
+
+
+def load_texts(excel_path: Path):
+    df = pd.read_excel(excel_path, header=6)
+    column_map = json.loads((BASE_DIR / "scripts" / "column_map.json").read_text(encoding="utf-8"))
+    columns = [c for c in column_map["descripcion"] if c in df.columns]
+    source = "descripcion"
+    if not columns:
+        columns = [c for c in FALLBACK_TEXT_COLUMNS if c in df.columns]
+        source = "texto libre (" + ", ".join(columns) + ")"
+    texts = df[columns].fillna("").astype(str).agg(" ".join, axis=1).tolist()
+    return texts, source
+
+
+def timed(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = [fn(t) for t in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main(excel_path: Path, repeat: int = 5):
+    texts, source = load_texts(excel_path)
+
+    legacy_s, legacy = timed(legacy_extract_amenities, texts, repeat)
+    compiled_s, compiled = timed(extract_amenities, texts, repeat)
+
+    # todo lo que detectaba la versión anterior se sigue detectando; las
+    # diferencias sólo pueden venir de ignorar tildes ("jardin" = "jardín")
+    missed = sum(
+        1 for old, new in zip(legacy, compiled)
+        if any(v and not new.get(k) for k, v in old.items())
+    )
+    accent_only = sum(1 for old, new in zip(legacy, compiled) if old != new)
+
+    result = {
+        "benchmark": "amenities",
+        "rows": len(texts),
+        "source": source,
+        "legacy_ms": round(legacy_s * 1e3, 2),
+        "compiled_ms": round(compiled_s * 1e3, 2),
+        "speedup": round(legacy_s / compiled_s, 1) if compiled_s else None,
+        "missed_vs_legacy": missed,
+        "extra_by_accent_folding": accent_only,
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else BASE_DIR / "propiedades_nexxos.xlsx"
+    main(path)
@@ -0,0 +1,156 @@
+"""
+Prueba de carga de POST /assistant: latencias p50 / p95 / p99 bajo
+tráfico concurrente.
+
+Uso:
+    python benchmarks/load_assistant.py [--url http://127.0.0.1:8000]
+        [--root DIR] [--concurrency 64] [--requests 2000] [--cache]
+
+Sin --url levanta `uvicorn backend.app:app` desde --root (por defecto
+este repo) en un puerto libre; con --root apuntando a un worktree de
+otra versión se comparan antes / después con la misma carga. El cache
+de respuestas se desactiva salvo --cache (RESULT_CACHE_SIZE=0), para
+medir la búsqueda y no el cache.
+
+Imprime un JSON con los resultados.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+QUERIES = [
+    "arriendo providencia",
+    "venta las condes 5000 uf",
+    "arriendo ñuñoa hasta 800.000",
+    "venta vitacura",
+    "arriendo santiago centro 500000",
+    "departamento en la reina",
+    "venta la florida 3.500 UF",
+    "arriendo las condes con piscina",
+    "casa en venta en colina",
+    "propiedades en maipú",
+    "arriendo",
+    "venta",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+def start_server(root: Path, port: int, cache: bool) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=str(root), DATA_RELOAD_INTERVAL="0")
+    if not cache:
+        env["RESULT_CACHE_SIZE"] = "0"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("el servidor no respondió")
+
+
+async def run_load(url: str, concurrency: int, total: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    payloads = [
+        {"message": rng.choice(QUERIES), "offset": rng.choice([0, 0, 0, 20, 40])}
+        for _ in range(total)
+    ]
+    latencies = []
+    statuses = {}
+    queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+
+    async with httpx.AsyncClient(base_url=url, timeout=30,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        # calentamiento: carga de data, imports perezosos
+        await client.post("/assistant", json={"message": "arriendo providencia"})
+
+        async def worker():
+            while not queue.empty():
+                payload = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    r = await client.post("/assistant", json=payload)
+                    status = r.status_code
+                except httpx.HTTPError:
+                    status = "error"
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "status": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url")
+    parser.add_argument("--root", default=str(BASE_DIR))
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cache", action="store_true")
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        proc = start_server(Path(args.root), port, args.cache)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        result = asyncio.run(run_load(url, args.concurrency, args.requests))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    result.update({"root": args.root, "cache": args.cache})
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
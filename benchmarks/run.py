@@ -0,0 +1,403 @@
+"""
+Suite de benchmarks sobre datasets sintéticos (benchmarks/synthetic.py).
+
+Uso:
+    python benchmarks/run.py [--sizes 1k,10k] [--out resultado.json]
+        [--compare anterior.json] [--xls-max 10k] [--quick]
+
+Por tamaño de dataset mide:
+- bootstrap_data            (NDJSON enriquecido → registros normalizados)
+- clean_for_json            (sobre todos los registros)
+- build_store_index         (PropertyStore + PropertyIndex)
+- build_text_index          (índice BM25 de descripción / sector / tipo)
+- search_properties         (consultas típicas, data publicada)
+- search_text               (texto libre sobre filtros estructurados)
+- build_similarity / similar_nearest   (matriz de features + top-10 parecidas)
+- percolate_index / percolate_batch     (100k búsquedas guardadas vs. un lote de 1000)
+- find_duplicates           (registros + 20% republicado por otra fuente)
+- extract_filters_from_text / interpret_message (mensajes típicos)
+- xls_to_json.main          (Excel sintético; hasta --xls-max filas)
+- assistant_e2e             (POST /assistant vía ASGI en el proceso,
+                             con y sin cache de respuestas)
+
+Imprime (y con --out guarda) un JSON; --compare muestra la razón
+contra otra corrida para detectar regresiones entre commits.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+import httpx  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from backend.ai_interpreter import interpret_message  # noqa: E402
+from backend.app import app  # noqa: E402
+from backend.assistant_router import extract_filters_from_text  # noqa: E402
+from backend.data_bootstrap import bootstrap_data  # noqa: E402
+from backend.data_loader import publish_store  # noqa: E402
+from backend.dedup import find_duplicates  # noqa: E402
+from backend.ndjson import write_ndjson  # noqa: E402
+from backend.property_store import PropertyStore  # noqa: E402
+from backend.result_cache import result_cache  # noqa: E402
+from backend.saved_searches import SavedSearchStore  # noqa: E402
+from backend.search_engine import search_properties  # noqa: E402
+from backend.search_index import PropertyIndex  # noqa: E402
+from backend.similarity import SimilarityIndex  # noqa: E402
+from backend.text_index import TextIndex  # noqa: E402
+from backend.utils import clean_for_json  # noqa: E402
+from synthetic import generate_enriched, generate_raw, parse_size  # noqa: E402
+
+MESSAGES = [
+    "arriendo providencia",
+    "venta las condes 5000 uf",
+    "arriendo en nunoa hasta 800.000",
+    "casa arriendo en la reina por menos de 2 MM$",
+    "departamento en vitacura con piscina",
+    "busco algo en la dehesa, venta, 3.500 UF",
+    "arriendo santiago centro 2,5 millones",
+    "quiero comprar en san pedro de la paz",
+]
+
+SEARCHES = [
+    {"comuna": "providencia", "operacion": "arriendo"},
+    {"comuna": "las condes", "operacion": "venta", "precio_max_uf": 8000},
+    {"operacion": "arriendo", "precio_max_clp": 600000},
+    {"comuna": "ñuñoa", "amenities": ["piscina"]},
+    {"operacion": "venta", "dormitorios_min": 3, "banos_min": 2},
+    {},
+]
+
+TEXT_SEARCHES = [
+    {"texto": "cerca del metro"},
+    {"texto": "acepta mascotas", "operacion": "arriendo"},
+    {"texto": "vista despejada orientación norte", "comuna": "las condes"},
+    {"texto": "casa con quincho", "operacion": "venta", "precio_max_uf": 8000},
+]
+
+
+# =========================
+# MEDICIÓN
+# =========================
+
+def measure(fn: Callable[[], object], repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """
+    Tiempo por llamada (µs): mediana y mínimo de `repeat` tandas de `number`.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number * 1e6)
+    return {
+        "median_us": round(statistics.median(samples), 2),
+        "min_us": round(min(samples), 2),
+        "calls": repeat * number,
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    # los prints del camino caliente no deben contar ni ensuciar la salida
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def write_xlsx(path: Path, records: List[dict]) -> None:
+    """
+    Excel con el formato del export (encabezados en la fila 7).
+    """
+    rows = []
+    for r in records:
+        venta, arriendo = r["precio"]["venta"], r["precio"]["arriendo"]
+        rows.append({
+            "Código": r["codigo"],
+            "Estado": r["estado"],
+            "En Venta": "SI" if r["operacion"] == "venta" else "NO",
+            "En Arriendo": "SI" if r["operacion"] == "arriendo" else "NO",
+            "Tipo Propiedad": r["tipo_propiedad"],
+            "Divisa ppal.": r["moneda"],
+            "Gastos Comunes": r["gastos_comunes"],
+            "Comuna": r["comuna"],
+            "Sector": r["sector"],
+            "Región": r["region"],
+            "Dormitorios": r["dormitorios"],
+            "Baños": r["banos"],
+            "Estacionamientos": r["estacionamientos"],
+            "Sup. Construida": r["superficie_construida"],
+            "Descripción": r["descripcion"],
+            "Exclusiva": "SI" if r["exclusiva"] else "NO",
+            "Destacada": "SI" if r["destacada"] else "NO",
+            "En web y portales": r["publicada_web"],
+            "Precio ppal.": venta["principal"] or arriendo["principal"],
+            "Precio UF": venta["uf"] or arriendo["uf"],
+            "Precio Pesos": venta["pesos"] or arriendo["pesos"],
+        })
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(rows).to_excel(writer, index=False, startrow=6)
+
+
+def saved_search_filters(store: PropertyStore, count: int, seed: int = 0) -> List[dict]:
+    """
+    Búsquedas guardadas plausibles: operación / comuna de una propiedad
+    al azar, tope de precio cerca del suyo y a veces amenities.
+    """
+    rng = random.Random(seed)
+    amenities = sorted(store.amenities)
+    filters = []
+    for _ in range(count):
+        row = rng.randrange(store.size)
+        operacion = store.operacion.labels[store.operacion.codes[row]]
+        f = {"operacion": operacion}
+        if rng.random() < 0.95:
+            f["comuna"] = store.comuna.labels[store.comuna.codes[row]]
+        price = store.price_uf[row] if operacion == "venta" else store.price_clp[row]
+        if rng.random() < 0.8 and price == price:
+            key = "precio_max_uf" if operacion == "venta" else "precio_max_clp"
+            f[key] = round(float(price) * rng.uniform(0.7, 1.5), -2)
+        if amenities and rng.random() < 0.3:
+            f["amenities"] = rng.sample(amenities, 1)
+        if rng.random() < 0.3:
+            f["dormitorios_min"] = rng.randint(1, 3)
+        filters.append(f)
+    return filters
+
+
+def republished(records: List[dict], share: float = 0.2, seed: int = 0) -> List[dict]:
+    """
+    Copias de una fracción de los registros publicadas por otra fuente,
+    con el precio movido hasta ±3% (para find_duplicates).
+    """
+    rng = random.Random(seed)
+    copies = []
+    for prop in records:
+        if rng.random() >= share:
+            continue
+        copy = dict(prop, id=f"otro-{prop.get('source_id')}", source="otro")
+        precio = dict(prop.get("precio") or {})
+        if precio.get("uf"):
+            precio["uf"] = round(precio["uf"] * rng.uniform(0.97, 1.03), 2)
+        copy["precio"] = precio
+        copies.append(copy)
+    return copies
+
+
+# =========================
+# BENCHMARKS
+# =========================
+
+async def assistant_throughput(requests: int, concurrency: int) -> Dict[str, float]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(requests):
+            queue.put_nowait({"message": MESSAGES[i % len(MESSAGES)], "offset": (i // len(MESSAGES)) % 3 * 20})
+
+        async def worker():
+            while not queue.empty():
+                payload = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post("/assistant", json=payload)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1e6)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "rps": round(requests / elapsed, 1),
+        "p50_us": round(latencies[len(latencies) // 2], 2),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+def bench_size(size: int, workdir: Path, xls_max: int, quick: bool) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    repeat = 3 if quick else 5
+
+    enriched_path = workdir / f"enriched_{size}.ndjson"
+    write_ndjson(enriched_path, generate_enriched(size))
+
+    with quiet():
+        started = time.perf_counter()
+        records = bootstrap_data(enriched_path)
+        results["bootstrap_data"] = {"seconds": round(time.perf_counter() - started, 4)}
+
+        results["clean_for_json"] = measure(lambda: [clean_for_json(r) for r in records], repeat=repeat)
+
+        started = time.perf_counter()
+        store = PropertyStore.from_properties(records)
+        PropertyIndex(store)
+        results["build_store_index"] = {"seconds": round(time.perf_counter() - started, 4)}
+
+        started = time.perf_counter()
+        TextIndex.build(records)
+        results["build_text_index"] = {"seconds": round(time.perf_counter() - started, 4)}
+        snapshot = publish_store(store)
+
+        started = time.perf_counter()
+        SimilarityIndex(store, snapshot.index)
+        results["build_similarity"] = {"seconds": round(time.perf_counter() - started, 4)}
+        sample = list(range(0, store.size, max(store.size // 100, 1)))
+        results["similar_nearest"] = measure(
+            lambda: [snapshot.similar.nearest(row, 10) for row in sample], repeat=repeat,
+        )
+
+        saved = SavedSearchStore(path=None)
+        saved.add_many(saved_search_filters(store, 100_000))
+        started = time.perf_counter()
+        saved.index()
+        results["percolate_index"] = {"seconds": round(time.perf_counter() - started, 4)}
+        batch = store.ids[::max(store.size // 1000, 1)][:1000].tolist()
+        results["percolate_batch"] = measure(lambda: saved.percolate(snapshot, batch), repeat=repeat)
+
+        feeds = records + republished(records)
+        started = time.perf_counter()
+        clusters = find_duplicates(feeds)
+        results["find_duplicates"] = {
+            "seconds": round(time.perf_counter() - started, 4),
+            "records": len(feeds),
+            "clusters": len(clusters),
+        }
+
+        for i, filters in enumerate(SEARCHES):
+            results[f"search_properties[{i}]"] = {
+                "filters": filters,
+                **measure(lambda: search_properties(**filters), repeat=repeat, number=5),
+            }
+        for i, filters in enumerate(TEXT_SEARCHES):
+            results[f"search_text[{i}]"] = {
+                "filters": filters,
+                **measure(lambda: search_properties(**filters), repeat=repeat, number=5),
+            }
+
+    results["extract_filters_from_text"] = measure(
+        lambda: [extract_filters_from_text(m) for m in MESSAGES], repeat=repeat, number=100,
+    )
+    results["interpret_message"] = measure(
+        lambda: [interpret_message(m) for m in MESSAGES], repeat=repeat, number=100,
+    )
+
+    if size <= xls_max:
+        import xls_to_json
+
+        xlsx = workdir / f"synthetic_{size}.xlsx"
+        write_xlsx(xlsx, list(generate_raw(size)))
+        # xls_to_json lee scripts/column_map.json y escribe data/nexxos/ relativo al cwd
+        (workdir / "scripts").mkdir(exist_ok=True)
+        shutil.copy(BASE_DIR / "scripts" / "column_map.json", workdir / "scripts")
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with quiet():
+                started = time.perf_counter()
+                xls_to_json.main(str(xlsx))
+                results["xls_to_json.main"] = {"seconds": round(time.perf_counter() - started, 4)}
+        finally:
+            os.chdir(cwd)
+
+    requests = 200 if quick else 1000
+    with quiet():
+        maxsize = result_cache.maxsize
+        try:
+            result_cache.maxsize = 0
+            result_cache.clear()
+            results["assistant_e2e"] = asyncio.run(assistant_throughput(requests, 16))
+            result_cache.maxsize = maxsize
+            results["assistant_e2e_cached"] = asyncio.run(assistant_throughput(requests, 16))
+        finally:
+            result_cache.maxsize = maxsize
+
+    return results
+
+
+# =========================
+# COMPARACIÓN
+# =========================
+
+METRICS = ("median_us", "seconds", "p99_us")
+
+
+def compare(current: dict, previous: dict) -> Dict[str, Dict[str, float]]:
+    """
+    Razón actual / anterior por benchmark (> 1 = más lento).
+    """
+    ratios: Dict[str, Dict[str, float]] = {}
+    for size, benches in current["results"].items():
+        before = previous.get("results", {}).get(size, {})
+        for name, values in benches.items():
+            old = before.get(name)
+            if not old:
+                continue
+            for metric in METRICS:
+                if values.get(metric) and old.get(metric):
+                    ratios.setdefault(size, {})[f"{name}.{metric}"] = round(values[metric] / old[metric], 3)
+    return ratios
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks")
+    parser.add_argument("--sizes", default="1k,10k", help="ej: 1k,10k,100k,1m")
+    parser.add_argument("--xls-max", default="10k", help="tamaño máximo para xls_to_json")
+    parser.add_argument("--quick", action="store_true", help="menos repeticiones")
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in args.sizes.split(","):
+            size = parse_size(label)
+            report["results"][label] = bench_size(size, Path(tmp), parse_size(args.xls_max), args.quick)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["compare"] = {"against": args.compare, "ratios": compare(report, json.load(f))}
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(output, encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Generador de datasets sintéticos de propiedades.
+
+Produce registros con la forma de la fuente (salida de
+scripts/xls_to_json.py) y, enriquecidos con enrich_nexxos.enrich_property,
+exactamente el esquema que consume el backend. Distribuciones:
+
+- comuna: concentrada en el sector oriente / centro de Santiago, con cola
+  larga sobre las 346 comunas (backend/lexicon.py)
+- precio: log-normal por operación y nivel de la comuna (UF en venta,
+  CLP en arriendo); ~5% sin precio publicado
+- dormitorios / baños / gastos comunes correlacionados
+- descripción armada con frases frecuentes; amenities derivados de ella
+  con el mismo detector de la ingesta
+
+Uso:
+    python benchmarks/synthetic.py --size 10000 [--seed 0] [--enriched]
+        [--out benchmarks/data/synthetic_10k.ndjson]
+"""
+
+import argparse
+import math
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+from backend.amenities import extract_amenities  # noqa: E402
+from backend.data_bootstrap import UF_REFERENCIA  # noqa: E402
+from backend.lexicon import COMUNAS_POR_REGION, SECTORES  # noqa: E402
+from backend.ndjson import write_ndjson  # noqa: E402
+from enrich_nexxos import enrich_property  # noqa: E402
+
+BASE_URL = "https://nexxospropiedades.cl/fichaPropiedad.aspx?i="
+
+# comunas con más oferta (peso relativo) y su nivel de precios
+TOP_COMUNAS = {
+    "Las Condes": (14, "alto"),
+    "Providencia": (12, "alto"),
+    "Ñuñoa": (10, "medio"),
+    "Santiago": (10, "bajo"),
+    "Vitacura": (6, "alto"),
+    "Lo Barnechea": (5, "alto"),
+    "La Florida": (4, "medio"),
+    "Maipú": (4, "bajo"),
+    "La Reina": (3, "alto"),
+    "Peñalolén": (3, "medio"),
+    "Macul": (3, "medio"),
+    "San Miguel": (3, "medio"),
+    "Estación Central": (3, "bajo"),
+    "Independencia": (2, "bajo"),
+    "Puente Alto": (2, "bajo"),
+    "Colina": (2, "medio"),
+    "Viña del Mar": (4, "medio"),
+    "Concón": (2, "medio"),
+    "Valparaíso": (2, "bajo"),
+    "Concepción": (2, "bajo"),
+    "La Serena": (2, "medio"),
+    "Puerto Varas": (1, "medio"),
+    "Temuco": (1, "bajo"),
+}
+LONG_TAIL_WEIGHT = 0.05
+
+# mediana de precio por nivel: (venta UF, arriendo CLP)
+PRICE_LEVELS = {
+    "alto": (11000, 1_300_000),
+    "medio": (5500, 700_000),
+    "bajo": (3000, 450_000),
+}
+
+TIPOS = [("departamento", 0.65), ("casa", 0.3), ("oficina", 0.05)]
+DORMITORIOS = [(1, 0.18), (2, 0.34), (3, 0.3), (4, 0.12), (5, 0.06)]
+
+FRASES = [
+    "cerca del metro", "vista despejada", "acepta mascotas", "muy luminoso",
+    "orientación norte", "recién remodelado", "cocina americana", "a pasos de colegios",
+    "excelente conectividad", "barrio tranquilo", "estacionamiento incluido",
+    "con piscina", "gimnasio equipado", "quincho para asados", "amplia terraza",
+    "bodega", "lavandería", "conserjería 24 horas", "áreas verdes", "jardín",
+    "amoblado", "ascensor", "calefacción central", "doble vidrio termopanel",
+]
+
+
+def _weighted(rng: random.Random, options):
+    values, weights = zip(*options)
+    return rng.choices(values, weights=weights)[0]
+
+
+def comuna_weights() -> List:
+    options = []
+    region_by_comuna = {}
+    for region, comunas in COMUNAS_POR_REGION.items():
+        for comuna in comunas:
+            region_by_comuna[comuna] = region
+            weight, level = TOP_COMUNAS.get(comuna, (LONG_TAIL_WEIGHT, "bajo"))
+            options.append(((comuna, region, level), weight))
+    return options
+
+
+def sectores_por_comuna() -> Dict[str, List[str]]:
+    sectores: Dict[str, List[str]] = {}
+    for sector, comuna in SECTORES.items():
+        sectores.setdefault(comuna, []).append(sector.title())
+    return sectores
+
+
+def generate_raw(size: int, seed: int = 0) -> Iterator[dict]:
+    """
+    Registros con la forma de data/sources/nexxos.json.
+    """
+    rng = random.Random(seed)
+    comunas = comuna_weights()
+    sectores = sectores_por_comuna()
+
+    for i in range(size):
+        codigo = str(100000 + i)
+        comuna, region, level = _weighted(rng, comunas)
+        operacion = "venta" if rng.random() < 0.55 else "arriendo"
+        tipo = _weighted(rng, TIPOS)
+        dormitorios = _weighted(rng, DORMITORIOS) if tipo != "oficina" else 0
+        banos = max(1, min(dormitorios, rng.choice([1, 1, 2, 2, 3])))
+        superficie = round(rng.lognormvariate(math.log(35 + 25 * max(dormitorios, 1)), 0.25), 1)
+
+        venta_uf, arriendo_clp = PRICE_LEVELS[level]
+        factor = rng.lognormvariate(0, 0.45) * (0.6 + 0.2 * max(dormitorios, 1))
+        visible = rng.random() > 0.05
+
+        venta = {"activo": False, "divisa": None, "principal": None, "uf": None, "pesos": None}
+        arriendo = dict(venta)
+        if operacion == "venta" and visible:
+            uf = round(venta_uf * factor, 0)
+            venta = {"activo": True, "divisa": "UF", "principal": uf, "uf": uf,
+                     "pesos": round(uf * UF_REFERENCIA, 0)}
+        elif operacion == "arriendo" and visible:
+            clp = round(arriendo_clp * factor, -3)
+            arriendo = {"activo": True, "divisa": "$", "principal": clp,
+                        "uf": round(clp / UF_REFERENCIA, 2), "pesos": clp}
+
+        gastos = None
+        if tipo != "casa" or rng.random() < 0.3:
+            gastos = int(round(rng.lognormvariate(math.log(60000 + 25000 * dormitorios), 0.4), -3))
+
+        frases = rng.sample(FRASES, rng.randint(2, 6))
+        descripcion = (
+            f"{tipo.capitalize()} de {dormitorios} dormitorios y {banos} baños en {comuna}, "
+            + ", ".join(frases) + "."
+        )
+
+        sector_options = sectores.get(comuna)
+        sector = rng.choice(sector_options) if sector_options and rng.random() < 0.6 else None
+
+        yield {
+            "codigo": codigo,
+            "estado": "Activa",
+            "operacion": operacion,
+            "tipo_propiedad": tipo,
+            "moneda": "UF" if operacion == "venta" else "$",
+            "gastos_comunes": gastos,
+            "comuna": comuna,
+            "sector": sector,
+            "region": region,
+            "dormitorios": dormitorios,
+            "banos": banos,
+            "estacionamientos": rng.choice([0, 1, 1, 2]),
+            "superficie_construida": superficie,
+            "descripcion": descripcion,
+            "exclusiva": rng.random() < 0.2,
+            "destacada": rng.random() < 0.1,
+            "publicada_web": "SI",
+            "id": f"nexxos-{codigo}",
+            "source": "nexxos",
+            "source_id": codigo,
+            "link": f"{BASE_URL}{codigo}",
+            "amenities": extract_amenities(descripcion),
+            "precio": {"venta": venta, "arriendo": arriendo},
+        }
+
+
+def generate_enriched(size: int, seed: int = 0) -> Iterator[dict]:
+    """
+    Registros enriquecidos (esquema de enrich_nexxos.enrich_property).
+    """
+    for raw in generate_raw(size, seed):
+        yield enrich_property(raw)
+
+
+def parse_size(value: str) -> int:
+    value = value.lower().replace("_", "")
+    if value.endswith("m"):
+        return int(float(value[:-1]) * 1_000_000)
+    if value.endswith("k"):
+        return int(float(value[:-1]) * 1_000)
+    return int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset sintético de propiedades")
+    parser.add_argument("--size", default="10k", help="1k, 10k, 100k, 1m o un número")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enriched", action="store_true", help="escribir ya enriquecido")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    out = Path(args.out or BASE_DIR / "benchmarks" / "data" / f"synthetic_{args.size}.ndjson")
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    records = generate_enriched(size, args.seed) if args.enriched else generate_raw(size, args.seed)
+    count = write_ndjson(out, records)
+    print(f"✅ {count} propiedades sintéticas en {out}")
+
+
+if __name__ == "__main__":
+    main()
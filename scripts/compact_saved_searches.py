@@ -0,0 +1,30 @@
+"""
+Compacta el log de búsquedas guardadas (sólo las altas vigentes) y
+aparta las entradas inválidas en <log>.rejected.
+
+Uso (con los workers detenidos, p. ej. en un deploy):
+    python scripts/compact_saved_searches.py
+
+Los workers sólo agregan líneas al log; lo que se agregue mientras
+corre este script se perdería al reemplazar el archivo.
+"""
+
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.saved_searches import saved_searches  # noqa: E402
+
+
+def main():
+    if saved_searches.path is None:
+        print("⚠️ SAVED_SEARCHES_PATH vacío: no hay log que compactar")
+        return
+    count = saved_searches.compact()
+    print(f"✅ Log compactado: {saved_searches.path} ({count} búsquedas)")
+
+
+if __name__ == "__main__":
+    main()
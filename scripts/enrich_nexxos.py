@@ -1,10 +1,27 @@
+import hashlib
 import json
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.data_bootstrap import bootstrap_record, bootstrap_records  # noqa: E402
+from backend.data_loader import data_signature, snapshot_is_fresh  # noqa: E402
+from backend.ndjson import iter_records, write_ndjson  # noqa: E402
+from backend.snapshot import SnapshotWriter, apply_snapshot_delta, write_snapshot  # noqa: E402
+
 INPUT_FILE = BASE_DIR / "data" / "sources" / "nexxos.json"
+INPUT_NDJSON = BASE_DIR / "data" / "sources" / "nexxos.ndjson"
 OUTPUT_DIR = BASE_DIR / "data" / "enriched"
 OUTPUT_FILE = OUTPUT_DIR / "nexxos_enriched.json"
+OUTPUT_NDJSON = OUTPUT_DIR / "nexxos_enriched.ndjson"
+STATE_FILE = OUTPUT_DIR / "nexxos_state.json"
+DELTA_FILE = OUTPUT_DIR / "nexxos_delta.json"
+
+# subir al cambiar enrich_property: entra en el hash de estado, así la
+# corrida incremental re-enriquece todo lo hecho con la versión anterior
+ENRICHER_VERSION = 2
 
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -101,6 +118,8 @@ def enrich_property(raw: dict) -> dict:
             "dormitorios": raw.get("dormitorios"),
             "banos": raw.get("banos"),
             "gastos_comunes_clp": raw.get("gastos_comunes"),
+            "superficie_m2": safe_float(raw.get("superficie_construida"))
+            or safe_float(raw.get("superficie_total")),
         },
 
         "amenities": raw.get("amenities", {}),
@@ -108,17 +127,127 @@ def enrich_property(raw: dict) -> dict:
     }
 
 
-def main():
+def content_hash(raw: dict) -> str:
+    payload = json.dumps([ENRICHER_VERSION, raw], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def load_json(path: Path, default):
+    if not path.exists():
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def enrich_incremental(data: list, state: dict, previous: dict):
+    """
+    Re-enriquece sólo registros nuevos o cambiados (según hash por id).
+    Devuelve (enriched, hashes, delta).
+    """
+    enriched = []
+    hashes = {}
+    delta = {"added": [], "updated": [], "removed": []}
+
+    for raw in data:
+        pid = raw.get("id")
+        h = content_hash(raw)
+        hashes[pid] = h
+
+        if pid in previous and state.get(pid) == h:
+            enriched.append(previous[pid])
+            continue
+
+        prop = enrich_property(raw)
+        enriched.append(prop)
+        delta["updated" if pid in previous else "added"].append(prop)
+
+    delta["removed"] = [pid for pid in previous if pid not in hashes]
+    return enriched, hashes, delta
+
+
+def main_stream():
+    """
+    Modo streaming: lee la fuente registro a registro (.ndjson si existe,
+    si no el array .json), enriquece en un generador y escribe NDJSON y
+    el snapshot a medida que avanza. Memoria constante respecto al feed.
+    """
+    input_file = INPUT_NDJSON if INPUT_NDJSON.exists() else INPUT_FILE
+    writer = SnapshotWriter()
+
+    def enriched():
+        for raw in iter_records(input_file):
+            prop = enrich_property(raw)
+            writer.append(bootstrap_record(prop))
+            yield prop
+
+    count = write_ndjson(OUTPUT_NDJSON, enriched())
+    print(f"✅ Enriched generado: {OUTPUT_NDJSON} ({count} propiedades)")
+
+    snapshot = writer.close()
+    print(f"✅ Snapshot generado: {snapshot}")
+
+
+def main(incremental: bool = False):
     with open(INPUT_FILE, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    enriched = [enrich_property(p) for p in data]
+    delta = None
+    # el snapshot vigente sirve de base para el delta si está al día
+    # con el enriquecido anterior
+    patchable = incremental and OUTPUT_FILE.exists() and snapshot_is_fresh()
+    if incremental:
+        state = load_json(STATE_FILE, {})
+        previous = {p.get("id"): p for p in load_json(OUTPUT_FILE, [])}
+        enriched, hashes, delta = enrich_incremental(data, state, previous)
+        print(
+            f"🔁 Incremental: +{len(delta['added'])} ~{len(delta['updated'])} "
+            f"-{len(delta['removed'])}"
+        )
+    else:
+        enriched = [enrich_property(p) for p in data]
+        hashes = {p.get("id"): content_hash(p) for p in data}
+
+    base_signature = data_signature()
 
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(enriched, f, ensure_ascii=False, indent=2)
+        # incremental: compacto (se reescribe en cada corrida)
+        json.dump(enriched, f, ensure_ascii=False, indent=None if incremental else 2)
+
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(hashes, f)
 
     print(f"✅ Enriched generado: {OUTPUT_FILE} ({len(enriched)} propiedades)")
 
+    # Snapshot binario para arranque rápido del backend. Incremental: se
+    # aplica el delta (sólo sus filas se normalizan / codifican / tokenizan)
+    snapshot = None
+    if patchable:
+        try:
+            snapshot = apply_snapshot_delta(
+                bootstrap_records(delta["added"] + delta["updated"]), delta["removed"]
+            )
+            print(f"✅ Snapshot actualizado con el delta: {snapshot}")
+        except (ValueError, OSError) as e:
+            print(f"⚠️ snapshot no parchable, se regenera: {e!r}")
+    if snapshot is None:
+        snapshot = write_snapshot(bootstrap_records(enriched))
+        print(f"✅ Snapshot generado: {snapshot}")
+
+    # Delta para que el backend lo aplique sin recarga completa:
+    # sólo vale sobre la versión de archivos que había antes de esta corrida
+    if delta is not None:
+        delta["base_signature"] = base_signature
+        delta["signature"] = data_signature()
+        with open(DELTA_FILE, "w", encoding="utf-8") as f:
+            json.dump(delta, f, ensure_ascii=False)
+        print(f"✅ Delta generado: {DELTA_FILE}")
+
 
 if __name__ == "__main__":
-    main()
+    if "--stream" in sys.argv:
+        if "--incremental" in sys.argv:
+            print("Uso: --stream y --incremental no se combinan")
+            sys.exit(1)
+        main_stream()
+    else:
+        main(incremental="--incremental" in sys.argv)
@@ -0,0 +1,122 @@
+"""
+Ingesta multi-fuente: corre cada adaptador de scripts/sources.json en su
+propio proceso (lectura + enrich_property), junta las fuentes, agrupa
+las publicaciones duplicadas entre corredores (backend/dedup.py) y
+escribe el enriquecido, el snapshot y (con --incremental) el delta
+en los mismos archivos que enrich_nexxos.py, así el backend no cambia.
+
+Uso:
+    python scripts/ingest.py [--incremental] [--workers N]
+
+Si una fuente falla se usa su última salida (data/enriched/sources/),
+si existe: un corredor caído no borra sus propiedades del sitio.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+from backend.data_bootstrap import bootstrap_records  # noqa: E402
+from backend.data_loader import data_signature  # noqa: E402
+from backend.dedup import collapse, find_duplicates  # noqa: E402
+from backend.ndjson import iter_records  # noqa: E402
+from backend.snapshot import write_snapshot  # noqa: E402
+from enrich_nexxos import DELTA_FILE, OUTPUT_FILE, content_hash, load_json  # noqa: E402
+from sources import load_sources, run_source, source_output  # noqa: E402
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+
+
+def run_sources(specs: list, workers: int = INGEST_WORKERS) -> dict:
+    """
+    Corre las fuentes en paralelo; {nombre: resumen o error}.
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(specs)))) as pool:
+        futures = {pool.submit(run_source, spec): spec["name"] for spec in specs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+                print(f"✅ {name}: {results[name]['count']} propiedades ({results[name]['seconds']}s)")
+            except Exception as exc:
+                results[name] = {"name": name, "error": repr(exc)}
+                print(f"⚠️  {name}: {exc!r} (se usa su última salida, si existe)")
+    return results
+
+
+def diff_enriched(previous: dict, enriched: list) -> dict:
+    """
+    Delta entre el enriquecido anterior y el nuevo (por contenido).
+    """
+    delta = {"added": [], "updated": [], "removed": []}
+    ids = set()
+    for prop in enriched:
+        pid = prop.get("id")
+        ids.add(pid)
+        old = previous.get(pid)
+        if old is None:
+            delta["added"].append(prop)
+        elif content_hash(old) != content_hash(prop):
+            delta["updated"].append(prop)
+    delta["removed"] = [pid for pid in previous if pid not in ids]
+    return delta
+
+
+def main(incremental: bool = False, workers: int = INGEST_WORKERS):
+    specs = load_sources()
+    run_sources(specs, workers)
+
+    enriched = []
+    for spec in specs:
+        path = source_output(spec["name"])
+        if path.exists():
+            enriched.extend(iter_records(path))
+
+    started = time.perf_counter()
+    normalized = bootstrap_records(enriched)
+    clusters = find_duplicates(normalized, priority=[spec["name"] for spec in specs])
+    canonical = collapse(enriched, clusters, summaries=normalized)
+    print(
+        f"🔗 Duplicados: {sum(len(c) - 1 for c in clusters)} publicaciones en {len(clusters)} entidades "
+        f"({time.perf_counter() - started:.2f}s)"
+    )
+
+    delta = None
+    if incremental:
+        previous = {p.get("id"): p for p in load_json(OUTPUT_FILE, [])}
+        delta = diff_enriched(previous, canonical)
+        print(
+            f"🔁 Incremental: +{len(delta['added'])} ~{len(delta['updated'])} "
+            f"-{len(delta['removed'])}"
+        )
+
+    base_signature = data_signature()
+
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(canonical, f, ensure_ascii=False, indent=2)
+    print(f"✅ Enriched generado: {OUTPUT_FILE} ({len(canonical)} propiedades)")
+
+    snapshot = write_snapshot(collapse(normalized, clusters))
+    print(f"✅ Snapshot generado: {snapshot}")
+
+    if delta is not None:
+        delta["base_signature"] = base_signature
+        delta["signature"] = data_signature()
+        with open(DELTA_FILE, "w", encoding="utf-8") as f:
+            json.dump(delta, f, ensure_ascii=False)
+        print(f"✅ Delta generado: {DELTA_FILE}")
+
+
+if __name__ == "__main__":
+    workers = INGEST_WORKERS
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+    main(incremental="--incremental" in sys.argv, workers=workers)
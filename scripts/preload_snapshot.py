@@ -0,0 +1,35 @@
+"""
+Prepara el snapshot binario antes de levantar varios workers.
+
+Uso:
+    python scripts/preload_snapshot.py
+    uvicorn backend.app:app --workers 4
+
+Cada worker mapea el snapshot (columnas, índice, JSON pre-codificado)
+en modo lectura: las páginas las comparte el sistema operativo y no se
+parsea el JSON enriquecido en cada proceso.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.data_loader import preload_snapshot  # noqa: E402
+from backend.snapshot import SNAPSHOT_DIR  # noqa: E402
+
+
+def main():
+    started = time.perf_counter()
+    rebuilt = preload_snapshot()
+    elapsed = time.perf_counter() - started
+    if rebuilt:
+        print(f"✅ Snapshot reconstruido: {SNAPSHOT_DIR} ({elapsed:.2f}s)")
+    else:
+        print(f"✅ Snapshot al día: {SNAPSHOT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
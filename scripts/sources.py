@@ -0,0 +1,136 @@
+"""
+Adaptadores de fuentes (un corredor = una fuente).
+
+Cada fuente se declara en scripts/sources.json:
+
+    [
+      {"name": "nexxos", "kind": "json", "path": "data/sources/nexxos.json"},
+      {"name": "otro", "kind": "xls", "path": "data/sources/otro.xlsx",
+       "base_url": "https://otro.cl/ficha?id="},
+      {"name": "api", "kind": "mi_paquete.fuentes:ApiSource", "token": "..."}
+    ]
+
+- kind "json": registros crudos ya exportados (.json o .ndjson; si
+  existe el .ndjson hermano se prefiere, como enrich_nexxos --stream)
+- kind "xls": planilla con el formato de exportación de Nexxos
+  (xls_to_json.excel_records) con el link de ese corredor
+- cualquier otro kind "modulo:Clase": una subclase de SourceAdapter
+
+Un adaptador sólo entrega registros crudos con el esquema de
+xls_to_json; normalize() completa id / source / source_id y
+enrich_property hace el resto, igual para todas las fuentes.
+"""
+
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+from backend.ndjson import iter_records, write_ndjson  # noqa: E402
+from enrich_nexxos import OUTPUT_DIR, enrich_property  # noqa: E402
+
+SOURCES_FILE = BASE_DIR / "scripts" / "sources.json"
+SOURCES_OUTPUT_DIR = OUTPUT_DIR / "sources"
+
+ADAPTERS: Dict[str, type] = {}
+
+
+def adapter(kind: str):
+    """
+    Registra una clase de adaptador bajo `kind`.
+    """
+    def register(cls):
+        cls.kind = kind
+        ADAPTERS[kind] = cls
+        return cls
+    return register
+
+
+class SourceAdapter:
+    kind = None
+
+    def __init__(self, name: str, **options):
+        self.name = name
+        self.options = options
+
+    def path(self, key: str = "path") -> Path:
+        path = Path(self.options[key])
+        return path if path.is_absolute() else BASE_DIR / path
+
+    def records(self) -> Iterator[dict]:
+        raise NotImplementedError
+
+    def normalize(self, raw: dict) -> dict:
+        raw["source"] = self.name
+        source_id = raw.get("source_id") or raw.get("codigo")
+        raw["source_id"] = source_id
+        if not raw.get("id"):
+            raw["id"] = f"{self.name}-{source_id}"
+        return raw
+
+
+@adapter("json")
+class JsonSource(SourceAdapter):
+    def records(self) -> Iterator[dict]:
+        path = self.path()
+        ndjson = path.with_suffix(".ndjson")
+        return iter_records(ndjson if ndjson.exists() else path)
+
+
+@adapter("xls")
+class ExcelSource(SourceAdapter):
+    def records(self) -> Iterator[dict]:
+        from xls_to_json import BASE_URL, excel_records
+
+        return excel_records(str(self.path()), source=self.name,
+                             base_url=self.options.get("base_url", BASE_URL))
+
+
+def load_adapter(spec: dict) -> SourceAdapter:
+    options = dict(spec)
+    name = options.pop("name")
+    kind = options.pop("kind", "json")
+    cls = ADAPTERS.get(kind)
+    if cls is None:
+        if ":" not in kind:
+            raise ValueError(f"Fuente {name}: tipo desconocido {kind!r}")
+        module, attr = kind.split(":", 1)
+        cls = getattr(importlib.import_module(module), attr)
+    return cls(name, **options)
+
+
+def load_sources(path: Path = SOURCES_FILE) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        specs = json.load(f)
+    names = [spec["name"] for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("Nombres de fuente repetidos en sources.json")
+    return specs
+
+
+def source_output(name: str) -> Path:
+    return SOURCES_OUTPUT_DIR / f"{name}.ndjson"
+
+
+def run_source(spec: dict) -> dict:
+    """
+    Lee y enriquece UNA fuente (corre en un proceso aparte). Escribe a
+    disco en vez de devolver los registros: así no viajan serializados
+    entre procesos.
+    """
+    started = time.perf_counter()
+    source = load_adapter(spec)
+    output = source_output(source.name)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    count = write_ndjson(output, (enrich_property(source.normalize(raw)) for raw in source.records()))
+    return {
+        "name": source.name,
+        "count": count,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -1,24 +1,15 @@
 import pandas as pd
 import json
 import sys
-import re
 from pathlib import Path
 
-BASE_URL = "https://nexxospropiedades.cl/fichaPropiedad.aspx?i="
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Detector compartido con el backend (una sola regex compilada)
+from backend.amenities import AMENITIES_KEYWORDS, extract_amenities  # noqa: E402,F401
+from backend.ndjson import write_ndjson  # noqa: E402
 
-AMENITIES_KEYWORDS = {
-    "piscina": ["piscina", "pileta"],
-    "gimnasio": ["gimnasio", "gym"],
-    "quincho": ["quincho", "parrilla", "asadera"],
-    "terraza": ["terraza"],
-    "patio": ["patio"],
-    "bodega": ["bodega"],
-    "loggia": ["loggia", "lavandería"],
-    "amoblado": ["amoblado", "equipado"],
-    "areas_verdes": ["áreas verdes", "jardín", "parque"],
-    "ascensor": ["ascensor", "elevador"],
-    "conserjeria": ["conserjería", "conserje", "portero"],
-}
+BASE_URL = "https://nexxospropiedades.cl/fichaPropiedad.aspx?i="
 
 def clean_codigo(value):
     if pd.isna(value):
@@ -30,19 +21,6 @@ def to_bool(value):
         return False
     return str(value).strip().lower() in ["si", "sí", "x", "true", "1"]
 
-def extract_amenities(text):
-    if text is None or (isinstance(text, float) and pd.isna(text)):
-        return {}
-    text = str(text).lower().strip()
-    if not text:
-        return {}
-    amenities = {}
-    for amenity, keywords in AMENITIES_KEYWORDS.items():
-        amenities[amenity] = any(
-            re.search(rf"\b{re.escape(k)}\b", text) for k in keywords
-        )
-    return amenities
-
 def load_column_map():
     with open("scripts/column_map.json", "r", encoding="utf-8") as f:
         return json.load(f)
@@ -53,102 +31,185 @@ def find_column(df_columns, possible_names):
             return col
     return None
 
-def main(excel_path: str):
+def resolve_columns(df_columns, column_map):
+    """
+    Resuelve UNA vez qué columna del Excel corresponde a cada campo.
+    """
+    resolved = {}
+    for field, possible_cols in column_map.items():
+        col = find_column(df_columns, possible_cols)
+        if col:
+            resolved[field] = col
+    return resolved
+
+# =========================
+# OPERACIONES POR COLUMNA
+# =========================
+
+TRUE_VALUES = ["si", "sí", "x", "true", "1"]
+
+def text_column(series):
+    # str(valor).strip().lower() de cada celda (NaN → "nan"), como to_bool
+    return series.map(str).str.strip().str.lower()
+
+def bool_column(df, col):
+    """
+    to_bool vectorizado; columna inexistente → todo False.
+    """
+    if col is None or col not in df.columns:
+        return pd.Series(False, index=df.index)
+    series = df[col]
+    return series.notna() & text_column(series).isin(TRUE_VALUES)
+
+def codigo_column(series):
+    """
+    clean_codigo vectorizado (las celdas vacías se filtran aparte).
+    """
+    return (
+        series.map(str)
+        .str.replace(".", "", regex=False)
+        .str.replace("-", "", regex=False)
+        .str.replace(" ", "", regex=False)
+        .str.strip()
+    )
+
+def values_or_none(df, col):
+    # valores nativos de Python (tolist); columna inexistente → None
+    if col not in df.columns:
+        return [None] * len(df)
+    return df[col].tolist()
+
+def divisa_values(df, col):
+    # str(valor).strip(); columna inexistente → "None" (como str(row.get(col)))
+    if col not in df.columns:
+        return ["None"] * len(df)
+    return df[col].map(str).str.strip().tolist()
+
+def price_blocks(df, flag_col):
+    """
+    Bloque de precio (venta o arriendo) por fila, o None si la fila no
+    tiene ese flag activo.
+    """
+    activo = bool_column(df, flag_col).tolist()
+    divisa = divisa_values(df, "Divisa ppal.")
+    principal = values_or_none(df, "Precio ppal.")
+    uf = values_or_none(df, "Precio UF")
+    pesos = values_or_none(df, "Precio Pesos")
+
+    return [
+        {
+            "activo": a,
+            "divisa": d if a else None,
+            "principal": p if a else None,
+            "uf": u if a else None,
+            "pesos": c if a else None,
+        }
+        for a, d, p, u, c in zip(activo, divisa, principal, uf, pesos)
+    ]
+
+def excel_records(excel_path: str, source: str = "nexxos", base_url: str = BASE_URL):
+    """
+    Registros crudos de un Excel con el formato de exportación de Nexxos.
+    `source` y `base_url` permiten leer la misma planilla de otro corredor.
+    """
     # Encabezados están en la fila 7 -> header=6 (0-index)
     df = pd.read_excel(excel_path, header=6)
 
     # Elimina columnas "Unnamed"
     df = df.loc[:, ~df.columns.astype(str).str.contains(r"^Unnamed")]
 
-    column_map = load_column_map()
-    results = []
-
-    for _, row in df.iterrows():
-        item = {}
-
-        # -----------------------
-        # Copia campos mapeados (NO precios)
-        # -----------------------
-        for field, possible_cols in column_map.items():
-            col = find_column(df.columns, possible_cols)
-            if col:
-                item[field] = row[col]
-
-        # -----------------------
-        # Código (obligatorio)
-        # -----------------------
-        codigo = clean_codigo(item.get("codigo"))
-        if not codigo:
-            continue
-
-        # -----------------------
-        # Filtros mínimos de calidad
-        # -----------------------
-        if str(item.get("estado", "")).strip().lower() != "activa":
-            continue
-        if not to_bool(item.get("publicada_web")):
-            continue
-
-        # -----------------------
-        # Normalizaciones base
-        # -----------------------
-        item["codigo"] = codigo
-        item["id"] = f"nexxos-{codigo}"
-        item["source"] = "nexxos"
-        item["source_id"] = codigo
-        item["link"] = f"{BASE_URL}{codigo}"
-
-        # Operación (flag Excel)
-        item["operacion"] = "venta" if to_bool(item.get("operacion")) else "arriendo"
-
-        # Flags
-        item["exclusiva"] = to_bool(item.get("exclusiva"))
-        item["destacada"] = to_bool(item.get("destacada"))
-
-        # Amenities desde texto libre
-        descripcion = item.get("descripcion", "")
-        item["amenities"] = extract_amenities(descripcion)
-
-        # =========================
-        # PRECIOS (VENTA / ARRIENDO)
-        # =========================
-
-        # --- VENTA ---
-        en_venta = to_bool(row.get("En Venta"))
-        venta_divisa = str(row.get("Divisa ppal.")).strip() if en_venta else None
-        venta_precio_ppal = row.get("Precio ppal.") if en_venta else None
-        venta_precio_uf = row.get("Precio UF") if en_venta else None
-        venta_precio_pesos = row.get("Precio Pesos") if en_venta else None
-
-        # --- ARRIENDO ---
-        en_arriendo = to_bool(row.get("En Arriendo"))
-        arr_divisa = str(row.get("Divisa ppal.")).strip() if en_arriendo else None
-        arr_precio_ppal = row.get("Precio ppal.") if en_arriendo else None
-        arr_precio_uf = row.get("Precio UF") if en_arriendo else None
-        arr_precio_pesos = row.get("Precio Pesos") if en_arriendo else None
-
-        item["precio"] = {
-            "venta": {
-                "activo": en_venta,
-                "divisa": venta_divisa,
-                "principal": venta_precio_ppal,
-                "uf": venta_precio_uf,
-                "pesos": venta_precio_pesos,
-            },
-            "arriendo": {
-                "activo": en_arriendo,
-                "divisa": arr_divisa,
-                "principal": arr_precio_ppal,
-                "uf": arr_precio_uf,
-                "pesos": arr_precio_pesos,
-            },
-        }
+    columns = resolve_columns(df.columns, load_column_map())
+
+    # -----------------------
+    # Código (obligatorio) + filtros mínimos de calidad
+    # -----------------------
+    codigo_col = columns.get("codigo")
+    if codigo_col is None:
+        df = df.iloc[0:0]
+        codigos = pd.Series([], dtype=object)
+    else:
+        codigos = codigo_column(df[codigo_col])
+        keep = df[codigo_col].notna() & (codigos != "")
+
+        estado_col = columns.get("estado")
+        if estado_col is None:
+            keep &= False
+        else:
+            keep &= text_column(df[estado_col]) == "activa"
+
+        keep &= bool_column(df, columns.get("publicada_web"))
+
+        df = df[keep]
+        codigos = codigos[keep]
+
+    # -----------------------
+    # Columnas derivadas (una pasada por columna)
+    # -----------------------
+    mapped = {field: df[col].tolist() for field, col in columns.items()}
+    codigos = codigos.tolist()
+    operaciones = bool_column(df, columns.get("operacion")).tolist()
+    exclusivas = bool_column(df, columns.get("exclusiva")).tolist()
+    destacadas = bool_column(df, columns.get("destacada")).tolist()
+
+    descripcion_col = columns.get("descripcion")
+    if descripcion_col is None:
+        amenities = [{} for _ in range(len(df))]
+    else:
+        amenities = df[descripcion_col].map(extract_amenities).tolist()
+
+    ventas = price_blocks(df, "En Venta")
+    arriendos = price_blocks(df, "En Arriendo")
+
+    # -----------------------
+    # Emisión de registros
+    # -----------------------
+    def records():
+        for i, codigo in enumerate(codigos):
+            # Copia campos mapeados (NO precios)
+            item = {field: values[i] for field, values in mapped.items()}
+
+            # Normalizaciones base
+            item["codigo"] = codigo
+            item["id"] = f"{source}-{codigo}"
+            item["source"] = source
+            item["source_id"] = codigo
+            item["link"] = f"{base_url}{codigo}"
+
+            # Operación (flag Excel)
+            item["operacion"] = "venta" if operaciones[i] else "arriendo"
+
+            # Flags
+            item["exclusiva"] = exclusivas[i]
+            item["destacada"] = destacadas[i]
+
+            # Amenities desde texto libre
+            item["amenities"] = amenities[i]
+
+            # Precios (venta / arriendo)
+            item["precio"] = {
+                "venta": ventas[i],
+                "arriendo": arriendos[i],
+            }
+
+            yield item
+
+    return records()
 
-        results.append(item)
+def main(excel_path: str, ndjson: bool = False):
+    records = excel_records(excel_path)
 
     # -----------------------
     # Output
     # -----------------------
+    if ndjson:
+        # un registro por línea, escrito a medida que se genera
+        output_path = Path("data/nexxos/properties.ndjson")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        count = write_ndjson(output_path, records)
+        print(f"✅ Exportadas {count} propiedades a {output_path}")
+        return
+
+    results = list(records)
     output_path = Path("data/nexxos/properties.json")
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -159,6 +220,6 @@ def main(excel_path: str):
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Uso: python scripts/xls_to_json.py archivo.xlsx")
+        print("Uso: python scripts/xls_to_json.py archivo.xlsx [--ndjson]")
         sys.exit(1)
-    main(sys.argv[1])
+    main(sys.argv[1], ndjson="--ndjson" in sys.argv[2:])
@@ -0,0 +1,60 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# los módulos se importan como backend.* desde la raíz del repo; el
+# generador sintético y enrich_property viven en benchmarks/ y scripts/
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+from backend.data_bootstrap import bootstrap_records  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def sample_records():
+    """
+    La data de ejemplo del repo (data/sources/nexxos.json), enriquecida
+    y normalizada como en producción.
+    """
+    from enrich_nexxos import enrich_property
+
+    with open(BASE_DIR / "data" / "sources" / "nexxos.json", "r", encoding="utf-8") as f:
+        return bootstrap_records([enrich_property(raw) for raw in json.load(f)])
+
+
+@pytest.fixture(scope="session")
+def synthetic_records():
+    """
+    Registros sintéticos con descripción y superficie (la data de
+    ejemplo no las trae).
+    """
+    from synthetic import generate_enriched
+
+    return bootstrap_records(list(generate_enriched(3000, seed=0)))
+
+
+@pytest.fixture
+def synthetic_snapshot(synthetic_records):
+    """
+    Los registros sintéticos publicados como versión vigente.
+    """
+    from backend.data_loader import publish_store
+    from backend.property_store import PropertyStore
+
+    return publish_store(PropertyStore.from_properties(synthetic_records))
+
+
+@pytest.fixture
+def sample_snapshot(sample_records):
+    """
+    La data de ejemplo publicada como versión vigente.
+    """
+    from backend.data_loader import publish_store
+    from backend.property_store import PropertyStore
+
+    return publish_store(PropertyStore.from_properties(sample_records))
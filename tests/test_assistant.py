@@ -0,0 +1,61 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.assistant_router import check_cursor, decode_cursor, encode_cursor
+from backend.data_loader import publish_store
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_roundtrip():
+    cursor = decode_cursor(encode_cursor(40, "precio_asc", 3, {"comuna": "nunoa"}))
+    assert (cursor["offset"], cursor["sort"], cursor["v"]) == (40, "precio_asc", 3)
+    check_cursor(cursor, {"comuna": "nunoa", "texto": None}, 3)
+
+
+@pytest.mark.parametrize("filters, version", [
+    ({"comuna": "providencia"}, 3),
+    ({"comuna": "nunoa"}, 4),
+])
+def test_stale_cursor(filters, version):
+    cursor = decode_cursor(encode_cursor(40, None, 3, {"comuna": "nunoa"}))
+    with pytest.raises(ValueError):
+        check_cursor(cursor, filters, version)
+
+
+def test_cursor_pages_through_and_rejects_other_search(synthetic_snapshot):
+    client = TestClient(app)
+    first = client.post("/assistant", json={"message": "arriendo", "limit": 5}).json()
+    cursor = first["meta"]["next_cursor"]
+
+    second = client.post("/assistant", json={"message": "arriendo", "limit": 5, "cursor": cursor})
+    assert second.status_code == 200
+    assert second.json()["meta"]["offset"] == 5
+
+    other = client.post("/assistant", json={"message": "venta", "limit": 5, "cursor": cursor})
+    assert other.status_code == 400
+
+    publish_store(synthetic_snapshot.store)  # recarga en segundo plano → versión nueva
+    stale = client.post("/assistant", json={"message": "arriendo", "limit": 5, "cursor": cursor})
+    assert stale.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [
+    "no-es-base64!",
+    raw_cursor([1, 2]),
+    raw_cursor({"offset": 20, "sort": "precio; drop"}),
+    raw_cursor({"offset": -5, "sort": None}),
+    raw_cursor({"offset": "20", "sort": None}),
+    raw_cursor({"offset": 20, "sort": None}),
+])
+def test_invalid_cursor_is_a_client_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    response = TestClient(app).post("/assistant", json={"message": "arriendo", "cursor": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,103 @@
+import copy
+
+import numpy as np
+import pytest
+
+from backend.data_loader import apply_delta, publish_store
+from backend.property_store import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, PropertyStore
+from backend.search_engine import search_scored
+
+QUERIES = [
+    {},
+    {"operacion": "venta", "precio_max_uf": 6000},
+    {"operacion": "arriendo", "comuna": "providencia"},
+    {"comuna": "vina del mar", "dormitorios_min": 2},
+    {"amenities": ["piscina"], "banos_min": 2},
+    {"texto": "quincho metro"},
+    {"operacion": "venta", "texto": "vista mar terraza"},
+    {"texto": "palabraunica"},
+]
+
+
+def labels(column):
+    return [column.labels[c] if c >= 0 else None for c in column.codes.tolist()]
+
+
+@pytest.fixture
+def delta_case(synthetic_records):
+    """
+    (base, delta, registros esperados tras aplicarlo).
+    """
+    base, added = synthetic_records[:2800], synthetic_records[2800:2900]
+
+    updated = []
+    for i, record in enumerate(base[10:400:13]):
+        record = copy.deepcopy(record)
+        record["ubicacion"]["comuna"] = "Viña del Mar" if i % 2 else record["ubicacion"]["comuna"]
+        record["raw"]["descripcion"] = f"Palabraunica con quincho, vista al mar {i}"
+        record["caracteristicas"]["dormitorios"] = (record["caracteristicas"].get("dormitorios") or 0) + 1
+        record["amenities"]["piscina"] = not record["amenities"].get("piscina")
+        updated.append(record)
+    removed = [record["id"] for record in base[5:2800:97]]
+
+    replaced = {record["id"]: record for record in updated}
+    dropped = set(removed)
+    expected = [replaced.get(r["id"], r) for r in base if r["id"] not in dropped] + added
+    return base, {"added": added, "updated": updated, "removed": removed}, expected
+
+
+def test_apply_delta_matches_full_rebuild(delta_case):
+    base, delta, expected = delta_case
+    publish_store(PropertyStore.from_properties(base))
+    patched = apply_delta(delta)
+    rebuilt = publish_store(PropertyStore.from_properties(expected))
+
+    a, b = patched.store, rebuilt.store
+    assert a.ids.tolist() == b.ids.tolist()
+    for name in NUMERIC_COLUMNS:
+        np.testing.assert_array_equal(a.column(name), b.column(name), err_msg=name)
+    for name in CATEGORICAL_COLUMNS:
+        assert labels(a.column(name)) == labels(b.column(name)), name
+    assert a.amenities.keys() == b.amenities.keys()
+    for name in a.amenities:
+        np.testing.assert_array_equal(a.amenities[name], b.amenities[name], err_msg=name)
+    assert [a.encoded[i] for i in range(a.size)] == [b.encoded[i] for i in range(b.size)]
+
+    for query in QUERIES:
+        rows, scores = search_scored(snapshot=patched, verify=True, **query)
+        expected_rows, expected_scores = search_scored(snapshot=rebuilt, verify=True, **query)
+        np.testing.assert_array_equal(rows, expected_rows)
+        if expected_scores is None:
+            assert scores is None
+        else:
+            np.testing.assert_allclose(scores, expected_scores)
+
+
+def test_chained_deltas_stay_flat(synthetic_records):
+    from backend.property_store import PatchedSequence
+
+    records = synthetic_records[:2000]
+    publish_store(PropertyStore.from_properties(records))
+    current = {r["id"]: r for r in records}
+    for step in range(5):
+        updated = [copy.deepcopy(r) for r in list(current.values())[step * 7:step * 7 + 40:3]]
+        for record in updated:
+            record["raw"]["descripcion"] = f"Palabraunica paso {step}"
+        added = synthetic_records[2000 + step * 50:2050 + step * 50]
+        removed = [r["id"] for r in list(current.values())[100 + step::211]]
+        snapshot = apply_delta({"added": added, "updated": updated, "removed": removed})
+        current.update((r["id"], r) for r in updated + added)
+        for rid in removed:
+            current.pop(rid)
+
+    store = snapshot.store
+    for sequence in (store.rows, store.encoded):
+        assert isinstance(sequence, PatchedSequence)
+        assert not isinstance(sequence._base, PatchedSequence)
+    assert [p["id"] for p in store.rows] == list(current)
+
+    rebuilt = publish_store(PropertyStore.from_properties(list(current.values())))
+    assert [store.encoded[i] for i in range(store.size)] == [rebuilt.store.encoded[i] for i in range(store.size)]
+    for query in QUERIES:
+        rows, _ = search_scored(snapshot=snapshot, verify=True, **query)
+        np.testing.assert_array_equal(rows, search_scored(snapshot=rebuilt, **query)[0])
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.facets import compute_facets
+from backend.search_engine import search_page
+
+
+def test_only_computes_requested_facets(synthetic_snapshot):
+    store = synthetic_snapshot.store
+    rows = synthetic_snapshot.index.query(operacion="venta")
+    full = compute_facets(store, rows)
+    partial = compute_facets(store, rows, only=["comuna", "precio_uf"])
+    assert partial == {name: full[name] for name in ("total", "comuna", "precio_uf")}
+
+
+def test_search_page_subset_of_dataset_facets(synthetic_snapshot):
+    page = search_page(snapshot=synthetic_snapshot, facets=["comuna"])
+    assert page["facets"] == {name: synthetic_snapshot.facets[name] for name in ("total", "comuna")}
+
+
+def test_assistant_facets_are_opt_in(synthetic_snapshot):
+    client = TestClient(app)
+    plain = client.post("/assistant", json={"message": "arriendo"}).json()
+    assert "facets" not in plain
+    # las sugerencias siguen usando conteos reales
+    assert any("más resultados en" in s for s in plain["meta"]["suggestions"])
+
+    with_facets = client.post("/assistant", json={"message": "arriendo", "facets": True}).json()
+    assert with_facets["facets"]["amenities"]
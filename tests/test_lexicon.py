@@ -0,0 +1,41 @@
+import pytest
+
+from backend.lexicon import find_comuna, free_text, parse_price, parse_rooms
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("hasta 3.500 UF", {"precio_max_uf": 3500}),
+    ("5 mil uf", {"precio_max_uf": 5000}),
+    ("venta 4,5 mil UF en providencia", {"precio_max_uf": 4500}),
+    ("2 MM", {"precio_max_clp": 2_000_000}),
+    ("2,5 millones", {"precio_max_clp": 2_500_000}),
+    ("800 mil", {"precio_max_clp": 800_000}),
+    ("$800.000", {"precio_max_clp": 800_000}),
+    ("casa con piscina", {}),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("casa en cochamo", "Cochamó"),
+    ("venta los angeles", "Los Ángeles"),
+    ("arriendo en ÑUÑOA", "Ñuñoa"),
+])
+def test_find_comuna_ignores_accents(text, expected):
+    assert find_comuna(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("casa 3 dormitorios", {"dormitorios_min": 3}),
+    ("depto 2 baños en ñuñoa", {"banos_min": 2}),
+    ("dos dormitorios y 2 o más baños", {"dormitorios_min": 2, "banos_min": 2}),
+    ("3 dorm hasta 5000 uf", {"dormitorios_min": 3}),
+    ("dormitorios amplios", {}),
+])
+def test_parse_rooms(text, expected):
+    assert parse_rooms(text) == expected
+
+
+def test_rooms_are_not_free_text():
+    assert free_text("arriendo providencia 3 dormitorios") == ""
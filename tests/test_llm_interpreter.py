@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from backend.assistant_router import extract_filters_from_text
+from backend.lexicon import unrecognized_terms
+from backend.llm_interpreter import LLMClient, TieredInterpreter
+
+
+class FakeClient(LLMClient):
+
+    def __init__(self):
+        self.messages = []
+
+    async def complete(self, system: str, message: str) -> str:
+        self.messages.append(message)
+        return '{"comuna": "vina del mar"}'
+
+
+def escalates(interpreter, message):
+    filters = extract_filters_from_text(message)
+    return interpreter.needs_llm(filters, unrecognized_terms(filters.get("texto")))
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("arriendo", False),
+    ("casa 3 dormitorios", False),
+    ("depto 2 baños en ñuñoa", False),
+    ("hola", True),
+    ("algo bonito para mi familia", True),
+])
+def test_needs_llm(message, expected):
+    assert escalates(TieredInterpreter(FakeClient()), message) is expected
+
+
+def test_rooms_become_filters():
+    filters = extract_filters_from_text("arriendo providencia 3 dormitorios")
+    assert filters == {"operacion": "arriendo", "comuna": "providencia", "dormitorios_min": 3}
+
+
+def test_needs_llm_without_client():
+    assert escalates(TieredInterpreter(None), "hola") is False
+
+
+def test_broad_query_skips_llm():
+    client = FakeClient()
+    interpreter = TieredInterpreter(client)
+    filters = asyncio.run(interpreter.complete_filters("arriendo", {"operacion": "arriendo"}))
+    assert filters == {"operacion": "arriendo"}
+    assert client.messages == []
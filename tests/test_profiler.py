@@ -0,0 +1,35 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend import profiler
+
+
+def busy_chunks():
+    for i in range(3):
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        yield f'{{"chunk": {i}}}\n'.encode()
+
+
+def test_profile_covers_streamed_body(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "ADMIN_TOKEN", "secreto")
+    monkeypatch.setattr(profiler, "PROFILE_DIR", tmp_path)
+
+    app = FastAPI()
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(busy_chunks(), media_type="application/x-ndjson")
+
+    client = TestClient(profiler.ProfileMiddleware(app))
+    response = client.get("/stream", headers={"X-Profile": "secreto"})
+    assert response.status_code == 200
+    assert response.text.count("chunk") == 3
+
+    folded = (tmp_path / response.headers["x-profile-file"]).read_text()
+    assert "busy_chunks" in folded
+    assert not profiler._PROFILE_LOCK.locked()
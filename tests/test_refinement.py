@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from backend.search_engine import is_narrowing, search_scored
+from backend.search_index import ResultHandle
+
+
+@pytest.mark.parametrize("previous, current, expected", [
+    ({"comuna": "nunoa"}, {"comuna": "nunoa", "dormitorios_min": 2}, True),
+    ({"precio_max_uf": 5000}, {"precio_max_uf": 6000}, False),
+    ({"amenities": ["piscina"]}, {"amenities": []}, False),
+    # texto: una fila calza con ALGÚN término
+    ({"texto": []}, {"texto": ["quinch"]}, False),
+    ({"texto": ["quinch", "metr"]}, {"texto": ["quinch"]}, True),
+    ({"texto": ["quinch"]}, {"texto": ["quinch", "metr"]}, False),
+    ({"texto": ["quinch"]}, {"texto": []}, False),
+    ({"texto": ["quinch"]}, {"texto": ["quinch"], "dormitorios_min": 3}, True),
+])
+def test_is_narrowing(previous, current, expected):
+    assert is_narrowing(previous, current) is expected
+
+
+@pytest.mark.parametrize("first, second", [
+    ({"operacion": "venta"}, {"operacion": "venta", "texto": "quincho"}),
+    ({"operacion": "venta", "texto": "quincho metro"}, {"operacion": "venta", "texto": "quincho"}),
+    ({"operacion": "venta", "texto": "quincho"}, {"operacion": "venta", "texto": "quincho metro"}),
+    ({"operacion": "arriendo", "texto": "piscina"}, {"operacion": "arriendo", "texto": "piscina", "dormitorios_min": 3}),
+    ({"operacion": "arriendo", "texto": "piscina"}, {"operacion": "arriendo"}),
+])
+def test_refinement_matches_fresh_search(synthetic_snapshot, first, second):
+    snapshot = synthetic_snapshot
+    rows, _ = search_scored(snapshot=snapshot, **first)
+    handle = ResultHandle.from_rows(snapshot.version, snapshot.store.size, rows)
+
+    refined_rows, refined_scores = search_scored(snapshot=snapshot, prior=handle, prior_filters=first, **second)
+    fresh_rows, fresh_scores = search_scored(snapshot=snapshot, **second)
+
+    np.testing.assert_array_equal(refined_rows, fresh_rows)
+    if fresh_scores is None:
+        assert refined_scores is None
+    else:
+        np.testing.assert_allclose(refined_scores, fresh_scores)
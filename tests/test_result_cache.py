@@ -0,0 +1,13 @@
+from backend.result_cache import canonical_key
+
+
+def test_filter_values_ignore_case_and_order():
+    a = canonical_key({"comuna": "Providencia ", "texto": "Cerca Metro", "dormitorios": None}, limit=10)
+    b = canonical_key({"texto": "cerca metro", "comuna": "providencia"}, limit=10)
+    assert a == b
+
+
+def test_fields_and_sort_are_case_sensitive():
+    base = {"operacion": "arriendo"}
+    assert canonical_key(base, fields=["Precio"]) != canonical_key(base, fields=["precio"])
+    assert canonical_key(base, sort="precio_asc") != canonical_key(base, sort="PRECIO_ASC")
@@ -0,0 +1,120 @@
+import json
+
+import numpy as np
+import pytest
+
+from backend.saved_searches import InvalidFilters, SavedSearchStore, normalize_filters
+from backend.session_store import MemorySessionBackend
+
+
+def test_normalize_filters_coerces_types():
+    filters = normalize_filters({
+        "dormitorios_min": "3", "precio_max_uf": 4500.0, "comuna": "Ñuñoa",
+        "operacion": "Venta", "amenities": ["piscina", "piscina"], "otro": 1,
+    })
+    assert filters == {
+        "dormitorios_min": 3, "precio_max_uf": 4500, "comuna": "nunoa",
+        "operacion": "venta", "amenities": ["piscina"],
+    }
+
+
+@pytest.mark.parametrize("filters", [
+    {"dormitorios_min": "tres"},
+    {"dormitorios_min": True},
+    {"precio_max_clp": -1},
+    {"banos_min": float("nan")},
+    {"operacion": "compra"},
+    {"comuna": 7},
+    {"amenities": "piscina"},
+])
+def test_normalize_filters_rejects_bad_values(filters):
+    with pytest.raises(InvalidFilters):
+        normalize_filters(filters)
+
+
+def test_invalid_log_entries_are_set_aside(tmp_path):
+    path = tmp_path / "saved.ndjson"
+    path.write_text(
+        json.dumps({"put": {"id": "mala", "filters": {"dormitorios_min": "tres"}}}) + "\n"
+        + json.dumps({"put": {"id": "buena", "filters": {"dormitorios_min": 2}}}) + "\n"
+    )
+    store = SavedSearchStore(path=str(path))
+    assert store.get("buena") is not None
+    assert store.get("mala") is None
+    # leer no reescribe el log compartido; compactar sí
+    assert "mala" in path.read_text()
+    assert store.compact() == 1
+    assert "mala" in (tmp_path / "saved.ndjson.rejected").read_text()
+    assert "mala" not in path.read_text()
+    assert store.get("buena") is not None
+
+
+def test_stores_share_log_and_inbox(tmp_path, synthetic_snapshot):
+    path, inbox = str(tmp_path / "saved.ndjson"), MemorySessionBackend()
+    a = SavedSearchStore(path=path, inbox=inbox)
+    b = SavedSearchStore(path=path, inbox=inbox)
+    assert b.stats()["searches"] == 0
+
+    search = a.add({"operacion": "venta"})
+    assert b.get(search.id) is not None
+
+    store = synthetic_snapshot.store
+    ids = store.ids[:50].tolist()
+    found = b.percolate(synthetic_snapshot, ids)
+    assert list(found[search.id])
+    a.percolate(synthetic_snapshot, ids)  # otro worker, mismo delta: sin duplicados
+    assert [m["id"] for m in a.matches(search.id)] == list(found[search.id])
+
+    b.matches(search.id, clear=True)
+    assert a.matches(search.id) == []
+
+    assert b.delete(search.id)
+    assert a.get(search.id) is None
+    assert not a.delete(search.id)
+
+
+def random_filters(rng, comunas):
+    filters = {}
+    if rng.random() < 0.6:
+        filters["comuna"] = comunas[rng.integers(len(comunas))]
+    if rng.random() < 0.7:
+        filters["operacion"] = ["venta", "arriendo"][rng.integers(2)]
+    if rng.random() < 0.5:
+        if filters.get("operacion") == "arriendo":
+            filters["precio_max_clp"] = int(rng.integers(200, 2000)) * 1000
+        else:
+            filters["precio_max_uf"] = int(rng.integers(1000, 20000))
+    if rng.random() < 0.4:
+        names = rng.choice(["piscina", "quincho", "gimnasio", "terraza"], rng.integers(1, 3), replace=False)
+        filters["amenities"] = names.tolist()
+    if rng.random() < 0.3:
+        filters["dormitorios_min"] = int(rng.integers(1, 5))
+    if rng.random() < 0.2:
+        filters["banos_min"] = int(rng.integers(1, 4))
+    if rng.random() < 0.2:
+        filters["gastos_comunes_max_clp"] = int(rng.integers(50, 300)) * 1000
+    if rng.random() < 0.25:
+        filters["texto"] = ["quincho", "vista al mar", "cerca del metro", "palabraunica", "jardin terraza"][rng.integers(5)]
+    return filters
+
+
+def test_percolate_matches_brute_force(synthetic_snapshot):
+    from backend.search_engine import search_scored
+
+    snapshot = synthetic_snapshot
+    store = snapshot.store
+    rng = np.random.default_rng(0)
+    saved = SavedSearchStore(path=None, inbox=MemorySessionBackend())
+    searches = saved.add_many(random_filters(rng, store.comuna.labels) for _ in range(400))
+
+    batch = [store.ids[row] for row in rng.choice(store.size, 600, replace=False).tolist()] + ["no-existe"]
+    found = saved.percolate(snapshot, batch)
+
+    matched = 0
+    for search in searches:
+        rows, _ = search_scored(snapshot=snapshot, verify=False, **search.filters)
+        accepted = set(store.ids[rows].tolist())
+        expected = [pid for pid in batch if pid in accepted]
+        assert list(found.get(search.id, [])) == expected, search.filters
+        matched += len(expected)
+    assert matched > 1000
@@ -0,0 +1,46 @@
+import pytest
+
+from backend.search_engine import scan_properties
+
+# combinaciones sobre la data de ejemplo (sin amenities) y la sintética
+FILTERS = [
+    {},
+    {"comuna": "las condes"},
+    {"comuna": "Ñuñoa"},
+    {"comuna": "comuna inexistente"},
+    {"operacion": "venta"},
+    {"operacion": "arriendo", "comuna": "santiago"},
+    {"operacion": "venta", "precio_max_uf": 4500},
+    {"operacion": "arriendo", "precio_max_clp": 170_000_000},
+    {"precio_max_uf": 3000},
+    {"dormitorios_min": 3},
+    {"banos_min": 2, "comuna": "colina"},
+    {"gastos_comunes_max_clp": 100_000},
+    {"comuna": "temuco", "operacion": "venta", "dormitorios_min": 2, "precio_max_uf": 9500},
+]
+
+AMENITY_FILTERS = [
+    {"amenities": ["piscina"]},
+    {"amenities": ["piscina", "quincho"], "operacion": "venta"},
+    {"amenities": ["gimnasio"], "comuna": "providencia", "banos_min": 2},
+    {"amenities": ["amoblado"], "operacion": "arriendo", "precio_max_clp": 600_000},
+]
+
+
+def ids(properties):
+    return [p.get("id") for p in properties]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_index_matches_scan_on_sample_data(sample_snapshot, filters):
+    snapshot = sample_snapshot
+    rows = snapshot.index.query(**filters)
+    assert ids(snapshot.store.materialize(rows)) == ids(scan_properties(snapshot.rows, **filters))
+
+
+@pytest.mark.parametrize("filters", FILTERS + AMENITY_FILTERS)
+def test_index_matches_scan_on_synthetic_data(synthetic_snapshot, filters):
+    snapshot = synthetic_snapshot
+    rows = snapshot.index.query(**filters)
+    expected = scan_properties(snapshot.rows, **filters)
+    assert ids(snapshot.store.materialize(rows)) == ids(expected)
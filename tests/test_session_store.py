@@ -0,0 +1,34 @@
+import base64
+
+import numpy as np
+import pytest
+
+from backend.search_index import ResultHandle
+from backend.serialization import dumps
+from backend.session_store import SessionState
+
+
+@pytest.mark.parametrize("rows, kind", [
+    ([], "d2"),
+    ([0, 5, 99_999], "d4"),
+    (list(range(10, 2000, 7)), "d2"),
+    (list(range(0, 100_000, 3)), "bits"),
+])
+def test_handle_roundtrip(rows, kind):
+    handle = ResultHandle.from_rows(3, 100_000, np.array(rows, dtype=np.int64))
+    assert handle.kind == kind
+    state = SessionState.from_bytes(SessionState({"comuna": "nunoa"}, handle).to_bytes())
+    np.testing.assert_array_equal(state.handle.rows(), rows)
+    assert state.handle.matches(3, 100_000)
+
+
+def test_small_result_does_not_scale_with_dataset():
+    handle = ResultHandle.from_rows(1, 100_000, np.arange(0, 500, 5))
+    assert len(SessionState({}, handle).to_bytes()) < 400
+
+
+def test_legacy_bitmap_state():
+    bitmap = np.zeros(16, dtype=bool)
+    bitmap[[1, 4]] = True
+    raw = dumps({"f": {}, "h": [2, 16, base64.b64encode(np.packbits(bitmap).tobytes()).decode("ascii")]})
+    np.testing.assert_array_equal(SessionState.from_bytes(raw).handle.rows(), [1, 4])
@@ -0,0 +1,71 @@
+import copy
+
+import numpy as np
+
+from backend.data_bootstrap import bootstrap_records
+from backend.property_store import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS
+from backend.search_index import PropertyIndex
+from backend.snapshot import apply_snapshot_delta, load_snapshot_with_index, write_snapshot
+
+QUERIES = [
+    {"comuna": "las condes"},
+    {"operacion": "venta", "precio_max_uf": 6000},
+    {"operacion": "arriendo", "banos_min": 9},
+    {"amenities": ["piscina"], "dormitorios_min": 2},
+]
+
+
+def labels(column):
+    return [column.labels[c] if c >= 0 else None for c in column.codes.tolist()]
+
+
+def test_apply_snapshot_delta_matches_full_write(tmp_path, synthetic_records):
+    base, added = synthetic_records[:1500], synthetic_records[1500:1600]
+    updated = [copy.deepcopy(r) for r in base[3:300:11]]
+    for i, record in enumerate(updated):
+        record["raw"]["descripcion"] = f"Palabraunica {i} con quincho"
+        record["caracteristicas"]["banos"] = 9
+    removed = [r["id"] for r in base[7::101]]
+
+    replaced = {r["id"]: r for r in updated}
+    expected = [replaced.get(r["id"], r) for r in base if r["id"] not in set(removed)] + added
+
+    write_snapshot(base, tmp_path / "patched")
+    apply_snapshot_delta(bootstrap_records(updated + added), removed, tmp_path / "patched")
+    write_snapshot(expected, tmp_path / "full")
+
+    patched, patched_index = load_snapshot_with_index(tmp_path / "patched")
+    full, full_index = load_snapshot_with_index(tmp_path / "full")
+    assert patched.ids.tolist() == full.ids.tolist()
+    assert list(patched.rows) == list(full.rows)
+    assert [bytes(b) for b in patched.encoded] == [bytes(b) for b in full.encoded]
+    for name in NUMERIC_COLUMNS:
+        np.testing.assert_array_equal(patched.column(name), full.column(name), err_msg=name)
+    # las etiquetas categóricas del delta se agregan al final: se comparan decodificadas
+    for name in CATEGORICAL_COLUMNS:
+        assert labels(patched.column(name)) == labels(full.column(name)), name
+
+    assert patched_index.keys() == full_index.keys()
+    for name in (n for n in full_index if n.startswith("text.")):
+        np.testing.assert_array_equal(patched_index[name], full_index[name], err_msg=name)
+    patched_search, full_search = PropertyIndex(patched, patched_index), PropertyIndex(full, full_index)
+    for filters in QUERIES:
+        np.testing.assert_array_equal(patched_search.query(**filters), full_search.query(**filters))
+
+
+def test_snapshot_carries_derived_aggregates(tmp_path, synthetic_records):
+    from backend.facets import compute_facets
+    from backend.similarity import feature_matrix
+    from backend.snapshot import load_derived
+
+    write_snapshot(synthetic_records, tmp_path / "snap")
+    store, _ = load_snapshot_with_index(tmp_path / "snap")
+    derived = load_derived(tmp_path / "snap")
+
+    assert derived["facets"] == compute_facets(store)
+    matrix, features = derived["similar"]
+    expected, expected_features = feature_matrix(store)
+    assert isinstance(matrix, np.memmap)
+    assert features == expected_features
+    np.testing.assert_array_equal(matrix, expected)
+    assert load_derived(tmp_path / "otro") is None
@@ -0,0 +1,34 @@
+import copy
+
+import numpy as np
+
+from backend.property_store import PropertyStore
+from backend.search_index import PropertyIndex
+from backend.text_index import TextIndex, analyze
+
+
+def assert_same_index(a: TextIndex, b: TextIndex):
+    for name in ("terms", "offsets", "docs", "tf", "doclen"):
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+
+
+def test_patched_matches_full_rebuild(synthetic_records):
+    records = synthetic_records
+    store = PropertyStore.from_properties(records)
+    base = PropertyIndex(store).text
+
+    added = copy.deepcopy(records[:3])
+    for i, prop in enumerate(added):
+        prop["id"] = f"nuevo-{i}"
+        prop["raw"]["descripcion"] = f"terminoinedito{i} con quincho"
+    updated = copy.deepcopy(records[10])
+    updated["raw"]["descripcion"] = "palabraunica"
+    emptied = copy.deepcopy(records[20])
+    emptied["raw"]["descripcion"] = None
+    removed = [records[5]["id"], records[len(records) // 2]["id"]]
+
+    patched_store = store.apply_delta(added + [updated, emptied], removed)
+    patched = base.patched(*patched_store.delta)
+
+    assert_same_index(patched, TextIndex.build(patched_store.rows))
+    assert analyze("palabraunica")[0] in patched.vocab